@@ -0,0 +1,111 @@
+"""
+Memory used by single request: size of core request and response objects and
+peak of memory allocated while handling request, traced with tracemalloc.
+
+Usage: python -m benchmarks.allocations [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import sys
+import tracemalloc
+
+from benchmarks.asgi import build_scope, call_app
+from tadow_api import TadowAPI
+from tadow_api.requests import Cookie, Headers, HTTPRequest
+from tadow_api.responses import HTTPResponse
+
+JSON_BODY = b'{"id": 1, "name": "Example item"}'
+
+
+def instance_size(obj: object) -> int:
+    """
+    Method used to get size of object with its attribute dict, if it has one.
+    """
+    size = sys.getsizeof(obj)
+    if hasattr(obj, "__dict__"):
+        size += sys.getsizeof(obj.__dict__)
+    return size
+
+
+def build_app() -> TadowAPI:
+    app = TadowAPI()
+
+    @app.endpoint("/", executor="inline")
+    def index():
+        return "index"
+
+    @app.endpoint("/items", methods=["POST"], executor="inline")
+    def create_item(data: dict):
+        return data, 201
+
+    return app
+
+
+async def measure_peak(app, scope: dict, requests: int, body: bytes = b"") -> float:
+    """
+    Method used to call application sequentially, tracing memory.
+    :return: Mean peak of memory allocated per request, in bytes
+    """
+    for _ in range(100):  # warm up caches
+        await call_app(app, scope, body)
+
+    tracemalloc.start()
+    try:
+        total = 0
+        for _ in range(requests):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            await call_app(app, scope, body)
+            _, peak = tracemalloc.get_traced_memory()
+            total += peak - before
+    finally:
+        tracemalloc.stop()
+    return total / requests
+
+
+async def run(requests: int) -> None:
+    request = HTTPRequest(
+        http_method="GET",
+        url="/",
+        cookies=None,
+        content_type="application/json",
+        raw_data=None,
+    )
+    response = HTTPResponse(
+        status_code=200, content_type="application/json", raw_data="", headers=[]
+    )
+    print(f"{'object':<24}{'bytes':>10}")
+    for name, obj in [
+        ("HTTPRequest", request),
+        ("HTTPResponse", response),
+        ("Headers", Headers([(b"host", b"localhost")])),
+        ("Cookie", Cookie("name", "value")),
+    ]:
+        print(f"{name:<24}{instance_size(obj):>10}")
+
+    app = build_app()
+    await app.startup()
+    json_headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(JSON_BODY)).encode("latin-1")),
+    ]
+    print(f"\n{'scenario':<24}{'peak bytes/req':>16}")
+    for name, scope, body in [
+        ("get", build_scope(), b""),
+        ("post_json", build_scope("/items", "POST", json_headers), JSON_BODY),
+    ]:
+        peak = await measure_peak(app, scope, requests, body)
+        print(f"{name:<24}{peak:>16.0f}")
+    await app.shutdown()
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--requests", type=int, default=2_000)
+    arguments = argument_parser.parse_args()
+    asyncio.run(run(arguments.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Helpers driving ASGI application in process, without server and network.
+"""
+
+import time
+
+
+def build_scope(
+    url: str = "/",
+    http_method: str = "GET",
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> dict:
+    return {
+        "type": "http",
+        "http_version": "1.1",
+        "method": http_method,
+        "path": url,
+        "headers": headers or [],
+    }
+
+
+async def call_app(app, scope: dict, body: bytes = b"") -> int:
+    """
+    Method used to call application once.
+    :return: Response status code
+    """
+    status_code = 0
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def measure_requests(
+    app, scope: dict, requests: int, body: bytes = b""
+) -> list[float]:
+    """
+    Method used to call application sequentially.
+    :return: Latency of every request in seconds
+    """
+    latencies = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await call_app(app, scope, body)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Method used to get percentile with nearest rank method.
+    :param values: Measured values
+    :param fraction: Percentile as fraction, e.g. 0.99
+    :return: Value below which given fraction of values falls
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    """
+    Method used to describe latencies of sequential requests.
+    :return: Requests per second and p50/p99 latency in microseconds
+    """
+    return {
+        "requests_per_second": round(len(latencies) / sum(latencies), 1),
+        "p50_us": round(percentile(latencies, 0.5) * 1_000_000, 2),
+        "p99_us": round(percentile(latencies, 0.99) * 1_000_000, 2),
+    }
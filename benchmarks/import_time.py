@@ -0,0 +1,97 @@
+"""
+Cold import time of tadow_api, measured with python -X importtime in fresh
+interpreters. Shows the slowest imported modules and optional libraries which
+were imported although application doesn't use them.
+
+Usage: python -m benchmarks.import_time [--module tadow_api] [--runs 5] [--top 15]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import NamedTuple
+
+# Libraries which should be imported only by applications using them
+LAZY_MODULES = (
+    "pydantic",
+    "multiprocessing",
+    "concurrent.futures.process",
+    "uuid",
+    "tadow_api.xml_stream",
+    "orjson",
+    "msgspec",
+)
+
+
+class ImportTiming(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> list[ImportTiming]:
+    """
+    Method used to parse stderr of python -X importtime.
+    :param output: Lines like "import time:   123 |   456 |   module"
+    :return: Timing of every imported module
+    """
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_us, cumulative_us, module = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        timings.append(ImportTiming(module.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def measure_import(module: str) -> list[ImportTiming]:
+    """
+    Method used to import module in fresh interpreter.
+    :return: Timing of every module imported by it
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--module", default="tadow_api")
+    argument_parser.add_argument("--runs", type=int, default=5)
+    argument_parser.add_argument("--top", type=int, default=15)
+    arguments = argument_parser.parse_args()
+
+    runs = [measure_import(arguments.module) for _ in range(arguments.runs)]
+    totals = [
+        next(
+            timing.cumulative_us for timing in run if timing.module == arguments.module
+        )
+        for run in runs
+    ]
+    print(
+        f"import {arguments.module}: median {statistics.median(totals) / 1000:.1f}ms,"
+        f" min {min(totals) / 1000:.1f}ms over {arguments.runs} runs\n"
+    )
+
+    fastest = runs[totals.index(min(totals))]
+    print(f"{'module':<48}{'self ms':>10}{'cumulative ms':>15}")
+    for timing in sorted(fastest, key=lambda timing: -timing.self_us)[: arguments.top]:
+        print(
+            f"{timing.module:<48}{timing.self_us / 1000:>10.1f}"
+            f"{timing.cumulative_us / 1000:>15.1f}"
+        )
+
+    imported = {timing.module for timing in fastest}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    print(f"\noptional modules imported eagerly: {', '.join(eager) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
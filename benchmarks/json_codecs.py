@@ -0,0 +1,81 @@
+"""
+Throughput of ApplicationJsonParser with every installed JSON codec.
+
+Usage: python -m benchmarks.json_codecs [--seconds 1.0]
+"""
+
+import argparse
+import time
+
+from tadow_api.codecs import get_json_codec
+from tadow_api.content_parsers import ContentParser
+
+CONTENT_TYPE = "application/json"
+
+
+def build_payloads() -> dict[str, object]:
+    row = {
+        "id": 1,
+        "name": "Example item",
+        "price": 12.5,
+        "tags": ["a", "b", "c"],
+        "available": True,
+    }
+    return {
+        "small": row,
+        "large": [{**row, "id": index} for index in range(10_000)],
+    }
+
+
+def available_codecs() -> list[str]:
+    codecs = []
+    for name in ["json", "orjson", "msgspec"]:
+        try:
+            get_json_codec(name)
+        except ImportError:
+            continue
+        codecs.append(name)
+    return codecs
+
+
+def measure(func, seconds: float) -> float:
+    """
+    Method used to call func repeatedly for given time.
+    :return: Calls per second
+    """
+    calls = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        func()
+        calls += 1
+    return calls / (time.perf_counter() - started)
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--seconds", type=float, default=1.0)
+    arguments = argument_parser.parse_args()
+
+    print(f"{'codec':<10}{'payload':<10}{'size':>10}{'decode/s':>14}{'encode/s':>14}")
+    for payload_name, payload in build_payloads().items():
+        for codec_name in available_codecs():
+            codec = get_json_codec(codec_name)
+            raw_data = ContentParser.parse_response(payload, CONTENT_TYPE, codec)
+
+            decode_rate = measure(
+                lambda: ContentParser.parse_request(raw_data, CONTENT_TYPE, codec),
+                arguments.seconds,
+            )
+            encode_rate = measure(
+                lambda: ContentParser.parse_response(payload, CONTENT_TYPE, codec),
+                arguments.seconds,
+            )
+            print(
+                f"{codec_name:<10}{payload_name:<10}{len(raw_data):>10}"
+                f"{decode_rate:>14.0f}{encode_rate:>14.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Overhead of middleware chain, per middleware.
+
+Usage: python -m benchmarks.middleware [--requests 20000]
+"""
+
+import argparse
+import asyncio
+
+from benchmarks.asgi import build_scope, measure_requests
+from tadow_api import TadowAPI
+from tadow_api.middleware import BaseMiddleware
+
+
+class PassThroughMiddleware(BaseMiddleware):
+    async def __call__(self, request, call_next):
+        return await call_next(request)
+
+
+def build_app(depth: int) -> TadowAPI:
+    app = TadowAPI(middlewares=[PassThroughMiddleware() for _ in range(depth)])
+
+    @app.endpoint("/", executor="inline")
+    def index():
+        return "index"
+
+    return app
+
+
+async def run(requests: int) -> None:
+    scope = build_scope()
+    baseline = None
+
+    print(f"{'middlewares':>12}{'req/s':>12}{'us/req':>10}{'us/middleware':>15}")
+    for depth in [0, 1, 5, 10, 25]:
+        app = build_app(depth)
+        await measure_requests(app, scope, 100)  # warm up
+
+        latencies = await measure_requests(app, scope, requests)
+        per_request = sum(latencies) / len(latencies) * 1_000_000
+        if baseline is None:
+            baseline = per_request
+        per_middleware = (per_request - baseline) / depth if depth else 0.0
+        print(
+            f"{depth:>12}{1_000_000 / per_request:>12.0f}"
+            f"{per_request:>10.1f}{per_middleware:>15.2f}"
+        )
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--requests", type=int, default=20_000)
+    arguments = argument_parser.parse_args()
+    asyncio.run(run(arguments.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Throughput and latency of the full request pipeline, from ASGI call to sent
+response, for route dispatch, content types, pydantic models, middlewares and
+metrics.
+
+Usage: python -m benchmarks.pipeline [--requests 5000] [--rounds 3]
+    [--output results.json] [--baseline benchmarks/baseline.json] [--tolerance 0.1]
+
+Results are printed as table and written as JSON to --output. With --baseline,
+scenarios whose requests/sec dropped by more than --tolerance are reported as
+regressions and command exits with status 1. Numbers depend on machine, so
+baseline should be recorded on the same machine as compared results.
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import sys
+from typing import Callable, NamedTuple
+
+from pydantic import BaseModel
+
+from benchmarks.asgi import build_scope, call_app, measure_requests, summarize
+from tadow_api import TadowAPI
+from tadow_api.middleware import BaseMiddleware
+
+JSON_BODY = b'{"id": 1, "name": "Example item", "price": 12.5, "available": true}'
+XML_BODY = (
+    b"<item><id>1</id><name>Example item</name>"
+    b"<price>12.5</price><available>true</available></item>"
+)
+
+
+class Scenario(NamedTuple):
+    app: TadowAPI
+    scope: dict
+    body: bytes = b""
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    price: float
+    available: bool
+
+
+class PassThroughMiddleware(BaseMiddleware):
+    async def __call__(self, request, call_next):
+        return await call_next(request)
+
+
+def dispatch_scenario(routes: int) -> Scenario:
+    # Route cache is disabled, so every request goes through the dispatcher
+    app = TadowAPI(route_cache_size=0)
+    for index in range(routes):
+
+        @app.endpoint(f"/resource_{index}/(?P<item_id>[0-9]+)", executor="inline")
+        def get_item(item_id: int):
+            return {"id": item_id}
+
+    return Scenario(app, build_scope(f"/resource_{routes - 1}/42"))
+
+
+def content_type_scenario(content_type: str, body: bytes) -> Scenario:
+    app = TadowAPI()
+
+    @app.endpoint("/items", methods=["POST"], executor="inline")
+    def create_item(data: dict):
+        return data
+
+    headers = [
+        (b"content-type", content_type.encode("latin-1")),
+        (b"content-length", str(len(body)).encode("latin-1")),
+    ]
+    return Scenario(app, build_scope("/items", "POST", headers), body)
+
+
+def pydantic_scenario() -> Scenario:
+    app = TadowAPI()
+
+    @app.endpoint(
+        "/items",
+        methods=["POST"],
+        request_model=Item,
+        response_model=Item,
+        executor="inline",
+    )
+    def create_item(data: Item):
+        return data
+
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(JSON_BODY)).encode("latin-1")),
+    ]
+    return Scenario(app, build_scope("/items", "POST", headers), JSON_BODY)
+
+
+def middleware_scenario(depth: int, metrics: bool = False) -> Scenario:
+    app = TadowAPI(
+        middlewares=[PassThroughMiddleware() for _ in range(depth)], metrics=metrics
+    )
+
+    @app.endpoint("/", executor="inline")
+    def index():
+        return "index"
+
+    return Scenario(app, build_scope())
+
+
+SCENARIOS: dict[str, Callable[[], Scenario]] = {
+    "dispatch_10_routes": lambda: dispatch_scenario(10),
+    "dispatch_100_routes": lambda: dispatch_scenario(100),
+    "dispatch_1000_routes": lambda: dispatch_scenario(1000),
+    "json_body": lambda: content_type_scenario("application/json", JSON_BODY),
+    "xml_body": lambda: content_type_scenario("application/xml", XML_BODY),
+    "pydantic_models": pydantic_scenario,
+    "middlewares_0": lambda: middleware_scenario(0),
+    "middlewares_10": lambda: middleware_scenario(10),
+    "middlewares_50": lambda: middleware_scenario(50),
+    # Compared with middlewares_0, shows overhead of enabled metrics
+    "metrics_enabled": lambda: middleware_scenario(0, metrics=True),
+}
+
+
+async def run_scenarios(
+    requests: int, rounds: int = 3, names: list[str] | None = None
+) -> dict[str, dict[str, float]]:
+    """
+    Method used to measure scenarios, one after another.
+    :param requests: Number of measured requests per scenario round
+    :param rounds: Number of rounds, the fastest one is reported to reduce noise
+    :param names: Scenarios to run, all if not set
+    :return: Summary of every scenario by its name
+    """
+    results = {}
+    for name in names or SCENARIOS:
+        scenario = SCENARIOS[name]()
+        await scenario.app.startup()
+        try:
+            status_code = await call_app(scenario.app, scenario.scope, scenario.body)
+            if status_code != 200:
+                raise RuntimeError(f"Scenario {name} responded with {status_code}")
+            await measure_requests(
+                scenario.app, scenario.scope, max(requests // 10, 1), scenario.body
+            )  # warm up
+            summaries = [
+                summarize(
+                    await measure_requests(
+                        scenario.app, scenario.scope, requests, scenario.body
+                    )
+                )
+                for _ in range(rounds)
+            ]
+        finally:
+            await scenario.app.shutdown()
+        results[name] = max(
+            summaries, key=lambda summary: summary["requests_per_second"]
+        )
+    return results
+
+
+def compare_results(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float = 0.1,
+) -> list[str]:
+    """
+    Method used to find scenarios slower than baseline.
+    :param results: Current results
+    :param baseline: Stored results
+    :param tolerance: Allowed relative drop of requests/sec
+    :return: Names of regressed scenarios
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        expected = baseline[name]["requests_per_second"]
+        if result["requests_per_second"] < expected * (1 - tolerance):
+            regressions.append(name)
+    return regressions
+
+
+def print_results(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]] | None = None,
+) -> None:
+    print(f"{'scenario':<24}{'req/s':>12}{'p50 us':>10}{'p99 us':>10}{'change':>10}")
+    for name, result in results.items():
+        change = ""
+        if baseline and name in baseline:
+            ratio = (
+                result["requests_per_second"] / baseline[name]["requests_per_second"]
+            )
+            change = f"{(ratio - 1) * 100:+.1f}%"
+        print(
+            f"{name:<24}{result['requests_per_second']:>12.0f}"
+            f"{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}{change:>10}"
+        )
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    argument_parser.add_argument("--requests", type=int, default=5_000)
+    argument_parser.add_argument("--rounds", type=int, default=3)
+    argument_parser.add_argument("--scenario", action="append", choices=SCENARIOS)
+    argument_parser.add_argument("--output", help="Path of JSON results file")
+    argument_parser.add_argument("--baseline", help="Path of stored JSON results")
+    argument_parser.add_argument("--tolerance", type=float, default=0.1)
+    arguments = argument_parser.parse_args()
+
+    results = asyncio.run(
+        run_scenarios(arguments.requests, arguments.rounds, arguments.scenario)
+    )
+
+    baseline = None
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+    print_results(results, baseline)
+
+    if arguments.output:
+        with open(arguments.output, "w") as output_file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "requests": arguments.requests,
+                    "rounds": arguments.rounds,
+                    "results": results,
+                },
+                output_file,
+                indent=2,
+            )
+
+    if baseline:
+        regressions = compare_results(results, baseline, arguments.tolerance)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
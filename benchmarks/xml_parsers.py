@@ -0,0 +1,139 @@
+"""
+Speed and peak memory of streaming XML reader and writer, compared with
+xmltodict and dicttoxml (if installed) for documents of 1KB, 1MB and 50MB.
+
+Usage: python -m benchmarks.xml_parsers [--sizes 1KB 1MB 50MB] [--repeat 3]
+       [--memory]
+"""
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from tadow_api.xml_stream import (
+    XML_ROOT_END,
+    XML_ROOT_START,
+    dump_xml,
+    dump_xml_item,
+    iterate_xml_items,
+    parse_xml,
+    parse_xml_stream,
+)
+
+SIZES = {"1KB": 1024, "1MB": 1024**2, "50MB": 50 * 1024**2}
+CHUNK_SIZE = 64 * 1024
+
+ROW = {
+    "id": 1,
+    "name": "Example item",
+    "price": 12.5,
+    "tags": ["a", "b", "c"],
+    "available": True,
+}
+
+
+def build_rows(size: int) -> list[dict]:
+    row_size = len(dump_xml_item(ROW))
+    return [{**ROW, "id": index} for index in range(max(1, size // row_size))]
+
+
+async def iterate_chunks(document: bytes):
+    for start in range(0, len(document), CHUNK_SIZE):
+        yield document[start : start + CHUNK_SIZE]
+
+
+async def count_items(document: bytes) -> int:
+    count = 0
+    async for _ in iterate_xml_items(iterate_chunks(document), depth=2):
+        count += 1
+    return count
+
+
+def stream_rows(rows: list[dict]) -> int:
+    size = len(XML_ROOT_START) + len(XML_ROOT_END)
+    for row in rows:
+        size += len(dump_xml_item(row))
+    return size
+
+
+def build_cases(rows: list[dict], document: bytes) -> dict[str, callable]:
+    cases = {
+        "parse_xml": lambda: parse_xml(document),
+        "parse_xml_stream": lambda: asyncio.run(
+            parse_xml_stream(iterate_chunks(document))
+        ),
+        "iterate_xml_items": lambda: asyncio.run(count_items(document)),
+        "dump_xml": lambda: dump_xml(rows),
+        "dump_xml_item": lambda: stream_rows(rows),
+    }
+    try:
+        import xmltodict
+
+        cases["xmltodict.parse"] = lambda: xmltodict.parse(document)
+    except ImportError:
+        pass
+    try:
+        from dicttoxml import dicttoxml
+
+        cases["dicttoxml"] = lambda: dicttoxml(
+            rows, encoding="utf-8", return_bytes=True
+        )
+    except ImportError:
+        pass
+    return cases
+
+
+def measure(func, repeat: int) -> float:
+    """
+    Method used to call func repeat times.
+    :return: Best time of single call, in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def measure_peak(func) -> int:
+    """
+    Method used to call func once, tracing memory.
+    :return: Peak of memory allocated by call, in bytes
+    """
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - before
+
+
+def main() -> None:
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument(
+        "--sizes", nargs="+", choices=list(SIZES), default=list(SIZES)
+    )
+    argument_parser.add_argument("--repeat", type=int, default=3)
+    argument_parser.add_argument("--memory", action="store_true")
+    arguments = argument_parser.parse_args()
+
+    print(f"{'size':<8}{'case':<20}{'seconds':>12}{'MB/s':>10}{'peak MB':>10}")
+    for size_name in arguments.sizes:
+        rows = build_rows(SIZES[size_name])
+        document = dump_xml(rows)
+        megabytes = len(document) / 1024**2
+        for case_name, func in build_cases(rows, document).items():
+            seconds = measure(func, arguments.repeat)
+            peak = f"{measure_peak(func) / 1024**2:.1f}" if arguments.memory else "-"
+            print(
+                f"{size_name:<8}{case_name:<20}{seconds:>12.6f}"
+                f"{megabytes / seconds:>10.1f}{peak:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,9 @@ setup(
     install_requries=[
         "uvicorn[standard]>=0.34.0",
         "pydantic>=2.10.5",
-        "xmltodict>=0.14.2",
-        "dicttoxml>=1.7.16",
     ],
+    extras_require={
+        "orjson": ["orjson>=3.10.0"],
+        "msgspec": ["msgspec>=0.19.0"],
+    },
 )
@@ -0,0 +1,3 @@
+from tadow_api.runner import main
+
+main()
@@ -1,32 +1,124 @@
+import inspect
+import time
+import traceback
 from typing import Type, Callable
 
-from pydantic import ValidationError
-
-from tadow_api.exceptions import HttpException, handle_validation_error
-from tadow_api.middleware import BaseMiddleware
+from tadow_api.background import OVERFLOW_BLOCK, BackgroundTaskQueue
+from tadow_api.batch import build_batch_endpoint
+from tadow_api.codecs import JsonCodec, get_json_codec
+from tadow_api.concurrency import BoundedThreadPool, ConcurrencyLimiter, ProcessPool
+from tadow_api.exceptions import (
+    LAZY_EXCEPTION_HANDLERS,
+    HttpException,
+    handle_http_exception,
+)
+from tadow_api.metrics import (
+    PHASE_SEND,
+    GLOBAL_LIMITER,
+    PHASE_TOTAL,
+    UNMATCHED_ROUTE,
+    Metrics,
+)
+from tadow_api.middleware import BaseMiddleware, RequestHandler, build_middleware_chain
 from tadow_api.requests import HTTPRequest
 from tadow_api.responses import HTTPResponse
-from tadow_api.routing import APIRoute, Router
-from tadow_api.url_dispatcher import RegexURLDispatcher, BaseURLDispatcher
+from tadow_api.route_table import RouteCacheInfo, RouteTable
+from tadow_api.routing import EXECUTOR_PROCESS, Router
+from tadow_api.snapshot import load_snapshot, save_snapshot
+from tadow_api.state import AppState
+from tadow_api.url_dispatcher import RadixTreeURLDispatcher, BaseURLDispatcher
 
 
 class TadowAPI(Router):
     _custom_exception_handlers: dict[Type[Exception], Callable]
     _middlewares: list[BaseMiddleware]
+    _route_table: RouteTable | None
+    _request_handler: RequestHandler | None
 
     def __init__(
         self,
         debug: bool = False,
-        url_dispatcher: BaseURLDispatcher = RegexURLDispatcher(),
+        url_dispatcher: BaseURLDispatcher | None = None,
         middlewares: list[BaseMiddleware] | None = None,
         prefix: str | None = None,
+        route_cache_size: int = 1024,
+        max_body_size: int | None = None,
+        json_codec: str | JsonCodec = "auto",
+        max_workers: int | None = None,
+        process_workers: int | None = None,
+        metrics: bool | Metrics = False,
+        on_startup: list[Callable] | None = None,
+        on_shutdown: list[Callable] | None = None,
+        concurrency_limiter: ConcurrencyLimiter | None = None,
+        background_workers: int = 4,
+        background_queue_size: int = 1000,
+        background_overflow: str = OVERFLOW_BLOCK,
+        background_drain_timeout: float | None = None,
     ):
         super().__init__(prefix)
         self.enable_debugger = debug
-        self._url_dispatched = url_dispatcher
-        self._custom_exception_handlers = {ValidationError: handle_validation_error}
-        if not middlewares:
-            self._middlewares = []
+        self._url_dispatched = url_dispatcher or RadixTreeURLDispatcher()
+        self._route_cache_size = route_cache_size
+        self._route_table = None
+        self.max_body_size = max_body_size
+        self.json_codec = get_json_codec(json_codec)
+        # Pool running sync endpoints
+        self.thread_pool = BoundedThreadPool(max_workers=max_workers)
+        # Pool running CPU bound endpoints, started with application
+        self.process_pool = ProcessPool(max_workers=process_workers)
+        # Queue of tasks run after responses are sent, drained on shutdown
+        self.background_queue = BackgroundTaskQueue(
+            workers=background_workers,
+            max_size=background_queue_size,
+            overflow=background_overflow,
+            thread_pool=self.thread_pool,
+        )
+        self._background_drain_timeout = background_drain_timeout
+        self._custom_exception_handlers = {
+            HttpException: handle_http_exception,
+        }
+        self._middlewares = list(middlewares or [])
+        self._request_handler = None
+        # Request metrics, disabled unless enabled explicitly
+        if isinstance(metrics, Metrics):
+            self.metrics = metrics
+        else:
+            self.metrics = Metrics() if metrics else None
+        # Resources shared by requests, passed to endpoints by parameter name
+        self.state = AppState()
+        self._startup_handlers = list(on_startup or [])
+        self._shutdown_handlers = list(on_shutdown or [])
+        # Limit of requests handled at once by whole application
+        self.concurrency_limiter = concurrency_limiter
+        if self.metrics is not None and concurrency_limiter is not None:
+            self.metrics.add_limiter(GLOBAL_LIMITER, concurrency_limiter)
+
+    def __getstate__(self) -> dict:
+        if self.background_queue.is_running or self.process_pool.is_running:
+            raise AttributeError("Running application can't be saved in snapshot")
+        state = self.__dict__.copy()
+        # Middleware chain is built again on first request
+        state["_request_handler"] = None
+        return state
+
+    def save_snapshot(self, path: str) -> None:
+        """
+        Method used to compile routes and save application into snapshot file,
+        see tadow_api.snapshot.
+        :param path: Snapshot file path
+        """
+        save_snapshot(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path: str) -> "TadowAPI":
+        """
+        Method used to load application from snapshot file, saved by the same
+        version of application code. Load only snapshots you built, loading
+        snapshot can run any code.
+        :param path: Snapshot file path
+        :return: TadowAPI instance with compiled routes
+        """
+        return load_snapshot(path)
 
     def register_router(self, router: Router) -> None:
         """
@@ -41,59 +133,299 @@ class TadowAPI(Router):
             if full_route_path in self._registered_routes:
                 raise AttributeError(f"{full_route_path} already registered")
             self._registered_routes[full_route_path] = route
+        self._route_table = None
+
+    def _register_new_endpoint(self, *args, **kwargs):
+        super()._register_new_endpoint(*args, **kwargs)
+        self._route_table = None
+
+    def compile_routes(self) -> RouteTable:
+        """
+        Method used to freeze registered routes into precompiled route table and
+        bind endpoint parameters to application state. Table is built on startup
+        (or first request) and rebuilt after registering new routes.
+        :return: RouteTable instance
+        :raises AttributeError: on conflicting routes or unbindable parameters
+        """
+        if self._route_table is None:
+            if not hasattr(self, "_registered_routes"):
+                self._registered_routes = {}
+            route_table = RouteTable(
+                self.get_registered_routes(),
+                self._url_dispatched,
+                cache_size=self._route_cache_size,
+            )
+            for route in route_table.routes.values():
+                route.bind_state(self.state)
+            self._route_table = route_table
+            if self.metrics is not None:
+                for path, route in self._route_table.routes.items():
+                    route.metrics = self.metrics.for_route(path)
+                    if route.concurrency_limiter is not None:
+                        self.metrics.add_limiter(path, route.concurrency_limiter)
+        return self._route_table
+
+    def add_middleware(self, middleware: BaseMiddleware) -> None:
+        """
+        Method used to add middleware, as the innermost one.
+        :param middleware: Middleware instance
+        """
+        self._middlewares.append(middleware)
+        self._request_handler = None
+
+    def compile_request_handler(self) -> RequestHandler:
+        """
+        Method used to compose middlewares and dispatching into single callable.
+        Handler is built on first request and rebuilt after adding middleware.
+        :return: Request handler
+        """
+        if self._request_handler is None:
+            self._request_handler = build_middleware_chain(
+                self._middlewares, self._dispatch_request
+            )
+        return self._request_handler
+
+    def add_metrics_endpoint(self, path: str = "/metrics") -> None:
+        """
+        Method used to register endpoint exposing metrics in Prometheus text format.
+        :param path: Endpoint path
+        """
+        if self.metrics is None:
+            raise AttributeError("Metrics are disabled, enable them with metrics=True")
+        self.endpoint(path, methods=["GET"])(self.metrics.build_endpoint())
+
+    def add_batch_endpoint(
+        self, path: str = "/batch", max_concurrency: int = 10, max_items: int = 50
+    ) -> None:
+        """
+        Method used to register endpoint running list of sub-requests concurrently,
+        e.g. [{"method": "GET", "path": "/items/1"}, {"method": "POST",
+        "path": "/items", "body": {...}}]. Response is list of
+        {"status", "headers", "body"} results, in order of sub-requests.
+        :param path: Endpoint path
+        :param max_concurrency: Number of sub-requests run at once
+        :param max_items: Maximum number of sub-requests in batch
+        """
+        self.endpoint(path, methods=["POST"])(
+            build_batch_endpoint(
+                self, f"{self.prefix}{path}", max_concurrency, max_items
+            )
+        )
+
+    def route_cache_info(self) -> RouteCacheInfo:
+        return self.compile_routes().cache_info()
+
+    def on_startup(self, handler: Callable) -> Callable:
+        """
+        Method used to register sync or async function called on application
+        startup, before routes are frozen. Can be used as decorator.
+        :param handler: Function without arguments
+        :return: Registered function
+        """
+        self._startup_handlers.append(handler)
+        return handler
+
+    def on_shutdown(self, handler: Callable) -> Callable:
+        """
+        Method used to register sync or async function called on application
+        shutdown, before pools are shut down. Can be used as decorator.
+        :param handler: Function without arguments
+        :return: Registered function
+        """
+        self._shutdown_handlers.append(handler)
+        return handler
 
     @staticmethod
-    def request_response_handler(func):
-        async def decorator(self, scope, receive, send):
-            # Build request
-            try:
-                request: HTTPRequest = await HTTPRequest.create_request(
-                    scope, receive, self._middlewares
-                )
+    async def _run_handlers(handlers: list[Callable]) -> None:
+        for handler in handlers:
+            result = handler()
+            if inspect.isawaitable(result):
+                await result
 
-                route, arguments = self._url_dispatched(
-                    self.get_registered_routes(), request
-                )
-            except HttpException as exception:
-                await HTTPResponse(
-                    status_code=exception.status_code,
-                    raw_data=exception.message,
-                    content_type="application/json",
-                    headers=[],
-                ).send_response(send)
+    async def startup(self) -> None:
+        """
+        Method used to prepare application before handling requests. Startup
+        handlers run first, so routes can be bound to resources they created.
+        """
+        await self._run_handlers(self._startup_handlers)
+        # Bind routes again, state could have changed since table was built
+        route_table = self.compile_routes()
+        for route in route_table.routes.values():
+            route.bind_state(self.state)
+        self.compile_request_handler()
+        if any(
+            route.executor == EXECUTOR_PROCESS for route in route_table.routes.values()
+        ):
+            self.process_pool.start()
+        self.background_queue.start()
+
+    async def shutdown(self) -> None:
+        """
+        Method used to release resources of application. Background tasks are
+        drained first, as they may use resources closed by shutdown handlers.
+        """
+        await self.background_queue.shutdown(self._background_drain_timeout)
+        await self._run_handlers(self._shutdown_handlers)
+        self.process_pool.shutdown()
+        self.thread_pool.shutdown()
+
+    async def _dispatch_request(self, request: HTTPRequest) -> HTTPResponse:
+        try:
+            route_table = self._route_table or self.compile_routes()
+            route, arguments = route_table.resolve(request)
+            request.route = route
+            return await route(request, **arguments)
+        except Exception as exc:
+            handler = self._custom_exception_handlers.get(type(exc))
+            if handler is None:
+                handler = self._resolve_lazy_exception_handler(type(exc))
+            if handler is not None:
+                return await handler(exc, request)
+            raise exc
+
+    def _resolve_lazy_exception_handler(
+        self, exception_type: Type[Exception]
+    ) -> Callable | None:
+        name = f"{exception_type.__module__}.{exception_type.__qualname__}"
+        handler = LAZY_EXCEPTION_HANDLERS.get(name)
+        if handler is not None:
+            self._custom_exception_handlers[exception_type] = handler
+        return handler
+
+    @staticmethod
+    def _route_label(request: HTTPRequest) -> str:
+        return request.route.path if request.route is not None else UNMATCHED_ROUTE
+
+    async def _send_measured_response(
+        self, request: HTTPRequest, response: HTTPResponse, send, started: float
+    ) -> None:
+        sending_started = time.perf_counter()
+        await response.send_response(send)
+        finished = time.perf_counter()
+
+        route = self._route_label(request)
+        histograms = self.metrics.for_route(route).histograms
+        histograms[PHASE_SEND].observe(finished - sending_started)
+        histograms[PHASE_TOTAL].observe(finished - started)
+        self.metrics.count_response(route, request.http_method, response.status_code)
+
+    async def _handle_lifespan(self, receive, send) -> None:
+        """
+        Method used to handle ASGI lifespan protocol, startup and shutdown messages.
+        """
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception:
+                    await send(
+                        {
+                            "type": "lifespan.startup.failed",
+                            "message": traceback.format_exc(),
+                        }
+                    )
+                    raise
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                try:
+                    await self.shutdown()
+                except Exception:
+                    await send(
+                        {
+                            "type": "lifespan.shutdown.failed",
+                            "message": traceback.format_exc(),
+                        }
+                    )
+                    raise
+                await send({"type": "lifespan.shutdown.complete"})
                 return
 
-            # Call function
-            try:
-                response = await func(self, route, request, **arguments)
-
-                for middleware in self._middlewares:
-                    middleware.handle_response(response)
-                await response.send_response(send)
-            except Exception as exc:
-                if self.enable_debugger:
-                    import traceback
-
-                    error_content = traceback.format_exc()
-                else:
-                    error_content = "Internal server error"
-                await HTTPResponse(
-                    status_code=500,
-                    content_type="application/json",
-                    headers=[],
-                    raw_data=error_content,  # TODO Rebuild
-                ).send_response(send)
-                raise exc
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._handle_lifespan(receive, send)
+            return
 
-        return decorator
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            await self._handle_request(scope, receive, send)
+            return
 
-    @request_response_handler
-    async def __call__(
-        self, route: APIRoute, request: HTTPRequest, *args, **kwargs
-    ) -> HTTPResponse:
+        # Shed load before request is even built
+        if not await limiter.acquire():
+            await limiter.rejection.send_response(send)
+            return
         try:
-            return await route(request, *args, **kwargs)
+            await self._handle_request(scope, receive, send)
+        finally:
+            limiter.release()
+
+    async def _handle_request(self, scope, receive, send) -> None:
+        handler = self._request_handler or self.compile_request_handler()
+
+        # Build request
+        try:
+            request: HTTPRequest = await HTTPRequest.create_request(
+                scope,
+                receive,
+                self.max_body_size,
+                self.json_codec,
+                app=self,
+            )
+        except HttpException as exception:
+            await HTTPResponse(
+                status_code=exception.status_code,
+                raw_data=exception.message,
+                content_type="application/json",
+                headers=[],
+            ).send_response(send)
+            return
+
+        metrics = self.metrics
+        if metrics is not None:
+            started = time.perf_counter()
+
+        # Streamed response may fail after its start was sent, error response
+        # can't be sent then
+        response_started = False
+
+        async def send_tracked(message):
+            nonlocal response_started
+            response_started = True
+            await send(message)
+
+        # Run middlewares and endpoint
+        try:
+            try:
+                response = await handler(request)
+            except HttpException as exception:
+                response = await handle_http_exception(exception, request)
+            if metrics is None:
+                await response.send_response(send_tracked)
+            else:
+                await self._send_measured_response(
+                    request, response, send_tracked, started
+                )
+
+            if request.background_tasks is not None:
+                for task in request.background_tasks.tasks:
+                    await self.background_queue.submit(task)
         except Exception as exc:
-            if type(exc) in self._custom_exception_handlers:
-                return await self._custom_exception_handlers[type(exc)](exc, request)
+            if metrics is not None:
+                metrics.count_response(
+                    self._route_label(request), request.http_method, 500
+                )
+            if response_started:
+                # Server closes connection, so client sees truncated response
+                raise exc
+            if self.enable_debugger:
+                error_content = traceback.format_exc()
+            else:
+                error_content = "Internal server error"
+            await HTTPResponse(
+                status_code=500,
+                content_type="application/json",
+                headers=[],
+                raw_data=error_content,  # TODO Rebuild
+            ).send_response(send)
             raise exc
@@ -0,0 +1,168 @@
+import asyncio
+import functools
+import inspect
+import logging
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+if TYPE_CHECKING:
+    from tadow_api.concurrency import BoundedThreadPool
+
+logger = logging.getLogger("tadow_api.background")
+
+# Policies used when background task queue is full
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP = "drop"
+OVERFLOW_INLINE = "inline"
+_OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP, OVERFLOW_INLINE)
+
+
+class BackgroundTask(NamedTuple):
+    func: Callable
+    args: tuple
+    kwargs: dict[str, Any]
+
+
+class BackgroundTasks:
+    """
+    Tasks scheduled by endpoint, run by application after response is sent.
+    Endpoint gets it by background_tasks parameter, or any parameter annotated
+    with BackgroundTasks.
+    """
+
+    __slots__ = ("tasks",)
+
+    def __init__(self):
+        self.tasks: list[BackgroundTask] = []
+
+    def add_task(self, func: Callable, *args, **kwargs) -> None:
+        """
+        Method used to schedule sync or async function call.
+        :param func: Function called after response is sent
+        :param args: Function positional arguments
+        :param kwargs: Function keyword arguments
+        """
+        self.tasks.append(BackgroundTask(func, args, kwargs))
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+
+class BackgroundQueueStats(NamedTuple):
+    queued: int
+    active: int
+    completed: int
+    failed: int
+    dropped: int
+
+
+class BackgroundTaskQueue:
+    """
+    Bounded queue of background tasks, drained by fixed number of worker tasks.
+    Async tasks run on event loop, sync ones in thread pool of application.
+    When queue is full, new task waits for free place ("block"), is dropped
+    ("drop") or is run by submitting request ("inline").
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_size: int = 1000,
+        overflow: str = OVERFLOW_BLOCK,
+        thread_pool: "BoundedThreadPool | None" = None,
+    ):
+        if overflow not in _OVERFLOW_POLICIES:
+            raise AttributeError(f"Overflow policy {overflow} not supported!")
+        self.workers = workers
+        self.max_size = max_size
+        self.overflow = overflow
+        self.thread_pool = thread_pool
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._dropped = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self._queue is not None
+
+    def start(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_size)
+            self._workers = [
+                asyncio.ensure_future(self._work()) for _ in range(self.workers)
+            ]
+
+    async def submit(self, task: BackgroundTask) -> None:
+        """
+        Method used to put task into queue, applying overflow policy if it's full.
+        Workers are started on first task, if application didn't start them.
+        :param task: BackgroundTask instance
+        """
+        self.start()
+        try:
+            self._queue.put_nowait(task)
+        except asyncio.QueueFull:
+            if self.overflow == OVERFLOW_DROP:
+                self._dropped += 1
+            elif self.overflow == OVERFLOW_INLINE:
+                await self._run(task)
+            else:
+                await self._queue.put(task)
+
+    async def _work(self) -> None:
+        while True:
+            task = await self._queue.get()
+            try:
+                await self._run(task)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, task: BackgroundTask) -> None:
+        self._active += 1
+        try:
+            result = None
+            if inspect.iscoroutinefunction(task.func):
+                result = await task.func(*task.args, **task.kwargs)
+            elif self.thread_pool is not None:
+                call = functools.partial(task.func, *task.args, **task.kwargs)
+                result = await self.thread_pool.run(call, {})
+            else:
+                result = task.func(*task.args, **task.kwargs)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            self._failed += 1
+            logger.exception("Background task %r failed", task.func)
+        else:
+            self._completed += 1
+        finally:
+            self._active -= 1
+
+    async def shutdown(self, timeout: float | None = None) -> None:
+        """
+        Method used to wait for queued tasks and stop workers. Tasks still
+        queued after timeout are dropped.
+        :param timeout: Seconds to wait for queue to drain, no limit if not set
+        """
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            self._dropped += self._queue.qsize()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def stats(self) -> BackgroundQueueStats:
+        return BackgroundQueueStats(
+            queued=self._queue.qsize() if self._queue is not None else 0,
+            active=self._active,
+            completed=self._completed,
+            failed=self._failed,
+            dropped=self._dropped,
+        )
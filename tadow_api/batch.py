@@ -0,0 +1,180 @@
+import asyncio
+import traceback
+from typing import TYPE_CHECKING, Callable
+
+from tadow_api.content_parsers import JSON_CONTENT_TYPE, iterate_async
+from tadow_api.exceptions import HttpException
+from tadow_api.requests import Headers, HTTPRequest
+from tadow_api.responses import HTTPResponse, StreamingResponse
+
+if TYPE_CHECKING:
+    from tadow_api.app import TadowAPI
+
+# Headers of batch request which don't describe sub-request. Sub-responses are
+# embedded in batch response, so they aren't compressed on their own
+_BODY_HEADERS = frozenset(
+    [b"content-type", b"content-length", b"transfer-encoding", b"accept-encoding"]
+)
+
+
+def _build_sub_request(
+    app: "TadowAPI", batch_request: HTTPRequest, item: dict
+) -> HTTPRequest:
+    """
+    Method used to build request from batch item, inheriting headers of batch
+    request (e.g. authorization). Body is encoded back to JSON and read by
+    route like body of regular request.
+    """
+    http_method = item.get("method", "GET")
+    path = item.get("path")
+    if not isinstance(path, str) or not isinstance(http_method, str):
+        raise HttpException(message="Invalid batch item", status_code=400)
+
+    body = b""
+    if item.get("body") is not None:
+        body = app.json_codec.dumps(item["body"])
+
+    raw_headers = [
+        (key, value)
+        for key, value in batch_request.headers.raw
+        if key.lower() not in _BODY_HEADERS
+    ]
+    for key, value in (item.get("headers") or {}).items():
+        raw_headers.append((key.lower().encode("latin-1"), value.encode("latin-1")))
+    if body:
+        raw_headers.append((b"content-type", JSON_CONTENT_TYPE.encode("latin-1")))
+        raw_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return HTTPRequest(
+        http_method=http_method.upper(),
+        url=path,
+        cookies=None,
+        content_type=JSON_CONTENT_TYPE if body else batch_request.content_type,
+        raw_data=None,
+        receive=receive,
+        content_length=len(body),
+        max_body_size=app.max_body_size,
+        json_codec=app.json_codec,
+        headers=Headers(raw_headers),
+        http_version=batch_request.http_version,
+        app=app,
+    )
+
+
+async def _render_body(response: HTTPResponse) -> bytes:
+    if isinstance(response, StreamingResponse):
+        chunks = []
+        async for chunk in iterate_async(response.content):
+            chunks.append(chunk.encode("utf-8") if isinstance(chunk, str) else chunk)
+        return b"".join(chunks)
+    return response.render()
+
+
+class BatchEndpoint:
+    """
+    Endpoint running list of {method, path, body, headers} sub-requests
+    concurrently, through middlewares and routes of application (without ASGI
+    layer), so middlewares guarding paths see path of every sub-request. Each
+    sub-request gets its own status, errors are handled by exception handlers
+    of application, like for regular request. Headers of sub-response are list
+    of [name, value] pairs, as headers like set-cookie can repeat.
+    """
+
+    def __init__(
+        self, app: "TadowAPI", path: str, max_concurrency: int, max_items: int
+    ):
+        self.app = app
+        self.path = path
+        self.max_concurrency = max_concurrency
+        self.max_items = max_items
+
+    async def _run_item(
+        self, batch_request: HTTPRequest, item: object, semaphore: asyncio.Semaphore
+    ) -> bytes:
+        app = self.app
+        codec = app.json_codec
+        handler = app._request_handler or app.compile_request_handler()
+        async with semaphore:
+            try:
+                if not isinstance(item, dict):
+                    raise HttpException(message="Invalid batch item", status_code=400)
+                if item.get("path") == self.path:
+                    raise HttpException(
+                        message="Batch can't be nested", status_code=400
+                    )
+                sub_request = _build_sub_request(app, batch_request, item)
+                response = await handler(sub_request)
+                body = await _render_body(response)
+            except Exception as exception:
+                if isinstance(exception, HttpException):
+                    status_code, body = exception.status_code, exception.message
+                else:
+                    status_code = 500
+                    body = (
+                        traceback.format_exc()
+                        if app.enable_debugger
+                        else "Internal server error"
+                    )
+                return b'{"status":%d,"headers":[],"body":%s}' % (
+                    status_code,
+                    codec.dumps(body),
+                )
+
+            # Background tasks of sub-request run after batch response is sent
+            if sub_request.background_tasks is not None:
+                if batch_request.background_tasks is None:
+                    batch_request.background_tasks = sub_request.background_tasks
+                else:
+                    batch_request.background_tasks.tasks += (
+                        sub_request.background_tasks.tasks
+                    )
+
+            # JSON body is embedded as it is, other bodies as strings
+            if response.content_type != JSON_CONTENT_TYPE:
+                body = codec.dumps(body.decode("utf-8", errors="replace"))
+            elif not body:
+                body = b"null"
+            return b'{"status":%d,"headers":%s,"body":%s}' % (
+                response.status_code,
+                codec.dumps([list(header) for header in response.headers]),
+                body,
+            )
+
+    async def __call__(self, request: HTTPRequest) -> HTTPResponse:
+        items = request.data
+        if not isinstance(items, list):
+            raise HttpException(message="Batch has to be a list", status_code=400)
+        if len(items) > self.max_items:
+            raise HttpException(
+                message=f"Batch can't have more than {self.max_items} items",
+                status_code=400,
+            )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *[self._run_item(request, item, semaphore) for item in items]
+        )
+        return HTTPResponse(
+            status_code=200,
+            content_type=JSON_CONTENT_TYPE,
+            raw_data=None,
+            headers=[],
+            body=b"[" + b",".join(results) + b"]",
+        )
+
+
+def build_batch_endpoint(
+    app: "TadowAPI", path: str, max_concurrency: int, max_items: int
+) -> Callable:
+    """
+    Method used to build batch endpoint of application, see BatchEndpoint.
+    :param app: TadowAPI instance
+    :param path: Path of batch endpoint, which can't be called from batch
+    :param max_concurrency: Number of sub-requests run at once
+    :param max_items: Maximum number of sub-requests in batch
+    :return: Endpoint callable
+    """
+    return BatchEndpoint(app, path, max_concurrency, max_items)
@@ -0,0 +1,225 @@
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable
+
+from tadow_api.responses import HTTPResponse
+
+if TYPE_CHECKING:
+    from tadow_api.requests import HTTPRequest
+
+
+# Rough memory used by cache entry besides its body
+_ENTRY_OVERHEAD = 256
+
+# Methods of requests without body, which can be answered from cache
+_CACHEABLE_METHODS = frozenset(["GET", "HEAD"])
+
+
+class CachedResponse:
+    """
+    Serialized response stored in cache. Strong ETag is computed once, when
+    entry is created.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        content_type: str,
+        headers: list[tuple[str, str]],
+        body: bytes,
+        etag: str | None = None,
+    ):
+        self.status_code = status_code
+        self.content_type = content_type
+        self.headers = headers
+        self.body = body
+        self.etag = etag or f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+        # Body in content encodings (e.g. gzip), filled by compression middleware
+        self.encoded_bodies: dict[str, bytes] = {}
+        # Called with number of added bytes by backend accounting entry size
+        self.on_resize: Callable[[int], None] | None = None
+
+    @property
+    def size(self) -> int:
+        return (
+            len(self.body)
+            + sum(len(body) for body in self.encoded_bodies.values())
+            + _ENTRY_OVERHEAD
+        )
+
+    def add_encoded_body(self, encoding: str, body: bytes) -> None:
+        """
+        Method used to keep body in content encoding with entry.
+        :param encoding: Content encoding, e.g. gzip
+        :param body: Encoded body
+        """
+        previous = self.encoded_bodies.get(encoding)
+        self.encoded_bodies[encoding] = body
+        if self.on_resize is not None:
+            self.on_resize(len(body) - (len(previous) if previous else 0))
+
+    @classmethod
+    def from_response(cls, response: HTTPResponse) -> "CachedResponse":
+        return cls(
+            status_code=response.status_code,
+            content_type=response.content_type,
+            headers=list(response.headers),
+            body=response.render(),
+        )
+
+    def to_response(self) -> HTTPResponse:
+        response = HTTPResponse(
+            status_code=self.status_code,
+            content_type=self.content_type,
+            raw_data=None,
+            headers=[*self.headers, ("etag", self.etag)],
+            body=self.body,
+        )
+        response.cache_entry = self
+        return response
+
+    def to_bytes(self) -> bytes:
+        """
+        Method used to serialize entry, for backends storing it out of process.
+        """
+        meta = json.dumps(
+            [self.status_code, self.content_type, self.headers, self.etag]
+        ).encode("utf-8")
+        return len(meta).to_bytes(4, "big") + meta + self.body
+
+    @classmethod
+    def from_bytes(cls, raw_data: bytes) -> "CachedResponse":
+        meta_size = int.from_bytes(raw_data[:4], "big")
+        status_code, content_type, headers, etag = json.loads(
+            raw_data[4 : 4 + meta_size]
+        )
+        return cls(
+            status_code=status_code,
+            content_type=content_type,
+            headers=[tuple(header) for header in headers],
+            body=raw_data[4 + meta_size :],
+            etag=etag,
+        )
+
+
+class BaseCacheBackend(ABC):
+    """
+    Storage of cached responses. In process backends can keep CachedResponse
+    instances, out of process ones (e.g. Redis, memcached) store
+    CachedResponse.to_bytes() and expire keys after ttl by themselves.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> CachedResponse | None:
+        pass
+
+    @abstractmethod
+    async def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        pass
+
+
+class InMemoryCacheBackend(BaseCacheBackend):
+    """
+    In process backend with TTL, evicting least recently used entries when
+    total size of entries, including their encoded bodies, exceeds max_size
+    bytes.
+    """
+
+    def __init__(self, max_size: int = 64 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[float, CachedResponse]] = OrderedDict()
+
+    async def get(self, key: str) -> CachedResponse | None:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+
+        expires_at, entry = item
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        if entry.size > self.max_size:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = (time.monotonic() + ttl, entry)
+        entry.on_resize = self._grow
+        self._grow(entry.size)
+
+    def _grow(self, added_size: int) -> None:
+        self.size += added_size
+        while self.size > self.max_size:
+            self._remove(next(iter(self._entries)))
+
+    async def delete(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        _, entry = self._entries.pop(key)
+        entry.on_resize = None
+        self.size -= entry.size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCache:
+    """
+    Cache configuration of route. Successful responses are cached for ttl
+    seconds, keyed by method, path (so also path arguments), request content
+    type (which selects response format) and values of vary_headers. Key
+    doesn't contain request body, so only GET and HEAD requests are cached.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 5.0,
+        vary_headers: list[str] | None = None,
+        backend: BaseCacheBackend | None = None,
+        methods: list[str] | None = None,
+    ):
+        self.ttl = ttl
+        self.vary_headers = [header.lower() for header in vary_headers or []]
+        self.backend = backend or InMemoryCacheBackend()
+        self.methods = frozenset(method.upper() for method in methods or ["GET"])
+        # Key doesn't contain request body, so responses to requests with body
+        # can't be cached
+        if not self.methods <= _CACHEABLE_METHODS:
+            raise AttributeError("Only GET and HEAD responses can be cached!")
+
+    def build_key(self, request: "HTTPRequest") -> str:
+        key = f"{request.http_method}:{request.url}\n{request.content_type}"
+        for header in self.vary_headers:
+            key += f"\n{header}:{request.headers.get(header, '')}"
+        return key
+
+
+def etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """
+    Method used to check if ETag is listed in If-None-Match header.
+    :param etag: Strong ETag of response
+    :param if_none_match: Value of If-None-Match header
+    :return: True if client has current version of response
+    """
+    if not if_none_match:
+        return False
+
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
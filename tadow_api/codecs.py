@@ -0,0 +1,104 @@
+import importlib.util
+import json
+from abc import ABC, abstractmethod
+from typing import Any, Type
+
+
+class JsonCodec(ABC):
+    name: str
+    # Exceptions raised by loads on invalid data
+    decode_errors: tuple[Type[Exception], ...] = (ValueError,)
+
+    @abstractmethod
+    def loads(self, raw_data: bytes) -> Any:
+        pass
+
+    def __reduce__(self):
+        # Built-in codecs hold library objects, they are looked up again on load
+        if _JSON_CODECS.get(self.name) is type(self):
+            return get_json_codec, (self.name,)
+        return super().__reduce__()
+
+    @abstractmethod
+    def dumps(self, data: Any) -> bytes:
+        pass
+
+
+class StdlibJsonCodec(JsonCodec):
+    name = "json"
+
+    def loads(self, raw_data: bytes) -> Any:
+        return json.loads(raw_data)
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data).encode("utf-8")
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    def __init__(self):
+        import orjson
+
+        self._orjson = orjson
+
+    def loads(self, raw_data: bytes) -> Any:
+        return self._orjson.loads(raw_data)
+
+    def dumps(self, data: Any) -> bytes:
+        return self._orjson.dumps(data, option=self._orjson.OPT_NON_STR_KEYS)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    def __init__(self):
+        import msgspec
+
+        self.decode_errors = (msgspec.DecodeError,)
+        self._decoder = msgspec.json.Decoder()
+        self._encoder = msgspec.json.Encoder()
+
+    def loads(self, raw_data: bytes) -> Any:
+        return self._decoder.decode(raw_data)
+
+    def dumps(self, data: Any) -> bytes:
+        return self._encoder.encode(data)
+
+
+_JSON_CODECS: dict[str, Type[JsonCodec]] = {
+    StdlibJsonCodec.name: StdlibJsonCodec,
+    OrjsonCodec.name: OrjsonCodec,
+    MsgspecCodec.name: MsgspecCodec,
+}
+
+# Codecs tried by "auto", from the fastest one
+_AUTO_PREFERENCE = (OrjsonCodec.name, MsgspecCodec.name, StdlibJsonCodec.name)
+
+_codec_instances: dict[str, JsonCodec] = {}
+
+
+def get_json_codec(codec: str | JsonCodec | None = "auto") -> JsonCodec:
+    """
+    Method used to get JSON codec by name. Codec libraries are imported on first use.
+    :param codec: Codec name ("auto", "json", "orjson", "msgspec") or JsonCodec instance,
+        "auto" picks the fastest installed library with stdlib json as fallback
+    :return: JsonCodec instance
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+
+    name = codec or "auto"
+    if name == "auto":
+        name = next(
+            codec_name
+            for codec_name in _AUTO_PREFERENCE
+            if codec_name == StdlibJsonCodec.name
+            or importlib.util.find_spec(codec_name) is not None
+        )
+
+    if name not in _codec_instances:
+        if name not in _JSON_CODECS:
+            raise AttributeError(f"JSON codec {name} not supported!")
+        _codec_instances[name] = _JSON_CODECS[name]()
+    return _codec_instances[name]
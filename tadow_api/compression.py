@@ -0,0 +1,161 @@
+import zlib
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+from tadow_api.content_parsers import iterate_async
+from tadow_api.middleware import BaseMiddleware, RequestHandler
+from tadow_api.requests import HTTPRequest
+from tadow_api.responses import HTTPResponse, StreamingResponse
+
+# zlib window bits of supported content encodings
+_ENCODING_WBITS = {
+    "gzip": 16 + zlib.MAX_WBITS,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+def negotiate_encoding(
+    accept_encoding: str | None, encodings: tuple[str, ...]
+) -> str | None:
+    """
+    Method used to pick content encoding accepted by client.
+    :param accept_encoding: Value of Accept-Encoding header
+    :param encodings: Supported encodings, in order of preference
+    :return: Encoding with highest quality, None if client accepts none of them
+    """
+    if not accept_encoding:
+        return None
+
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, parameters = item.strip().partition(";")
+        quality = 1.0
+        parameters = parameters.strip()
+        if parameters.startswith("q="):
+            try:
+                quality = float(parameters[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+
+    best_encoding, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best_encoding, best_quality = encoding, quality
+    return best_encoding
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _ENCODING_WBITS[encoding])
+    return compressor.compress(body) + compressor.flush()
+
+
+async def compress_stream(
+    content: Iterable[bytes | str] | AsyncIterable[bytes | str],
+    encoding: str,
+    level: int,
+) -> AsyncIterator[bytes]:
+    """
+    Method used to compress chunks of streamed response. Every chunk is
+    flushed, so client receives data as soon as it's produced.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, _ENCODING_WBITS[encoding])
+    async for chunk in iterate_async(content):
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        if chunk:
+            yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def _with_vary(headers: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    for key, value in headers:
+        if key.lower() == "vary" and "accept-encoding" in value.lower():
+            return headers
+    return [*headers, ("vary", "accept-encoding")]
+
+
+class CompressionMiddleware(BaseMiddleware):
+    """
+    Middleware compressing responses with gzip or deflate, negotiated with
+    Accept-Encoding header. Bodies smaller than minimum_size are sent as they
+    are, streamed responses are compressed chunk by chunk. Compressed bodies of
+    cached responses are kept with cache entry and reused on next hits.
+    """
+
+    def __init__(
+        self,
+        minimum_size: int = 500,
+        level: int = 6,
+        encodings: tuple[str, ...] = ("gzip", "deflate"),
+    ):
+        for encoding in encodings:
+            if encoding not in _ENCODING_WBITS:
+                raise AttributeError(f"Content encoding {encoding} not supported!")
+        self.minimum_size = minimum_size
+        self.level = level
+        self.encodings = encodings
+
+    async def __call__(
+        self, request: HTTPRequest, call_next: RequestHandler
+    ) -> HTTPResponse:
+        response = await call_next(request)
+        if response.status_code < 200 or response.status_code in (204, 304):
+            return response
+        if any(key.lower() == "content-encoding" for key, _ in response.headers):
+            return response
+
+        encoding = negotiate_encoding(
+            request.headers.get("accept-encoding"), self.encodings
+        )
+
+        if isinstance(response, StreamingResponse):
+            # Response may be shared with other requests, so it isn't modified
+            headers = _with_vary(response.headers)
+            content = response.content
+            if encoding is not None:
+                content = compress_stream(content, encoding, self.level)
+                headers = [*headers, ("content-encoding", encoding)]
+            return StreamingResponse(
+                content=content,
+                status_code=response.status_code,
+                content_type=response.content_type,
+                headers=headers,
+                json_codec=response.json_codec,
+            )
+
+        body = response.render()
+        if len(body) < self.minimum_size:
+            return response
+
+        headers = _with_vary(response.headers)
+        if encoding is None:
+            compressed_body = body
+        else:
+            entry = response.cache_entry
+            compressed_body = entry.encoded_bodies.get(encoding) if entry else None
+            if compressed_body is None:
+                compressed_body = compress(body, encoding, self.level)
+                if entry is not None:
+                    entry.add_encoded_body(encoding, compressed_body)
+
+            # Compressed representation differs in bytes, so its ETag is weak
+            headers = [
+                (
+                    key,
+                    f"W/{value}" if key == "etag" and value.startswith('"') else value,
+                )
+                for key, value in headers
+            ]
+            headers.append(("content-encoding", encoding))
+
+        compressed_response = HTTPResponse(
+            status_code=response.status_code,
+            content_type=response.content_type,
+            raw_data=response.raw_data,
+            headers=headers,
+            json_codec=response.json_codec,
+            body=compressed_body,
+        )
+        compressed_response.cache_entry = response.cache_entry
+        return compressed_response
@@ -0,0 +1,257 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple
+
+from tadow_api.content_parsers import JSON_CONTENT_TYPE
+from tadow_api.exceptions import HttpException
+from tadow_api.metrics import Histogram
+from tadow_api.responses import HTTPResponse
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+class BoundedThreadPool:
+    """
+    Thread pool used to run sync endpoints outside of event loop. Keeps track
+    of queued and running calls, so pool size can be tuned.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="tadow_api"
+        )
+        self.max_workers: int = self._executor._max_workers
+        self._lock = threading.Lock()
+        self._submitted = 0
+        self._started = 0
+        self._finished = 0
+
+    def __getstate__(self) -> dict:
+        # Executor and lock can't be pickled, pool is created again on load
+        return {"max_workers": self.max_workers}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(max_workers=state["max_workers"])
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Number of calls waiting for free worker.
+        """
+        return self._submitted - self._started
+
+    @property
+    def active_workers(self) -> int:
+        """
+        Number of calls currently running.
+        """
+        return self._started - self._finished
+
+    def _run(self, func: Callable, kwargs: dict[str, Any]) -> Any:
+        with self._lock:
+            self._started += 1
+        try:
+            return func(**kwargs)
+        finally:
+            with self._lock:
+                self._finished += 1
+
+    async def run(self, func: Callable, kwargs: dict[str, Any]) -> Any:
+        """
+        Method used to call function in pool and wait for result. Context
+        variables of caller are visible inside function.
+        :param func: Sync function
+        :param kwargs: Function keyword arguments
+        :return: Function result
+        """
+        context = contextvars.copy_context()
+        with self._lock:
+            self._submitted += 1
+        future = self._executor.submit(context.run, self._run, func, kwargs)
+        future.add_done_callback(self._forget_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _forget_cancelled(self, future: Future) -> None:
+        # Calls cancelled before start never reach _run
+        if future.cancelled():
+            with self._lock:
+                self._submitted -= 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class ProcessPool:
+    """
+    Process pool used to run CPU bound endpoints on all cores. Endpoint and its
+    arguments are pickled, so endpoint has to be a module level function.
+    Pool is started with application startup, or on first call.
+    """
+
+    def __init__(self, max_workers: int | None = None, start_method: str = "spawn"):
+        self.max_workers = max_workers
+        self._start_method = start_method
+        self._executor: "ProcessPoolExecutor | None" = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        if self._executor is None:
+            # Imported only by applications using process executor
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self._start_method),
+            )
+
+    async def run(
+        self, func: Callable, kwargs: dict[str, Any], timeout: float | None = None
+    ) -> Any:
+        """
+        Method used to call function in worker process and wait for result.
+        :param func: Module level sync function
+        :param kwargs: Picklable function keyword arguments
+        :param timeout: Seconds to wait for result, 504 is raised after it. Worker
+            process finishes the call anyway, it can't be interrupted.
+        :return: Function result
+        """
+        self.start()
+        future = asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, **kwargs)
+        )
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise HttpException(message="Endpoint timed out", status_code=504)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+class LimiterStats(NamedTuple):
+    active: int
+    queued: int
+    accepted: int
+    rejected: int
+    timed_out: int
+
+
+class ConcurrencyLimiter:
+    """
+    Limit of requests handled at once. Requests over limit wait in FIFO queue
+    of max_queue depth, for at most max_wait seconds. Requests which don't fit
+    into queue or wait too long are rejected with 503 and Retry-After header,
+    built from pre-rendered body instead of going through parsers.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int = 0,
+        max_wait: float | None = None,
+        retry_after: int = 1,
+    ):
+        if max_concurrency < 1:
+            raise AttributeError("max_concurrency has to be positive")
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.wait_time = Histogram()
+        self._active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._accepted = 0
+        self._rejected = 0
+        self._timed_out = 0
+
+        self._rejection_body = b'"Service unavailable"'
+        self._rejection_headers = (("retry-after", str(retry_after)),)
+        # Sent by application as it is, never passed to middlewares
+        self.rejection = self.build_rejection()
+
+    def build_rejection(self) -> HTTPResponse:
+        """
+        Method used to build 503 response from pre-rendered body and headers.
+        """
+        return HTTPResponse(
+            status_code=503,
+            content_type=JSON_CONTENT_TYPE,
+            raw_data=None,
+            headers=list(self._rejection_headers),
+            body=self._rejection_body,
+        )
+
+    async def acquire(self) -> bool:
+        """
+        Method used to take slot, waiting in queue if limit is reached.
+        :return: True if slot was taken, False if request has to be rejected
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._accepted += 1
+            self.wait_time.observe(0.0)
+            return True
+
+        if len(self._waiters) >= self.max_queue:
+            self._rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+        except asyncio.TimeoutError:
+            if not self._forget_waiter(waiter):
+                # Slot was handed over in the meantime
+                self.release()
+            self._timed_out += 1
+            return False
+        except asyncio.CancelledError:
+            if not self._forget_waiter(waiter):
+                self.release()
+            raise
+
+        self._accepted += 1
+        self.wait_time.observe(time.perf_counter() - started)
+        return True
+
+    def _forget_waiter(self, waiter: asyncio.Future) -> bool:
+        # Returns True if waiter didn't get slot yet
+        if waiter.done():
+            return False
+        waiter.cancel()
+        self._waiters.remove(waiter)
+        return True
+
+    def release(self) -> None:
+        """
+        Method used to free slot, handing it over to the oldest waiting request.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> LimiterStats:
+        return LimiterStats(
+            active=self._active,
+            queued=len(self._waiters),
+            accepted=self._accepted,
+            rejected=self._rejected,
+            timed_out=self._timed_out,
+        )
@@ -1,20 +1,99 @@
-import json
-import xml.parsers.expat
-
-import xmltodict
+import asyncio
+import importlib
 from abc import ABC, abstractmethod
-from typing import Type
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Type
+
+from tadow_api.codecs import JsonCodec, get_json_codec
+
+JSON_CONTENT_TYPE = "application/json"
+
+# Seconds for which buffered stream may hold encoded rows before sending them
+STREAM_FLUSH_INTERVAL = 0.05
+
+# Marker of exhausted async iterator
+_END = object()
+
+# Modules registering parsers of content types, imported on first use
+_LAZY_PARSER_MODULES = {"application/xml": "tadow_api.xml_stream"}
+
+
+async def iterate_async(content: Iterable | AsyncIterable) -> AsyncIterator:
+    """
+    Method used to iterate over sync and async iterables in the same way.
+    :param content: Iterable, generator, async iterable or async generator
+    """
+    if hasattr(content, "__aiter__"):
+        async for item in content:
+            yield item
+    else:
+        for item in content:
+            yield item
+
+
+async def buffer_chunks(
+    chunks: AsyncIterable[bytes], chunk_size: int, flush_interval: float
+) -> AsyncIterator[bytes]:
+    """
+    Method used to join small chunks into chunks of at least chunk_size bytes.
+    Buffered data is sent after flush_interval seconds without next chunk, so
+    slow producer doesn't hold back data which is already produced.
+    :param chunks: Async iterable of chunks
+    :param chunk_size: Minimal size of yielded chunk, except flushed ones
+    :param flush_interval: Seconds to wait for next chunk before flushing buffer
+    """
+    iterator = aiter(chunks)
+    buffer = bytearray()
+    pending = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator, _END))
+            if buffer:
+                done, _ = await asyncio.wait((pending,), timeout=flush_interval)
+                if not done:
+                    yield bytes(buffer)
+                    buffer.clear()
+                    continue
+
+            chunk = await pending
+            pending = None
+            if chunk is _END:
+                break
+            buffer += chunk
+            if len(buffer) >= chunk_size:
+                yield bytes(buffer)
+                buffer.clear()
+    finally:
+        if pending is not None:
+            pending.cancel()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _dump_row(row: Any) -> Any:
+    if hasattr(row, "model_dump"):
+        return row.model_dump(mode="json")
+    return row
 
 
 class BaseParser(ABC):
+    """
+    Parsers receive JSON codec of application as codec argument. Parsers of
+    content types not based on JSON ignore it.
+    """
+
     @classmethod
     @abstractmethod
-    def parse_request_data(cls, raw_data: bytes) -> dict:
+    def parse_request_data(
+        cls, raw_data: bytes, codec: JsonCodec | None = None
+    ) -> dict:
         pass
 
     @classmethod
     @abstractmethod
-    def parse_response_data(cls, raw_data):  # TODO Confirm typing
+    def parse_response_data(
+        cls, raw_data, codec: JsonCodec | None = None
+    ):  # TODO Confirm typing
         pass
 
 
@@ -28,53 +107,158 @@ class ContentParser:
                 cls._registered_parser = {}
 
             cls._registered_parser[content_type] = obj
+            return obj
 
         return decorator
 
     @classmethod
-    def parse_request(cls, raw_data: bytes, content_type: str) -> dict:
-        if content_type not in cls._registered_parser:
+    def get_parser(cls, content_type: str | None) -> BaseParser | None:
+        """
+        Method used to get parser of content type, importing module of built-in
+        parser on first use.
+        :param content_type: Content type
+        :return: Parser or None if content type isn't supported
+        """
+        parser = cls._registered_parser.get(content_type)
+        if parser is None and content_type in _LAZY_PARSER_MODULES:
+            importlib.import_module(_LAZY_PARSER_MODULES[content_type])
+            parser = cls._registered_parser.get(content_type)
+        return parser
+
+    @classmethod
+    def is_supported(cls, content_type: str | None) -> bool:
+        return cls.get_parser(content_type) is not None
+
+    @classmethod
+    def parse_request(
+        cls, raw_data: bytes, content_type: str, codec: JsonCodec | None = None
+    ) -> dict:
+        parser = cls.get_parser(content_type)
+        if parser is None:
+            raise AttributeError("Content type not supported!")
+        return parser.parse_request_data(raw_data=raw_data, codec=codec)
+
+    @classmethod
+    def supports_stream_parsing(cls, content_type: str | None) -> bool:
+        return hasattr(cls.get_parser(content_type), "parse_request_stream")
+
+    @classmethod
+    async def parse_request_stream(
+        cls,
+        chunks: AsyncIterable[bytes],
+        content_type: str,
+        codec: JsonCodec | None = None,
+    ) -> Any:
+        """
+        Method used to parse request data while body is received, without
+        buffering whole body.
+        :param chunks: Async iterable of body chunks
+        :param content_type: Content type of request
+        :param codec: JSON codec, default one is used if not passed
+        """
+        parser = cls.get_parser(content_type)
+        if not hasattr(parser, "parse_request_stream"):
+            raise AttributeError("Content type doesn't support stream parsing!")
+        return await parser.parse_request_stream(chunks=chunks, codec=codec)
+
+    @classmethod
+    def parse_response(
+        cls, raw_data: dict, content_type: str, codec: JsonCodec | None = None
+    ) -> bytes:
+        parser = cls.get_parser(content_type)
+        if parser is None:
             raise AttributeError("Content type not supported!")
-        parser: BaseParser = cls._registered_parser[content_type]
-        return parser.parse_request_data(raw_data=raw_data)
+        return parser.parse_response_data(raw_data=raw_data, codec=codec)
 
     @classmethod
-    def parse_response(cls, raw_data: dict, content_type: str) -> bytes:
-        if content_type not in cls._registered_parser:
+    async def stream_response(
+        cls,
+        rows: Iterable | AsyncIterable,
+        content_type: str,
+        chunk_size: int | None = None,
+        codec: JsonCodec | None = None,
+        flush_interval: float = STREAM_FLUSH_INTERVAL,
+    ) -> AsyncIterator[bytes]:
+        """
+        Method used to encode rows into chunks. Every row is sent as soon as
+        it's encoded, unless chunk_size is set.
+        :param rows: Sync or async iterable of rows
+        :param content_type: Content type of response
+        :param chunk_size: Join rows into chunks of at least chunk_size bytes,
+            for fast producers of many small rows
+        :param codec: JSON codec, default one is used if not passed
+        :param flush_interval: Seconds for which joined rows wait for next one
+        """
+        parser = cls.get_parser(content_type)
+        if parser is None:
             raise AttributeError("Content type not supported!")
-        parser: BaseParser = cls._registered_parser[content_type]
-        return parser.parse_response_data(raw_data=raw_data)
+        if not hasattr(parser, "stream_response_data"):
+            raise AttributeError("Content type doesn't support streaming!")
+
+        encoded_rows = parser.stream_response_data(rows=rows, codec=codec)
+        if chunk_size is not None:
+            encoded_rows = buffer_chunks(encoded_rows, chunk_size, flush_interval)
+        async for encoded in encoded_rows:
+            yield encoded
 
 
-@ContentParser.register_parser(content_type="application/json")
+@ContentParser.register_parser(content_type=JSON_CONTENT_TYPE)
 class ApplicationJsonParser(BaseParser):
     @classmethod
-    def parse_request_data(cls, raw_data: bytes) -> dict:
+    def parse_request_data(
+        cls, raw_data: bytes, codec: JsonCodec | None = None
+    ) -> dict:
+        codec = codec or get_json_codec()
         try:
-            return json.loads(raw_data.decode("utf-8"))
-        except json.JSONDecodeError:
+            return codec.loads(raw_data)
+        except codec.decode_errors:
             from tadow_api.exceptions import HttpException
 
             raise HttpException(status_code=400, message="Invalid request data")
 
     @classmethod
-    def parse_response_data(cls, raw_data: dict) -> bytes:
-        return json.dumps(raw_data).encode("utf-8")
+    def parse_response_data(
+        cls, raw_data: dict, codec: JsonCodec | None = None
+    ) -> bytes:
+        return (codec or get_json_codec()).dumps(raw_data)
+
+    @classmethod
+    async def stream_response_data(
+        cls, rows: Iterable | AsyncIterable, codec: JsonCodec | None = None
+    ) -> AsyncIterator[bytes]:
+        dumps = (codec or get_json_codec()).dumps
+        separator = b"["
+        async for row in iterate_async(rows):
+            yield separator + dumps(_dump_row(row))
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
 
 
-@ContentParser.register_parser(content_type="application/xml")
-class ApplicationXMLParser(BaseParser):
+@ContentParser.register_parser(content_type="application/x-ndjson")
+class ApplicationNDJsonParser(BaseParser):
     @classmethod
-    def parse_request_data(cls, raw_data: bytes) -> dict:
+    def parse_request_data(
+        cls, raw_data: bytes, codec: JsonCodec | None = None
+    ) -> list:
+        codec = codec or get_json_codec()
         try:
-            return xmltodict.parse(raw_data, encoding="utf-8")
-        except xml.parsers.expat.ExpatError:
+            return [codec.loads(line) for line in raw_data.splitlines() if line.strip()]
+        except codec.decode_errors:
             from tadow_api.exceptions import HttpException
 
             raise HttpException(status_code=400, message="Invalid request data")
 
     @classmethod
-    def parse_response_data(cls, raw_data: dict) -> bytes:
-        from dicttoxml import dicttoxml
+    def parse_response_data(
+        cls, raw_data: list, codec: JsonCodec | None = None
+    ) -> bytes:
+        dumps = (codec or get_json_codec()).dumps
+        return b"".join(dumps(row) + b"\n" for row in raw_data)
 
-        return dicttoxml(raw_data, encoding="utf-8", return_bytes=True)
+    @classmethod
+    async def stream_response_data(
+        cls, rows: Iterable | AsyncIterable, codec: JsonCodec | None = None
+    ) -> AsyncIterator[bytes]:
+        dumps = (codec or get_json_codec()).dumps
+        async for row in iterate_async(rows):
+            yield dumps(_dump_row(row)) + b"\n"
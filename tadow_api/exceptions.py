@@ -1,8 +1,8 @@
 from typing import TYPE_CHECKING
 
-from pydantic import ValidationError
-
 if TYPE_CHECKING:
+    from pydantic import ValidationError
+
     from tadow_api.requests import HTTPRequest
 
 from tadow_api.responses import HTTPResponse
@@ -17,7 +17,7 @@ class HttpException(Exception):
         self.message = message
 
 
-def handle_http_exception(
+async def handle_http_exception(
     exception: HttpException, request: "HTTPRequest"
 ) -> "HTTPResponse":
     return HTTPResponse(
@@ -29,7 +29,7 @@ def handle_http_exception(
 
 
 async def handle_validation_error(
-    exception: ValidationError, request: "HTTPRequest"
+    exception: "ValidationError", request: "HTTPRequest"
 ) -> HTTPResponse:
     return HTTPResponse(
         status_code=400,
@@ -37,3 +37,10 @@ async def handle_validation_error(
         content_type="application/json",
         headers=[],
     )
+
+
+# Handlers of exceptions raised by optional libraries, by qualified name of
+# exception class, so libraries aren't imported until they raise something
+LAZY_EXCEPTION_HANDLERS = {
+    "pydantic_core._pydantic_core.ValidationError": handle_validation_error,
+}
@@ -0,0 +1,258 @@
+import time
+from bisect import bisect_left
+from typing import TYPE_CHECKING
+
+from tadow_api.responses import HTTPResponse
+
+if TYPE_CHECKING:
+    from tadow_api.concurrency import ConcurrencyLimiter
+
+# Upper bounds of latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Phases of request handling
+PHASE_READ = "read"
+PHASE_PARSE = "parse"
+PHASE_HANDLER = "handler"
+PHASE_SERIALIZE = "serialize"
+PHASE_SEND = "send"
+PHASE_TOTAL = "total"
+PHASES = (
+    PHASE_READ,
+    PHASE_PARSE,
+    PHASE_HANDLER,
+    PHASE_SERIALIZE,
+    PHASE_SEND,
+    PHASE_TOTAL,
+)
+
+# Route label of requests which didn't match any route
+UNMATCHED_ROUTE = "<unmatched>"
+# Label of application wide concurrency limiter
+GLOBAL_LIMITER = "<global>"
+
+# Method labels, other methods sent by clients share OTHER_METHOD label
+HTTP_METHODS = frozenset(
+    ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "CONNECT", "TRACE"]
+)
+OTHER_METHOD = "OTHER"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """
+    Histogram with fixed buckets. Observing value is a single bisect and
+    counter increment, buckets are made cumulative only when exported.
+    """
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # Last count is +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def cumulative_counts(self) -> list[int]:
+        cumulative = []
+        total = 0
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class RouteMetrics:
+    """
+    Phase histograms of single route.
+    """
+
+    def __init__(self, route: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.route = route
+        self.histograms = {phase: Histogram(buckets) for phase in PHASES}
+
+    def start_timer(self) -> "PhaseTimer":
+        return PhaseTimer(self)
+
+
+class PhaseTimer:
+    """
+    Timer of single request, each lap is recorded as duration of next phase.
+    """
+
+    __slots__ = ("_histograms", "_started")
+
+    def __init__(self, route_metrics: RouteMetrics):
+        self._histograms = route_metrics.histograms
+        self._started = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._histograms[phase].observe(now - self._started)
+        self._started = now
+
+
+class Metrics:
+    """
+    Request metrics of application, per route phase latency histograms and
+    response counters by route, method and status code. Routes get their
+    RouteMetrics when route table is compiled.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.routes: dict[str, RouteMetrics] = {}
+        self.responses: dict[tuple[str, str, int], int] = {}
+        self.limiters: dict[str, "ConcurrencyLimiter"] = {}
+
+    def for_route(self, route: str) -> RouteMetrics:
+        """
+        Method used to get metrics of route, created on first use.
+        :param route: Route path
+        :return: RouteMetrics instance
+        """
+        route_metrics = self.routes.get(route)
+        if route_metrics is None:
+            route_metrics = self.routes[route] = RouteMetrics(route, self.buckets)
+        return route_metrics
+
+    def add_limiter(self, name: str, limiter: "ConcurrencyLimiter") -> None:
+        """
+        Method used to export wait time and rejections of concurrency limiter.
+        :param name: Limiter label, route path or <global>
+        :param limiter: ConcurrencyLimiter instance
+        """
+        self.limiters[name] = limiter
+
+    def count_response(self, route: str, http_method: str, status_code: int) -> None:
+        # Method comes from client, so number of its labels is bounded
+        if http_method not in HTTP_METHODS:
+            http_method = OTHER_METHOD
+        key = (route, http_method, status_code)
+        self.responses[key] = self.responses.get(key, 0) + 1
+
+    def render_prometheus(self) -> str:
+        """
+        Method used to export metrics in Prometheus text format.
+        :return: Exposition text
+        """
+        lines = [
+            "# HELP tadow_request_duration_seconds Request duration by route and phase.",
+            "# TYPE tadow_request_duration_seconds histogram",
+        ]
+        for route, route_metrics in self.routes.items():
+            for phase, histogram in route_metrics.histograms.items():
+                if histogram.count:
+                    _render_histogram(
+                        lines,
+                        "tadow_request_duration_seconds",
+                        f'route="{_escape_label(route)}",phase="{phase}"',
+                        histogram,
+                    )
+
+        lines += [
+            "# HELP tadow_responses_total Responses by route, method and status code.",
+            "# TYPE tadow_responses_total counter",
+        ]
+        for (route, http_method, status_code), count in self.responses.items():
+            lines.append(
+                f'tadow_responses_total{{route="{_escape_label(route)}",'
+                f'method="{_escape_label(http_method)}",'
+                f'status="{status_code}"}} {count}'
+            )
+
+        if self.limiters:
+            lines += [
+                "# HELP tadow_limiter_wait_seconds Time requests waited for concurrency limiter.",
+                "# TYPE tadow_limiter_wait_seconds histogram",
+            ]
+            for name, limiter in self.limiters.items():
+                _render_histogram(
+                    lines,
+                    "tadow_limiter_wait_seconds",
+                    f'limiter="{_escape_label(name)}"',
+                    limiter.wait_time,
+                )
+            lines += [
+                "# HELP tadow_limiter_rejections_total Requests rejected by concurrency limiter.",
+                "# TYPE tadow_limiter_rejections_total counter",
+            ]
+            for name, limiter in self.limiters.items():
+                stats = limiter.stats()
+                labels = f'limiter="{_escape_label(name)}"'
+                lines.append(
+                    f'tadow_limiter_rejections_total{{{labels},reason="queue_full"}}'
+                    f" {stats.rejected}"
+                )
+                lines.append(
+                    f'tadow_limiter_rejections_total{{{labels},reason="timeout"}}'
+                    f" {stats.timed_out}"
+                )
+            lines += [
+                "# HELP tadow_limiter_queued Requests waiting for concurrency limiter.",
+                "# TYPE tadow_limiter_queued gauge",
+            ]
+            for name, limiter in self.limiters.items():
+                lines.append(
+                    f'tadow_limiter_queued{{limiter="{_escape_label(name)}"}}'
+                    f" {limiter.stats().queued}"
+                )
+        return "\n".join(lines) + "\n"
+
+    async def serve_prometheus(self) -> HTTPResponse:
+        return HTTPResponse(
+            status_code=200,
+            content_type=PROMETHEUS_CONTENT_TYPE,
+            raw_data=None,
+            headers=[],
+            body=self.render_prometheus().encode("utf-8"),
+        )
+
+    def build_endpoint(self):
+        """
+        Method used to build endpoint exposing metrics, see TadowAPI.add_metrics_endpoint.
+        Bound method is used, so endpoint can be pickled into app snapshot.
+        """
+        return self.serve_prometheus
+
+
+def _render_histogram(
+    lines: list[str], name: str, labels: str, histogram: Histogram
+) -> None:
+    bounds = [_format_float(bound) for bound in histogram.buckets] + ["+Inf"]
+    for bound, count in zip(bounds, histogram.cumulative_counts()):
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+    lines.append(f"{name}_sum{{{labels}}} {_format_float(histogram.sum)}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
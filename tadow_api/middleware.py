@@ -1,14 +1,47 @@
-from abc import abstractmethod, ABC
+import functools
+from abc import ABC
+from typing import Awaitable, Callable
 
 from tadow_api.requests import HTTPRequest
 from tadow_api.responses import HTTPResponse
 
+RequestHandler = Callable[[HTTPRequest], Awaitable[HTTPResponse]]
+
 
 class BaseMiddleware(ABC):
-    @abstractmethod
+    """
+    Middleware wraps handling of request. It receives request and call_next,
+    which runs remaining middlewares and endpoint. Middleware may return its
+    own response without calling call_next.
+    Middlewares which only inspect request and response can override
+    handle_request and handle_response hooks instead of __call__.
+    """
+
+    async def __call__(
+        self, request: HTTPRequest, call_next: RequestHandler
+    ) -> HTTPResponse:
+        self.handle_request(request)
+        response = await call_next(request)
+        self.handle_response(response)
+        return response
+
     def handle_request(self, request: HTTPRequest):
         pass
 
-    @abstractmethod
     def handle_response(self, response: HTTPResponse):
         pass
+
+
+def build_middleware_chain(
+    middlewares: list[BaseMiddleware], handler: RequestHandler
+) -> RequestHandler:
+    """
+    Method used to compose middlewares around handler into single callable.
+    First middleware is the outermost one.
+    :param middlewares: List of middlewares
+    :param handler: Innermost request handler
+    :return: Request handler running all middlewares
+    """
+    for middleware in reversed(middlewares):
+        handler = functools.partial(middleware, call_next=handler)
+    return handler
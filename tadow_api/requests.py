@@ -1,32 +1,101 @@
-from typing import Callable, Type, TYPE_CHECKING
+from types import SimpleNamespace
+from typing import AsyncIterator, Callable, Iterator, Type, TYPE_CHECKING
 
-from pydantic import BaseModel
-
-from tadow_api.content_parsers import ContentParser
+from tadow_api.codecs import JsonCodec
+from tadow_api.content_parsers import JSON_CONTENT_TYPE, ContentParser
+from tadow_api.exceptions import HttpException
 
 if TYPE_CHECKING:
-    from tadow_api.middleware import BaseMiddleware
+    from pydantic import BaseModel, TypeAdapter
+
+    from tadow_api.app import TadowAPI
+    from tadow_api.background import BackgroundTasks
+    from tadow_api.routing import APIRoute
+
+# Marker of request data which wasn't parsed yet
+_NOT_LOADED = object()
+
+# Pre-encoded names of headers read for every request
+_CONTENT_TYPE_KEY = b"content-type"
+_CONTENT_LENGTH_KEY = b"content-length"
+_TRANSFER_ENCODING_KEY = b"transfer-encoding"
 
 
-def get_header_from_scope(scope: dict, key: str) -> str | None:
+class Headers:
     """
-    Method used to get header by name from scope.
-    :param scope: Scope dict
-    :param key: Name of header
-    :return: Value of header
+    Case-insensitive multi-map of raw ASGI headers. Index is built in a single
+    pass over header list, values are decoded only when accessed.
     """
-    try:
-        raw_header: bytes = next(
-            filter(
-                lambda header: header[0] == key.encode("utf-8"), scope.get("headers")
-            )
-        )[1]
-        return raw_header.decode("utf-8")
-    except (StopIteration, KeyError):
-        return None
+
+    __slots__ = ("raw", "_index")
+
+    def __init__(self, raw_headers: list[tuple[bytes, bytes]] | None = None):
+        self.raw = raw_headers or []
+        self._index: dict[bytes, list[bytes]] = {}
+
+        index = self._index
+        for key, value in self.raw:
+            key = key.lower()
+            values = index.get(key)
+            if values is None:
+                index[key] = [value]
+            else:
+                values.append(value)
+
+    @staticmethod
+    def _encode_key(key: str | bytes) -> bytes:
+        if isinstance(key, str):
+            key = key.encode("latin-1")
+        # Lowercase keys, like pre-encoded ones, are used as they are
+        return key if key.islower() else key.lower()
+
+    def get_raw(self, key: str | bytes) -> bytes | None:
+        """
+        Method used to get first value of header without decoding it.
+        :param key: Name of header
+        :return: Raw value of header
+        """
+        values = self._index.get(self._encode_key(key))
+        return values[0] if values else None
+
+    def get(self, key: str | bytes, default: str | None = None) -> str | None:
+        """
+        Method used to get first value of header.
+        :param key: Name of header
+        :param default: Value returned if header is missing
+        :return: Value of header
+        """
+        values = self._index.get(self._encode_key(key))
+        return values[0].decode("latin-1") if values else default
+
+    def getlist(self, key: str | bytes) -> list[str]:
+        return [
+            value.decode("latin-1")
+            for value in self._index.get(self._encode_key(key), [])
+        ]
+
+    def __getitem__(self, key: str | bytes) -> str:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str | bytes) -> bool:
+        return self._encode_key(key) in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return (key.decode("latin-1") for key in self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"<Headers {[(key, value) for key, value in self.raw]} >"
 
 
 class Cookie:
+    __slots__ = ("name", "value", "expires", "domain", "secure", "http_only")
+
     def __init__(
         self,
         name: str,
@@ -49,61 +118,290 @@ class Cookie:
         if not header_value:
             return cookies
 
-        for raw_cookie in header_value.split("; "):
-            cookie_name, cookie_value = raw_cookie.split("=")
-            cookies[cookie_name] = Cookie(cookie_name, cookie_value)
+        for raw_cookie in header_value.split(";"):
+            cookie_name, _, cookie_value = raw_cookie.strip().partition("=")
+            if cookie_name:
+                cookies[cookie_name] = Cookie(cookie_name, cookie_value)
         return cookies
 
 
 class HTTPRequest:
+    __slots__ = (
+        "http_method",
+        "url",
+        "headers",
+        "_cookies",
+        "content_type",
+        "content_length",
+        "max_body_size",
+        "json_codec",
+        "http_version",
+        "app",
+        "route",
+        "background_tasks",
+        "_state",
+        "_receive",
+        "_body",
+        "_stream_consumed",
+        "_raw_data",
+        "_validation_model",
+        "_validator",
+        "_data",
+    )
+
     def __init__(
         self,
         http_method: str,
         url: str,
-        cookies: dict[str, Cookie],
+        cookies: dict[str, Cookie] | None,
         content_type: str,
-        raw_data: dict,
+        raw_data: dict | None,
+        receive: Callable | None = None,
+        content_length: int | None = None,
+        max_body_size: int | None = None,
+        json_codec: JsonCodec | None = None,
+        headers: Headers | None = None,
+        http_version: str = "1.1",
+        app: "TadowAPI | None" = None,
     ):
         self.http_method = http_method
         self.url = url
-        self.cookies = cookies
+        self.headers = headers if headers is not None else Headers()
+        self._cookies = cookies
         self.content_type = content_type
+        self.content_length = content_length
+        self.max_body_size = max_body_size
+        self.json_codec = json_codec
+        self.http_version = http_version
+        self.app = app
+        # Route matched by application
+        self.route: "APIRoute | None" = None
+        # Tasks scheduled by endpoint, run after response is sent
+        self.background_tasks: "BackgroundTasks | None" = None
+        # Attributes set by middlewares (e.g. authenticated user), created on use
+        self._state: SimpleNamespace | None = None
+
+        # Body fields
+        self._receive = receive
+        self._body: bytes | None = None if receive else b""
+        self._stream_consumed = False
 
-        # Data fields
+        # Data fields, parsed and validated on first access
         self._raw_data = raw_data
-        self.data = None
+        self._validation_model = None
+        self._validator: "TypeAdapter | None" = None
+        self._data = _NOT_LOADED
 
-    def validate_request_data(
-        self, validation_model: BaseModel | Type[BaseModel] | None
-    ) -> None:
-        if not self._raw_data:
+    @property
+    def state(self) -> SimpleNamespace:
+        """
+        Namespace for per-request attributes, e.g. request.state.user set by
+        authentication middleware.
+        """
+        if self._state is None:
+            self._state = SimpleNamespace()
+        return self._state
+
+    @property
+    def has_body(self) -> bool:
+        """
+        Check if client declared request body, with content-length or chunked
+        encoding. HTTP/2 requests may send body without any of them.
+        """
+        if self.content_length is not None:
+            return self.content_length > 0
+        return _TRANSFER_ENCODING_KEY in self.headers or self.http_version == "2"
+
+    @property
+    def data(self):
+        """
+        Request data, parsed and validated on first access. None for requests
+        without body, or with body consumed by endpoint (streamed requests).
+        Body is read by route, so middlewares have to await receive_data()
+        before accessing data.
+        """
+        if self._data is _NOT_LOADED:
+            if (
+                self.has_body
+                and not self.body_received
+                and not self._stream_consumed
+                and (self.route is None or not self.route.stream_request_body)
+            ):
+                raise RuntimeError(
+                    "Request body wasn't received, await request.receive_data() first"
+                )
+            self._data = self._load_data()
+        return self._data
+
+    @data.setter
+    def data(self, value) -> None:
+        self._data = value
+
+    @property
+    def body_received(self) -> bool:
+        """
+        Check if body was read, or parsed while it was received.
+        """
+        return self._body is not None or self._raw_data is not None
+
+    @property
+    def cookies(self) -> dict[str, Cookie]:
+        """
+        Cookies parsed from cookie header on first access.
+        """
+        if self._cookies is None:
+            self._cookies = Cookie.parse_cookies_from_header(
+                "; ".join(self.headers.getlist("cookie"))
+            )
+        return self._cookies
+
+    def _raise_body_too_large(self) -> None:
+        raise HttpException(
+            message=f"Request body exceeds {self.max_body_size} bytes",
+            status_code=413,
+        )
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """
+        Method used to iterate over request body chunks as they are received,
+        without buffering whole body.
+        """
+        if self._body is not None:
+            if self._body:
+                yield self._body
             return
 
-        if validation_model:
-            self.data = validation_model(**self._raw_data)
+        if self._stream_consumed:
+            raise RuntimeError("Request body stream already consumed")
+        self._stream_consumed = True
+
+        max_body_size = self.max_body_size
+        if (
+            max_body_size is not None
+            and self.content_length is not None
+            and self.content_length > max_body_size
+        ):
+            self._raise_body_too_large()
+
+        received_size = 0
+        more_body = True
+        while more_body:
+            message: dict = await self._receive()
+            if message["type"] == "http.disconnect":
+                raise HttpException(message="Client disconnected", status_code=400)
+
+            chunk: bytes = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            received_size += len(chunk)
+            if max_body_size is not None and received_size > max_body_size:
+                self._raise_body_too_large()
+            if chunk:
+                yield chunk
+
+    async def body(self) -> bytes:
+        """
+        Method used to read whole request body. Result is memoized.
+        :return: Request body
+        """
+        if self._body is None:
+            self._body = b"".join([chunk async for chunk in self.stream()])
+        return self._body
+
+    async def receive_data(self) -> None:
+        """
+        Method used to parse request data while body is received, if content
+        type has streaming parser, so whole body isn't kept in memory. Body of
+        other content types is read with body(). Body can't be read again after
+        streaming parsing. Middlewares can call it to access data, body is read
+        with body size limit of application then.
+        """
+        if self.body_received:
+            return
+        if ContentParser.supports_stream_parsing(self.content_type):
+            self._raw_data = await ContentParser.parse_request_stream(
+                self.stream(), content_type=self.content_type, codec=self.json_codec
+            )
         else:
-            self.data = self._raw_data
+            await self.body()
+
+    def _load_data(self):
+        raw_data = self._raw_data
+        validator = self._validator
+        if raw_data is None:
+            if not self._body:
+                return None
+
+            # Validate JSON straight from bytes, without intermediate dict
+            if validator is not None and self.content_type == JSON_CONTENT_TYPE:
+                return validator.validate_json(self._body)
+
+            if not ContentParser.is_supported(self.content_type):
+                raise HttpException(message="Unsupported content type", status_code=415)
+            raw_data = self._raw_data = ContentParser.parse_request(
+                raw_data=self._body,
+                content_type=self.content_type,
+                codec=self.json_codec,
+            )
+
+        if not raw_data:
+            return None
+        if validator is not None:
+            return validator.validate_python(raw_data)
+        if self._validation_model:
+            return self._validation_model(**raw_data)
+        return raw_data
+
+    def validate_request_data(
+        self,
+        validation_model: "BaseModel | Type[BaseModel] | None",
+        validator: "TypeAdapter | None" = None,
+    ) -> None:
+        """
+        Method used to set model validating request data. Parsing and validation
+        are deferred until data is accessed.
+        :param validation_model: Pydantic model or None
+        :param validator: Precompiled validator of validation model
+        """
+        self._validation_model = validation_model
+        self._validator = validator
+        self._data = _NOT_LOADED
 
     @classmethod
     async def create_request(
-        cls, scope: dict, receive: Callable, middlewares: list["BaseMiddleware"]
+        cls,
+        scope: dict,
+        receive: Callable,
+        max_body_size: int | None = None,
+        json_codec: JsonCodec | None = None,
+        app: "TadowAPI | None" = None,
     ) -> "HTTPRequest":
-        request_raw_data: dict = await receive()
-        content_type = get_header_from_scope(scope, "content-type")
+        headers = Headers(scope.get("headers"))
+
+        content_type = headers.get(_CONTENT_TYPE_KEY)
+        if content_type and ";" in content_type:
+            # Drop parameters, like charset
+            content_type = content_type.partition(";")[0].strip()
+
+        content_length = headers.get_raw(_CONTENT_LENGTH_KEY)
+        try:
+            content_length = int(content_length) if content_length else None
+        except ValueError:
+            raise HttpException(message="Invalid content length", status_code=400)
 
         request_instance: HTTPRequest = cls(
             http_method=scope.get("method"),
             url=scope.get("path"),
-            cookies=Cookie.parse_cookies_from_header(
-                get_header_from_scope(scope, "cookies")
-            ),
+            cookies=None,
             content_type=content_type,
-            raw_data=ContentParser.parse_request(
-                raw_data=request_raw_data.get("body"), content_type=content_type
-            ),
+            raw_data=None,
+            receive=receive,
+            content_length=content_length,
+            max_body_size=max_body_size,
+            headers=headers,
+            json_codec=json_codec,
+            http_version=scope.get("http_version", "1.1"),
+            app=app,
         )
 
-        for middleware in middlewares:
-            middleware.handle_request(request=request_instance)
-
         return request_instance
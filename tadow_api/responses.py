@@ -1,38 +1,129 @@
-from typing import Any, TYPE_CHECKING, Type
+from typing import Any, AsyncIterable, Iterable, Sequence, TYPE_CHECKING, Type
 
-from pydantic import BaseModel
-from tadow_api.content_parsers import ContentParser
+from tadow_api.codecs import JsonCodec
+from tadow_api.content_parsers import (
+    JSON_CONTENT_TYPE,
+    ContentParser,
+    iterate_async,
+)
+
+from tadow_api.validation import build_validator, is_model
 
 if TYPE_CHECKING:
+    from pydantic import BaseModel, TypeAdapter
+
     from tadow_api.requests import HTTPRequest
 
 
 _SIMPLE_TYPES = [int, str, dict, list]
 
+# Content type of responses to requests without content type
+DEFAULT_CONTENT_TYPE = JSON_CONTENT_TYPE
+
+# Pre-encoded content type headers, bounded as content type may come from client
+_CONTENT_TYPE_HEADERS: dict[str, tuple[tuple[bytes, bytes], ...]] = {}
+_CONTENT_TYPE_HEADERS_SIZE = 256
+
+
+def encode_content_type_header(content_type: str) -> tuple[tuple[bytes, bytes], ...]:
+    """
+    Method used to get raw ASGI content type header, encoded once per content type.
+    :param content_type: Content type of response
+    :return: Tuple with single raw header
+    """
+    header = _CONTENT_TYPE_HEADERS.get(content_type)
+    if header is None:
+        header = ((b"content-type", content_type.encode("latin-1")),)
+        if len(_CONTENT_TYPE_HEADERS) < _CONTENT_TYPE_HEADERS_SIZE:
+            _CONTENT_TYPE_HEADERS[content_type] = header
+    return header
+
 
 class HTTPResponse:
+    __slots__ = (
+        "status_code",
+        "raw_data",
+        "content_type",
+        "headers",
+        "json_codec",
+        "body",
+        "cache_entry",
+    )
+
     def __init__(
         self,
         status_code: int,
         content_type: str,
         raw_data: _SIMPLE_TYPES,
         headers: list[tuple[str, str]],
+        json_codec: JsonCodec | None = None,
+        body: bytes | None = None,
     ):
         self.status_code = status_code
         self.raw_data = raw_data
         self.content_type = content_type
         self.headers = headers
+        self.json_codec = json_codec
+        # Already serialized raw_data, parser is skipped if set
+        self.body = body
+        # Cache entry response was built from, see tadow_api.caching
+        self.cache_entry = None
 
-    async def send_response(self, send):
-        response_body: bytes = ContentParser.parse_response(
-            content_type=self.content_type, raw_data=self.raw_data
+    def render(self) -> bytes:
+        """
+        Method used to serialize raw_data with parser of response content type.
+        Result is memoized in body.
+        :return: Response body
+        """
+        if self.body is None:
+            self.body = ContentParser.parse_response(
+                content_type=self.content_type,
+                raw_data=self.raw_data,
+                codec=self.json_codec,
+            )
+        return self.body
+
+    def copy(self) -> "HTTPResponse":
+        """
+        Method used to copy rendered response, so one response can be sent to
+        many requests, each of them modifying its own headers.
+        :return: HTTPResponse instance with the same body
+        """
+        response = HTTPResponse(
+            status_code=self.status_code,
+            content_type=self.content_type,
+            raw_data=self.raw_data,
+            headers=list(self.headers),
+            json_codec=self.json_codec,
+            body=self.render(),
         )
+        response.cache_entry = self.cache_entry
+        return response
+
+    def build_headers(self) -> Sequence[tuple[bytes, bytes]]:
+        """
+        Method used to build raw ASGI headers, content type and custom headers.
+        Responses without custom headers share pre-encoded content type header.
+        """
+        content_type_header = encode_content_type_header(self.content_type)
+        if not self.headers:
+            return content_type_header
+        return [
+            *content_type_header,
+            *[
+                (key.encode("latin-1"), value.encode("latin-1"))
+                for key, value in self.headers
+            ],
+        ]
+
+    async def send_response(self, send):
+        response_body = self.render()
 
         await send(
             {
                 "type": "http.response.start",
                 "status": self.status_code,
-                "headers": [[b"content-type", self.content_type]],
+                "headers": self.build_headers(),
             }
         )
         await send({"type": "http.response.body", "body": response_body})
@@ -41,26 +132,136 @@ class HTTPResponse:
     def create_response(
         cls,
         request: "HTTPRequest",
-        validation_model: BaseModel | Type[BaseModel] | None = None,
-        *args: Any,
+        validation_model: "BaseModel | Type[BaseModel] | None" = None,
+        content: Any = None,
+        *,
+        validator: "TypeAdapter | None" = None,
     ) -> "HTTPResponse":
-        # Unpack function response
-        function_response, status_code, cookies = tuple(list(*args) + [None] * 3)[:3]
+        """
+        Method used to build response from endpoint result.
+        :param request: HTTPRequest instance
+        :param validation_model: Response model
+        :param content: Endpoint result, content or (content, status_code) tuple.
+            Further items (cookies) aren't sent yet
+        :param validator: Precompiled validator of response model
+        :return: HTTPResponse instance
+        """
+        # Unpack function response, without building intermediate sequences
+        status_code = None
+        if isinstance(content, tuple):
+            content_length = len(content)
+            function_response = content[0] if content_length else None
+            if content_length > 1:
+                status_code = content[1]
+        else:
+            function_response = content
+
+        # Endpoint built response by itself
+        if isinstance(function_response, HTTPResponse):
+            return function_response
 
-        # Serialize response to bytes
-        raw_data = function_response
-        if isinstance(function_response, BaseModel):
-            raw_data = function_response.model_dump()
+        content_type = request.content_type or DEFAULT_CONTENT_TYPE
 
         # Validate response
-        if validation_model:
-            raw_data = validation_model(raw_data).model_dump()
+        if validation_model and validator is None:
+            validator = build_validator(validation_model)
+        if validator is not None:
+            function_response = validator.validate_python(function_response)
+
+        # Serialize models to bytes in a single pass for JSON, to dict otherwise
+        raw_data, body = function_response, None
+        if validator is not None or is_model(function_response):
+            if content_type == JSON_CONTENT_TYPE:
+                if validator is not None:
+                    body = validator.dump_json(function_response)
+                else:
+                    body = function_response.model_dump_json().encode("utf-8")
+            elif validator is not None:
+                raw_data = validator.dump_python(function_response)
+            else:
+                raw_data = function_response.model_dump()
 
         return cls(
             status_code=status_code or 200,
-            content_type=request.content_type,
+            content_type=content_type,
             raw_data=raw_data,
             headers=[
                 # ('cookies', )
             ],
+            json_codec=request.json_codec,
+            body=body,
+        )
+
+
+class StreamingResponse(HTTPResponse):
+    """
+    Response sent in chunks, as they are produced by sync or async iterable.
+    Each chunk is awaited on ASGI send, so slow clients slow down the producer
+    instead of piling chunks up in memory.
+    """
+
+    __slots__ = ("content",)
+
+    def __init__(
+        self,
+        content: Iterable[bytes | str] | AsyncIterable[bytes | str],
+        status_code: int = 200,
+        content_type: str = "application/octet-stream",
+        headers: list[tuple[str, str]] | None = None,
+        json_codec: JsonCodec | None = None,
+    ):
+        super().__init__(
+            status_code=status_code,
+            content_type=content_type,
+            raw_data=None,
+            headers=headers or [],
+            json_codec=json_codec,
+        )
+        self.content = content
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable | AsyncIterable,
+        content_type: str = JSON_CONTENT_TYPE,
+        status_code: int = 200,
+        headers: list[tuple[str, str]] | None = None,
+        json_codec: JsonCodec | None = None,
+        chunk_size: int | None = None,
+    ) -> "StreamingResponse":
+        """
+        Method used to create response which encodes rows one at a time, with
+        streaming encoder of parser registered for content type
+        (e.g. JSON array for application/json, NDJSON for application/x-ndjson).
+        Every row is sent as soon as it's encoded, fast producers of many small
+        rows can join them into chunks of at least chunk_size bytes.
+        """
+        return cls(
+            content=ContentParser.stream_response(
+                rows,
+                content_type=content_type,
+                chunk_size=chunk_size,
+                codec=json_codec,
+            ),
+            status_code=status_code,
+            content_type=content_type,
+            headers=headers,
+            json_codec=json_codec,
+        )
+
+    async def send_response(self, send):
+        await send(
+            {
+                "type": "http.response.start",
+                "status": self.status_code,
+                "headers": self.build_headers(),
+            }
         )
+        async for chunk in iterate_async(self.content):
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            if chunk:
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
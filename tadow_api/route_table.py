@@ -0,0 +1,127 @@
+import re
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, NamedTuple
+
+from tadow_api.exceptions import HttpException
+from tadow_api.requests import HTTPRequest
+from tadow_api.routing import APIRoute
+from tadow_api.url_dispatcher import BaseURLDispatcher, is_static_pattern
+
+
+_GROUP_NAME = re.compile(r"\(\?P<\w+>")
+
+
+def find_route_conflicts(paths: list[str]) -> list[tuple[str, str]]:
+    """
+    Method used to find route patterns matching exactly the same URLs, which
+    differ only in names of path arguments. Only first of them is ever matched.
+    :param paths: Route path regexes
+    :return: Pairs of conflicting paths
+    """
+    conflicts = []
+    seen: dict[str, str] = {}
+    for path in paths:
+        normalized = _GROUP_NAME.sub("(?P<>", path)
+        if normalized in seen:
+            conflicts.append((seen[normalized], path))
+        else:
+            seen[normalized] = path
+    return conflicts
+
+
+class RouteCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class RouteTable:
+    """
+    Frozen snapshot of application routes. Routes without regex metacharacters
+    are resolved with an exact match dict, remaining routes are compiled once by
+    the URL dispatcher. Resolved (method, path) pairs are kept in a bounded LRU cache.
+    Conflicting routes are rejected when table is built.
+    """
+
+    def __init__(
+        self,
+        registered_routes: dict[str, APIRoute],
+        url_dispatcher: BaseURLDispatcher,
+        cache_size: int = 1024,
+    ):
+        self.routes = MappingProxyType(dict(registered_routes))
+        conflicts = find_route_conflicts(list(self.routes))
+        if conflicts:
+            raise AttributeError(
+                "Conflicting routes: "
+                + ", ".join(f"{first} and {second}" for first, second in conflicts)
+            )
+        self._url_dispatcher = url_dispatcher
+        self._static_routes: dict[str, APIRoute] = {}
+        self._dynamic_routes: dict[str, APIRoute] = {}
+
+        for path, route in self.routes.items():
+            if is_static_pattern(path):
+                self._static_routes[path] = route
+            else:
+                self._dynamic_routes[path] = route
+        url_dispatcher.compile(self._dynamic_routes)
+
+        self._cache: OrderedDict[tuple[str, str], tuple[APIRoute, dict[str, Any]]]
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._hits = 0
+        self._misses = 0
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["routes"] = dict(self.routes)
+        state["_cache"] = OrderedDict()
+        state["_hits"] = state["_misses"] = 0
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.routes = MappingProxyType(self.routes)
+
+    def resolve(self, request: HTTPRequest) -> tuple[APIRoute, dict[str, Any]]:
+        """
+        Method used to find route and path arguments for request.
+        :param request: HTTPRequest instance
+        :return: Matched route and path arguments
+        """
+        key = (request.http_method, request.url)
+        resolved = self._cache.get(key)
+        if resolved is not None:
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return resolved
+
+        self._misses += 1
+        route = self._static_routes.get(request.url)
+        if route is not None:
+            if request.http_method not in route.methods:
+                raise HttpException(message="Method not allowed", status_code=403)
+            resolved = route, {}
+        else:
+            resolved = self._url_dispatcher(self._dynamic_routes, request)
+
+        if self._cache_size > 0:
+            self._cache[key] = resolved
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return resolved
+
+    def cache_info(self) -> RouteCacheInfo:
+        return RouteCacheInfo(
+            hits=self._hits,
+            misses=self._misses,
+            maxsize=self._cache_size,
+            currsize=len(self._cache),
+        )
+
+    def cache_clear(self) -> None:
+        self._cache.clear()
+        self._hits = self._misses = 0
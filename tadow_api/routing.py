@@ -1,11 +1,85 @@
 import asyncio
+import functools
 import inspect
-from typing import Callable, Type
-
-from pydantic import BaseModel
+import re
+import types
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Hashable,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
 
+from tadow_api.background import BackgroundTasks
+from tadow_api.caching import CachedResponse, ResponseCache, etag_matches
+from tadow_api.concurrency import ConcurrencyLimiter
+from tadow_api.metrics import (
+    PHASE_HANDLER,
+    PHASE_PARSE,
+    PHASE_READ,
+    PHASE_SERIALIZE,
+    RouteMetrics,
+)
 from tadow_api.requests import HTTPRequest
-from tadow_api.responses import HTTPResponse
+from tadow_api.responses import HTTPResponse, StreamingResponse
+from tadow_api.state import AppState
+from tadow_api.validation import build_validator, is_model_class
+
+if TYPE_CHECKING:
+    from pydantic import BaseModel
+
+
+# Converters for path arguments, None means that value is passed as is. Other
+# annotations (e.g. UUID) are used as converters by themselves
+_FAST_CONVERTERS: dict[Any, Callable | None] = {
+    str: None,
+    int: int,
+    float: float,
+}
+
+# Executors of sync endpoints
+EXECUTOR_THREAD = "thread"
+EXECUTOR_INLINE = "inline"
+EXECUTOR_PROCESS = "process"
+_EXECUTORS = (EXECUTOR_THREAD, EXECUTOR_INLINE, EXECUTOR_PROCESS)
+
+# Methods of requests coalesced by default key
+_COALESCED_METHODS = frozenset(("GET", "HEAD"))
+
+# Parameter sources
+_SOURCE_PATH = 0
+_SOURCE_REQUEST = 1
+_SOURCE_DATA = 2
+_SOURCE_STATE = 3
+_SOURCE_BACKGROUND = 4
+
+
+def _unwrap_optional(annotation: Any) -> Any:
+    """
+    Method used to get type from Optional[...] or ... | None annotation.
+    """
+    if get_origin(annotation) in (Union, types.UnionType):
+        arguments = [
+            argument for argument in get_args(annotation) if argument is not type(None)
+        ]
+        if len(arguments) == 1:
+            return arguments[0]
+    return annotation
+
+
+def _convert_to_model(model: Type["BaseModel"], value: Any) -> "BaseModel":
+    if isinstance(value, model):
+        return value
+    return model.model_validate(value)
+
+
+def _build_model_converter(model: Type["BaseModel"]) -> Callable:
+    # Partial of module level function can be pickled into app snapshot
+    return functools.partial(_convert_to_model, model)
 
 
 class APIRoute:
@@ -14,50 +88,362 @@ class APIRoute:
         path: str,
         endpoint_func: Callable,
         methods: list[str] | None = None,
-        request_model: BaseModel | Type[BaseModel] | None = None,
-        response_model: BaseModel | Type[BaseModel] | None = None,
+        request_model: "BaseModel | Type[BaseModel] | None" = None,
+        response_model: "BaseModel | Type[BaseModel] | None" = None,
+        max_body_size: int | None = None,
+        stream_request_body: bool = False,
+        executor: str = EXECUTOR_THREAD,
+        timeout: float | None = None,
+        cache: ResponseCache | None = None,
+        coalesce: bool | Callable[[HTTPRequest, dict], Hashable] = False,
+        concurrency_limiter: ConcurrencyLimiter | None = None,
     ):
+        if executor not in _EXECUTORS:
+            raise AttributeError(f"Executor {executor} not supported!")
+
         self.path = path
         self.endpoint_func = endpoint_func
         self.methods = methods or ["GET"]
         self.request_model = request_model
         self.response_model = response_model
+        self.max_body_size = max_body_size
+        self.stream_request_body = stream_request_body
+        self.executor = executor
+        self.timeout = timeout
+        self.cache = cache
+        self.coalesce = coalesce
+        self.concurrency_limiter = concurrency_limiter
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        # Phase histograms, set by application with metrics enabled
+        self.metrics: RouteMetrics | None = None
 
-    def _check_endpoint_arguments(self, request: HTTPRequest, **kwargs):
-        signature = inspect.signature(self.endpoint_func)
-        extended_kwargs = {"request": request, **kwargs}
+        # Resolve everything needed to call endpoint once, at registration
+        self._request_validator = (
+            build_validator(request_model) if request_model else None
+        )
+        self._response_validator = (
+            build_validator(response_model) if response_model else None
+        )
+        self.path_groups = frozenset(re.compile(path).groupindex)
+        self._is_coroutine = asyncio.iscoroutinefunction(
+            endpoint_func
+        ) or asyncio.iscoroutinefunction(getattr(endpoint_func, "__call__", None))
+        # Binder before binding to application state, see bind_state
+        self._unbound_parameters = self._build_argument_binder()
+        self._endpoint_parameters = self._unbound_parameters
+        # Endpoints without request can't read body, so data may be parsed
+        # while body is received
+        self._takes_request = any(
+            source == _SOURCE_REQUEST for _, source, _, _ in self._endpoint_parameters
+        )
 
-        if len(signature.parameters) <= 0:
-            return {}
-        # Create dict of all available arguments and return all that match signature
-        function_arguments = {}
+        if executor == EXECUTOR_PROCESS:
+            if self._is_coroutine:
+                raise AttributeError(f"{path}: async endpoint can't run in process")
+            if any(
+                source == _SOURCE_REQUEST
+                for _, source, _, _ in self._endpoint_parameters
+            ):
+                raise AttributeError(
+                    f"{path}: request can't be passed to process, use data parameter"
+                )
+            if any(
+                source == _SOURCE_BACKGROUND
+                for _, source, _, _ in self._endpoint_parameters
+            ):
+                raise AttributeError(
+                    f"{path}: background tasks can't be scheduled from process"
+                )
+
+    def __getstate__(self) -> dict:
+        # Validators are cheaper to rebuild than to unpickle, in-flight calls
+        # belong to running application
+        state = self.__dict__.copy()
+        state["_request_validator"] = state["_response_validator"] = None
+        state["_in_flight"] = {}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        if self.request_model:
+            self._request_validator = build_validator(self.request_model)
+        if self.response_model:
+            self._response_validator = build_validator(self.response_model)
+
+    def _build_argument_binder(
+        self,
+    ) -> tuple[tuple[str, int, Callable | None, bool], ...]:
+        """
+        Method used to inspect endpoint signature and resolve source and converter
+        of each parameter.
+        :return: Tuple of (name, source, converter, required) items
+        """
+        endpoint_parameters = []
 
         parameter: inspect.Parameter
-        for _, parameter in signature.parameters.items():
-            # Perform mapping, if parameter is annotated
-            if parameter.annotation is not parameter.empty:
-                function_arguments[parameter.name] = parameter.annotation(
-                    extended_kwargs[parameter.name]
+        for parameter in inspect.signature(self.endpoint_func).parameters.values():
+            if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+                continue
+            annotation = _unwrap_optional(parameter.annotation)
+            required = parameter.default is parameter.empty
+
+            if parameter.name == "request" or (
+                inspect.isclass(annotation) and issubclass(annotation, HTTPRequest)
+            ):
+                endpoint_parameters.append(
+                    (parameter.name, _SOURCE_REQUEST, None, True)
+                )
+            elif parameter.name == "background_tasks" or (
+                inspect.isclass(annotation) and issubclass(annotation, BackgroundTasks)
+            ):
+                endpoint_parameters.append(
+                    (parameter.name, _SOURCE_BACKGROUND, None, True)
+                )
+            elif parameter.name in self.path_groups:
+                if annotation is parameter.empty:
+                    converter = None
+                else:
+                    converter = _FAST_CONVERTERS.get(annotation, annotation)
+                endpoint_parameters.append(
+                    (parameter.name, _SOURCE_PATH, converter, required)
+                )
+            elif parameter.name == "data":
+                endpoint_parameters.append(
+                    (parameter.name, _SOURCE_DATA, None, required)
+                )
+            elif is_model_class(annotation):
+                endpoint_parameters.append(
+                    (
+                        parameter.name,
+                        _SOURCE_DATA,
+                        _build_model_converter(annotation),
+                        required,
+                    )
                 )
             else:
-                function_arguments[parameter.name] = extended_kwargs[parameter.name]
+                endpoint_parameters.append(
+                    (parameter.name, _SOURCE_PATH, None, required)
+                )
+
+        return tuple(endpoint_parameters)
+
+    def bind_state(self, state: AppState) -> None:
+        """
+        Method used to bind parameters which aren't path arguments to resources
+        of application state, by name. Called when application freezes routes.
+        :param state: Application state
+        :raises AttributeError: if required parameter can't be bound to anything
+        """
+        endpoint_parameters = []
+        for name, source, converter, required in self._unbound_parameters:
+            if source == _SOURCE_PATH and name not in self.path_groups:
+                if name in state:
+                    source = _SOURCE_STATE
+                elif required:
+                    raise AttributeError(
+                        f"{self.path}: parameter {name} isn't path argument "
+                        f"nor application state resource"
+                    )
+            endpoint_parameters.append((name, source, converter, required))
+
+        if self.executor == EXECUTOR_PROCESS and any(
+            source == _SOURCE_STATE for _, source, _, _ in endpoint_parameters
+        ):
+            raise AttributeError(
+                f"{self.path}: state resources can't be passed to process"
+            )
+        self._endpoint_parameters = tuple(endpoint_parameters)
+
+    def _check_endpoint_arguments(self, request: HTTPRequest, **kwargs):
+        function_arguments = {}
+
+        for name, source, converter, required in self._endpoint_parameters:
+            if source == _SOURCE_REQUEST:
+                function_arguments[name] = request
+                continue
+            if source == _SOURCE_STATE:
+                function_arguments[name] = request.app.state[name]
+                continue
+            if source == _SOURCE_BACKGROUND:
+                # Run by application after response is sent
+                if request.background_tasks is None:
+                    request.background_tasks = BackgroundTasks()
+                function_arguments[name] = request.background_tasks
+                continue
+
+            if source == _SOURCE_DATA:
+                value = request.data
+            elif required:
+                value = kwargs[name]
+            else:
+                value = kwargs.get(name)
+
+            if value is None and not required:
+                continue
+            function_arguments[name] = value if converter is None else converter(value)
 
         return function_arguments
 
     async def __call__(self, request: HTTPRequest, *args, **kwargs):
-        # Validate request data
-        request.validate_request_data(validation_model=self.request_model)
+        if self.cache is not None and request.http_method in self.cache.methods:
+            return await self._call_cached(request, **kwargs)
+        return await self._call_shared(request, **kwargs)
+
+    async def _call_cached(self, request: HTTPRequest, **kwargs) -> HTTPResponse:
+        """
+        Method used to answer request from cache, or call endpoint and cache its
+        response. Requests with matching If-None-Match get 304 without body.
+        """
+        cache = self.cache
+        key = cache.build_key(request)
+
+        entry = await cache.backend.get(key)
+        if entry is None:
+            response = await self._call_shared(request, **kwargs)
+            if response.status_code != 200 or isinstance(response, StreamingResponse):
+                return response
+
+            entry = CachedResponse.from_response(response)
+            await cache.backend.set(key, entry, cache.ttl)
+
+        if etag_matches(entry.etag, request.headers.get("if-none-match")):
+            return HTTPResponse(
+                status_code=304,
+                content_type=entry.content_type,
+                raw_data=None,
+                headers=[("etag", entry.etag)],
+                body=b"",
+            )
+        return entry.to_response()
+
+    def _coalesce_key(self, request: HTTPRequest, kwargs: dict) -> Hashable | None:
+        """
+        Method used to get key of request, requests with equal keys share endpoint
+        call. By default only GET and HEAD requests without body are coalesced, as
+        response of other requests may depend on body or have side effects.
+        :return: Coalescing key, or None if request can't share call
+        """
+        if callable(self.coalesce):
+            return self.coalesce(request, kwargs)
+        if request.http_method not in _COALESCED_METHODS or request.has_body:
+            return None
+        return (
+            request.http_method,
+            request.url,
+            request.content_type,
+            tuple(sorted(kwargs.items())),
+        )
+
+    async def _call_shared(self, request: HTTPRequest, **kwargs) -> HTTPResponse:
+        """
+        Method used to call endpoint, sharing single in-flight call between
+        concurrent requests with the same coalescing key, if route coalesces
+        requests. Every waiter gets its own copy of the response, or the same
+        exception. Streamed response can be sent once, so only the request
+        which started the call gets it, others call endpoint by themselves.
+        Cancelled waiter doesn't cancel the shared call.
+        """
+        if not self.coalesce:
+            return await self._call_endpoint(request, **kwargs)
+
+        key = self._coalesce_key(request, kwargs)
+        if key is None:
+            return await self._call_endpoint(request, **kwargs)
+        task = self._in_flight.get(key)
+        started = task is None
+        if started:
+            task = asyncio.ensure_future(self._call_rendered(request, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._forget_in_flight(key, done))
+        response = await asyncio.shield(task)
+
+        if isinstance(response, StreamingResponse):
+            if started:
+                return response
+            return await self._call_endpoint(request, **kwargs)
+        return response.copy()
+
+    def _forget_in_flight(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark exception as retrieved, in case all waiters were cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _call_rendered(self, request: HTTPRequest, **kwargs) -> HTTPResponse:
+        # Serialize shared response once, instead of once per waiter
+        response = await self._call_endpoint(request, **kwargs)
+        if not isinstance(response, StreamingResponse):
+            response.render()
+        return response
+
+    async def _call_endpoint(self, request: HTTPRequest, **kwargs) -> HTTPResponse:
+        limiter = self.concurrency_limiter
+        if limiter is None:
+            return await self._run_endpoint(request, **kwargs)
+
+        # Shed load with pre-rendered 503 when route is saturated
+        if not await limiter.acquire():
+            return limiter.build_rejection()
+        try:
+            return await self._run_endpoint(request, **kwargs)
+        finally:
+            limiter.release()
+
+    async def _run_endpoint(self, request: HTTPRequest, **kwargs) -> HTTPResponse:
+        timer = self.metrics.start_timer() if self.metrics is not None else None
+
+        # Read request body, unless endpoint consumes body stream by itself
+        if self.max_body_size is not None:
+            request.max_body_size = self.max_body_size
+        if (
+            not self.stream_request_body
+            and request.has_body
+            and not request.body_received
+        ):
+            if self._takes_request:
+                await request.body()
+            else:
+                await request.receive_data()
+        if timer is not None:
+            timer.lap(PHASE_READ)
+
+        # Data is parsed and validated on first access
+        request.validate_request_data(
+            validation_model=self.request_model, validator=self._request_validator
+        )
 
         # Call endpoint function
         function_arguments = self._check_endpoint_arguments(request=request, **kwargs)
+        if timer is not None:
+            timer.lap(PHASE_PARSE)
 
-        # Call async of sync
-        if asyncio.iscoroutinefunction(self.endpoint_func):
+        # Call async of sync, sync endpoints don't block event loop unless
+        # registered as inline
+        if self._is_coroutine:
             content = await self.endpoint_func(**function_arguments)
+        elif self.executor == EXECUTOR_THREAD and request.app is not None:
+            content = await request.app.thread_pool.run(
+                self.endpoint_func, function_arguments
+            )
+        elif self.executor == EXECUTOR_PROCESS and request.app is not None:
+            content = await request.app.process_pool.run(
+                self.endpoint_func, function_arguments, timeout=self.timeout
+            )
         else:
             content = self.endpoint_func(**function_arguments)
+        if timer is not None:
+            timer.lap(PHASE_HANDLER)
 
-        return HTTPResponse.create_response(request, self.response_model, content)
+        response = HTTPResponse.create_response(
+            request, self.response_model, content, validator=self._response_validator
+        )
+        if timer is not None:
+            # Render body here, so serialization isn't counted as sending
+            if not isinstance(response, StreamingResponse):
+                response.render()
+            timer.lap(PHASE_SERIALIZE)
+        return response
 
     def __eq__(self, other: "APIRoute"):
         return self.path == other.path
@@ -70,7 +456,7 @@ class Router:
     _registered_routes: dict[str, APIRoute]
 
     def __init__(self, prefix: str | None = None):
-        self.prefix = prefix
+        self.prefix = prefix or ""
 
     def get_registered_routes(self) -> dict[str, APIRoute]:
         return self._registered_routes
@@ -80,8 +466,15 @@ class Router:
         path: str,
         endpoint_func: Callable,
         methods: list[str] | None = None,
-        request_model: BaseModel | Type[BaseModel] | None = None,
-        response_model: BaseModel | Type[BaseModel] | None = None,
+        request_model: "BaseModel | Type[BaseModel] | None" = None,
+        response_model: "BaseModel | Type[BaseModel] | None" = None,
+        max_body_size: int | None = None,
+        stream_request_body: bool = False,
+        executor: str = EXECUTOR_THREAD,
+        timeout: float | None = None,
+        cache: ResponseCache | None = None,
+        coalesce: bool | Callable[[HTTPRequest, dict], Hashable] = False,
+        concurrency_limiter: ConcurrencyLimiter | None = None,
     ):
         full_route_path = f"{self.prefix}{path}"
 
@@ -91,15 +484,53 @@ class Router:
             methods=methods,
             request_model=request_model,
             response_model=response_model,
+            max_body_size=max_body_size,
+            stream_request_body=stream_request_body,
+            executor=executor,
+            timeout=timeout,
+            cache=cache,
+            coalesce=coalesce,
+            concurrency_limiter=concurrency_limiter,
         )
 
     def endpoint(
         self,
         path: str,
         methods: list[str] | None = None,
-        request_model: BaseModel | Type[BaseModel] | None = None,
-        response_model: BaseModel | Type[BaseModel] | None = None,
+        request_model: "BaseModel | Type[BaseModel] | None" = None,
+        response_model: "BaseModel | Type[BaseModel] | None" = None,
+        max_body_size: int | None = None,
+        stream_request_body: bool = False,
+        executor: str = EXECUTOR_THREAD,
+        timeout: float | None = None,
+        cache: ResponseCache | None = None,
+        coalesce: bool | Callable[[HTTPRequest, dict], Hashable] = False,
+        concurrency_limiter: ConcurrencyLimiter | None = None,
     ):
+        """
+        Decorator used to register endpoint function.
+        :param path: Route path regex
+        :param methods: Allowed HTTP methods
+        :param request_model: Model used to validate request data
+        :param response_model: Model used to validate response data
+        :param max_body_size: Request body size limit, overrides application limit
+        :param stream_request_body: Don't read body before calling endpoint, endpoint
+            consumes it with request.stream()
+        :param executor: Where sync endpoint is called, "thread" runs it in thread
+            pool of application, "inline" calls it on event loop (for cheap endpoints),
+            "process" runs it in process pool of application (for CPU bound endpoints,
+            which receive path arguments and request data instead of request)
+        :param timeout: Seconds to wait for result of endpoint run in process pool
+        :param cache: Response cache configuration, responses aren't cached if not set
+        :param coalesce: Share single endpoint call between concurrent requests with
+            the same key. By default GET and HEAD requests without body are
+            coalesced by method, path, content type and path arguments. Callable
+            receiving request and path arguments can return custom key, or None
+            to call endpoint for request separately.
+        :param concurrency_limiter: Limit of concurrent endpoint calls, requests over
+            it are queued or rejected with 503
+        """
+
         def decorator(endpoint_func):
             if (
                 not hasattr(self, "_registered_routes")
@@ -114,6 +545,13 @@ class Router:
                 methods=methods,
                 request_model=request_model,
                 response_model=response_model,
+                max_body_size=max_body_size,
+                stream_request_body=stream_request_body,
+                executor=executor,
+                timeout=timeout,
+                cache=cache,
+                coalesce=coalesce,
+                concurrency_limiter=concurrency_limiter,
             )
 
             return endpoint_func
@@ -0,0 +1,512 @@
+"""
+Pre-fork runner. Master process binds listening socket and forks worker
+processes, each one running application with its own event loop (uvicorn by
+default) and its own lifespan startup and shutdown. Workers share inherited
+listener, or bind their own sockets with SO_REUSEPORT and let kernel balance
+connections between them.
+
+Workers are recycled after max requests or when their memory grows above
+limit, and replaced one by one on SIGHUP: old worker is stopped only after its
+replacement finished startup, so some worker is always accepting connections.
+SIGTERM or SIGINT stops all workers gracefully.
+
+Usage: python -m tadow_api module:app [--workers 4] [--port 8000] ...
+"""
+
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import random
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Any, Callable
+
+logger = logging.getLogger("tadow_api.runner")
+
+# Seconds between memory checks of worker
+MEMORY_CHECK_INTERVAL = 1.0
+# Seconds before worker which failed on startup is started again
+RESPAWN_DELAY = 1.0
+
+
+def load_app(app_path: str, factory: bool = False) -> Any:
+    """
+    Method used to import application from "module:attribute" path.
+    :param app_path: Path to application, e.g. "service.main:app"
+    :param factory: Attribute is function creating application
+    :return: ASGI application
+    :raises AttributeError: if path doesn't point to application
+    """
+    module_name, _, attribute = app_path.partition(":")
+    if not module_name or not attribute:
+        raise AttributeError(f"Application path {app_path} has to be module:attribute")
+    app = getattr(importlib.import_module(module_name), attribute)
+    return app() if factory else app
+
+
+def read_rss() -> int:
+    """
+    Method used to get resident memory of current process.
+    :return: Memory in bytes, peak memory where current one isn't available
+    """
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def bind_socket(
+    host: str,
+    port: int,
+    reuse_port: bool = False,
+    backlog: int = 2048,
+    listen: bool = True,
+) -> socket.socket:
+    """
+    Method used to create listening socket.
+    :param host: Address to bind
+    :param port: Port to bind, 0 picks free port
+    :param reuse_port: Allow other sockets to bind the same port (SO_REUSEPORT)
+    :param backlog: Maximum number of connections waiting for accept
+    :param listen: Start listening, socket which only reserves port doesn't
+    :return: Bound socket
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise AttributeError("SO_REUSEPORT isn't supported on this platform")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if listen:
+        sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class WorkerContext:
+    """
+    Everything worker process needs to serve application: listening socket,
+    recycling limits and readiness notification for master process.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Any],
+        sock: socket.socket,
+        max_requests: int | None,
+        max_memory: int | None,
+        graceful_timeout: float,
+        ready_fd: int,
+    ):
+        self.load = load
+        self.socket = sock
+        self.max_requests = max_requests
+        self.max_memory = max_memory
+        self.graceful_timeout = graceful_timeout
+        self._ready_fd = ready_fd
+
+    def ready(self) -> None:
+        """
+        Method used to tell master that worker finished startup and accepts
+        connections.
+        """
+        if self._ready_fd is not None:
+            os.write(self._ready_fd, b"1")
+            os.close(self._ready_fd)
+            self._ready_fd = None
+
+    def memory_exceeded(self) -> bool:
+        return self.max_memory is not None and read_rss() > self.max_memory
+
+
+def serve_uvicorn(context: WorkerContext) -> None:
+    """
+    Method used to serve application with uvicorn in worker process. Uvicorn
+    runs lifespan startup and shutdown, stops after max requests and shuts
+    down gracefully on SIGTERM or SIGINT.
+    :param context: WorkerContext instance
+    """
+    import uvicorn
+
+    config = uvicorn.Config(
+        context.load(),
+        lifespan="on",
+        limit_max_requests=context.max_requests,
+        timeout_graceful_shutdown=context.graceful_timeout,
+        log_config=None,
+    )
+    asyncio.run(_serve_uvicorn(uvicorn.Server(config), context))
+
+
+async def _serve_uvicorn(server, context: WorkerContext) -> None:
+    watchdog = asyncio.ensure_future(_watch_worker(server, context))
+    try:
+        await server.serve(sockets=[context.socket])
+    finally:
+        watchdog.cancel()
+
+
+async def _watch_worker(server, context: WorkerContext) -> None:
+    while not server.started:
+        if server.should_exit:
+            return
+        await asyncio.sleep(0.05)
+    context.ready()
+
+    while context.max_memory is not None:
+        await asyncio.sleep(MEMORY_CHECK_INTERVAL)
+        if context.memory_exceeded():
+            logger.warning(
+                "Worker %d exceeded %d bytes of memory, recycling",
+                os.getpid(),
+                context.max_memory,
+            )
+            server.should_exit = True
+            return
+
+
+class Worker:
+    __slots__ = ("pid", "ready_fd", "is_ready")
+
+    def __init__(self, pid: int, ready_fd: int):
+        self.pid = pid
+        self.ready_fd = ready_fd
+        self.is_ready = False
+
+
+class Runner:
+    """
+    Master process of pre-fork server, see module documentation.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[], Any],
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int | None = None,
+        reuse_port: bool = False,
+        max_requests: int | None = None,
+        max_requests_jitter: int = 0,
+        max_memory: int | None = None,
+        graceful_timeout: float = 30.0,
+        backlog: int = 2048,
+        serve: Callable[[WorkerContext], None] = serve_uvicorn,
+    ):
+        """
+        :param load: Function returning application, called in every worker
+        :param host: Address to bind
+        :param port: Port to bind, 0 picks free port
+        :param workers: Number of worker processes, number of CPUs by default
+        :param reuse_port: Bind socket in every worker with SO_REUSEPORT,
+            instead of sharing listener of master process. Connections waiting
+            in backlog of stopped worker are reset, shared listener doesn't
+            lose them on restarts
+        :param max_requests: Requests handled by worker before it's replaced
+        :param max_requests_jitter: Random number up to it is added to
+            max_requests of each worker, so workers aren't replaced at once
+        :param max_memory: Resident memory in bytes above which worker is replaced
+        :param graceful_timeout: Seconds given to workers to finish requests
+        :param backlog: Maximum number of connections waiting for accept
+        :param serve: Function serving application in worker process
+        """
+        self.load = load
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.reuse_port = reuse_port
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.max_memory = max_memory
+        self.graceful_timeout = graceful_timeout
+        self.backlog = backlog
+        self.serve = serve
+
+        self.socket: socket.socket | None = None
+        self._workers: dict[int, Worker] = {}
+        self._signals: list[int] = []
+        self._wakeup_fds: tuple[int, int] | None = None
+        self._next_spawn = 0.0
+        self._stopping = False
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self.socket.getsockname()[:2]
+
+    def bind(self) -> None:
+        # With SO_REUSEPORT, socket of master only reserves port for workers,
+        # listening socket would take its share of connections
+        self.socket = bind_socket(
+            self.host,
+            self.port,
+            self.reuse_port,
+            self.backlog,
+            listen=not self.reuse_port,
+        )
+        self.port = self.address[1]
+
+    def _worker_socket(self) -> socket.socket:
+        if self.reuse_port:
+            self.socket.close()
+            return bind_socket(self.host, self.port, True, self.backlog)
+        return self.socket
+
+    def _spawn_worker(self) -> Worker:
+        max_requests = self.max_requests
+        if max_requests is not None and self.max_requests_jitter:
+            max_requests += random.randint(0, self.max_requests_jitter)
+        ready_read, ready_write = os.pipe()
+
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            self._run_worker(
+                WorkerContext(
+                    load=self.load,
+                    sock=self._worker_socket(),
+                    max_requests=max_requests,
+                    max_memory=self.max_memory,
+                    graceful_timeout=self.graceful_timeout,
+                    ready_fd=ready_write,
+                )
+            )
+
+        os.close(ready_write)
+        worker = Worker(pid, ready_read)
+        self._workers[pid] = worker
+        logger.info("Started worker %d", pid)
+        return worker
+
+    def _run_worker(self, context: WorkerContext) -> None:
+        """
+        Method used to run worker in forked process, it never returns.
+        """
+        exit_code = 0
+        try:
+            signal.set_wakeup_fd(-1)
+            for signal_number in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+                signal.signal(signal_number, signal.SIG_DFL)
+            # Terminal hangup is handled by master
+            signal.signal(signal.SIGHUP, signal.SIG_IGN)
+            for fd in self._wakeup_fds or ():
+                os.close(fd)
+            for worker in self._workers.values():
+                os.close(worker.ready_fd)
+            self.serve(context)
+        except BaseException:
+            logger.exception("Worker %d failed", os.getpid())
+            exit_code = 1
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+
+    def _handle_signal(self, signal_number: int, frame) -> None:
+        self._signals.append(signal_number)
+
+    def _reap_workers(self) -> None:
+        """
+        Method used to collect exited workers and start their replacements.
+        """
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self._workers.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.ready_fd)
+            exit_code = os.waitstatus_to_exitcode(status)
+            logger.info("Worker %d exited with code %d", pid, exit_code)
+            if not worker.is_ready:
+                # Don't fork in a loop when application can't start
+                self._next_spawn = time.monotonic() + RESPAWN_DELAY
+
+    def _read_ready(self, fds: list[int]) -> None:
+        for worker in list(self._workers.values()):
+            if worker.ready_fd in fds and not worker.is_ready:
+                worker.is_ready = os.read(worker.ready_fd, 1) == b"1"
+
+    def _wait(self, timeout: float) -> None:
+        """
+        Method used to wait for signal, worker readiness or timeout.
+        """
+        fds = [self._wakeup_fds[0]] + [
+            worker.ready_fd for worker in self._workers.values() if not worker.is_ready
+        ]
+        readable, _, _ = select.select(fds, [], [], timeout)
+        if self._wakeup_fds[0] in readable:
+            os.read(self._wakeup_fds[0], 1024)
+        self._read_ready(readable)
+
+    def _wait_ready(self, worker: Worker) -> bool:
+        deadline = time.monotonic() + self.graceful_timeout
+        while not worker.is_ready and time.monotonic() < deadline:
+            self._wait(0.1)
+            self._reap_workers()
+            if worker.pid not in self._workers or self._stopping_requested():
+                return False
+        return worker.is_ready
+
+    def _stopping_requested(self) -> bool:
+        return any(
+            signal_number in (signal.SIGTERM, signal.SIGINT)
+            for signal_number in self._signals
+        )
+
+    def _kill(self, pid: int, signal_number: int) -> None:
+        try:
+            os.kill(pid, signal_number)
+        except ProcessLookupError:
+            pass
+
+    def rolling_restart(self) -> None:
+        """
+        Method used to replace workers one by one. Each old worker is stopped
+        after its replacement is ready, restart stops if replacement fails.
+        """
+        logger.info("Restarting workers")
+        for pid in list(self._workers):
+            if pid not in self._workers:
+                continue  # exited in the meantime
+            replacement = self._spawn_worker()
+            if not self._wait_ready(replacement):
+                logger.error("Worker %d didn't start, restart stopped", replacement.pid)
+                self._kill(replacement.pid, signal.SIGTERM)
+                return
+            self._kill(pid, signal.SIGTERM)
+
+    def stop(self) -> None:
+        """
+        Method used to stop workers gracefully, killing them after timeout.
+        """
+        self._stopping = True
+        for pid in self._workers:
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._workers and time.monotonic() < deadline:
+            self._wait(0.1)
+            self._reap_workers()
+        for pid in list(self._workers):
+            logger.warning("Worker %d didn't stop in time, killing", pid)
+            self._kill(pid, signal.SIGKILL)
+        while self._workers:
+            self._wait(0.1)
+            self._reap_workers()
+
+    def run(self) -> None:
+        """
+        Method used to run master process until SIGTERM or SIGINT.
+        """
+        if self.socket is None:
+            self.bind()
+        self._wakeup_fds = os.pipe()
+        for fd in self._wakeup_fds:
+            os.set_blocking(fd, False)
+        signal.set_wakeup_fd(self._wakeup_fds[1])
+        for signal_number in (
+            signal.SIGHUP,
+            signal.SIGTERM,
+            signal.SIGINT,
+            signal.SIGCHLD,
+        ):
+            signal.signal(signal_number, self._handle_signal)
+        logger.info(
+            "Serving on %s:%d with %d workers", self.host, self.port, self.workers
+        )
+
+        try:
+            while True:
+                signals, self._signals = self._signals, []
+                if signal.SIGTERM in signals or signal.SIGINT in signals:
+                    break
+                self._reap_workers()
+                if signal.SIGHUP in signals:
+                    self.rolling_restart()
+                while (
+                    len(self._workers) < self.workers
+                    and time.monotonic() >= self._next_spawn
+                ):
+                    self._spawn_worker()
+                self._wait(0.5)
+        finally:
+            self.stop()
+            signal.set_wakeup_fd(-1)
+            for fd in self._wakeup_fds:
+                os.close(fd)
+            self.socket.close()
+            logger.info("Stopped")
+
+
+def main(argv: list[str] | None = None) -> None:
+    argument_parser = argparse.ArgumentParser(
+        prog="python -m tadow_api", description="Pre-fork server of tadow_api"
+    )
+    argument_parser.add_argument(
+        "app", help="Application as module:attribute, or snapshot file with --snapshot"
+    )
+    argument_parser.add_argument("--host", default="127.0.0.1")
+    argument_parser.add_argument("--port", type=int, default=8000)
+    argument_parser.add_argument("--workers", type=int, default=None)
+    argument_parser.add_argument(
+        "--reuse-port", action="store_true", help="Bind socket per worker"
+    )
+    argument_parser.add_argument("--max-requests", type=int, default=None)
+    argument_parser.add_argument("--max-requests-jitter", type=int, default=0)
+    argument_parser.add_argument(
+        "--max-memory", type=int, default=None, help="Worker memory limit in MB"
+    )
+    argument_parser.add_argument("--graceful-timeout", type=float, default=30.0)
+    argument_parser.add_argument("--backlog", type=int, default=2048)
+    argument_parser.add_argument(
+        "--factory", action="store_true", help="Application is factory function"
+    )
+    argument_parser.add_argument(
+        "--snapshot", action="store_true", help="Application is snapshot file"
+    )
+    argument_parser.add_argument("--log-level", default="info")
+    arguments = argument_parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=arguments.log_level.upper(),
+        format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s",
+    )
+    if arguments.snapshot:
+        from tadow_api.snapshot import load_snapshot
+
+        def load():
+            return load_snapshot(arguments.app)
+    else:
+
+        def load():
+            return load_app(arguments.app, factory=arguments.factory)
+
+    Runner(
+        load,
+        host=arguments.host,
+        port=arguments.port,
+        workers=arguments.workers,
+        reuse_port=arguments.reuse_port,
+        max_requests=arguments.max_requests,
+        max_requests_jitter=arguments.max_requests_jitter,
+        max_memory=(
+            arguments.max_memory * 1024 * 1024
+            if arguments.max_memory is not None
+            else None
+        ),
+        graceful_timeout=arguments.graceful_timeout,
+        backlog=arguments.backlog,
+    ).run()
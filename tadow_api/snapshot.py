@@ -0,0 +1,54 @@
+"""
+Snapshot of application with compiled route table, argument binders and
+validators, saved at build time and loaded at worker start instead of
+registering and compiling routes again. Endpoints, models, middlewares and
+exception handlers are saved by reference, so they have to be defined at
+module level. Snapshot is useful with application factories, modules with
+routes registered at import time build application anyway.
+"""
+
+import pickle
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from tadow_api.app import TadowAPI
+
+# Changed whenever pickled structure of application changes
+SNAPSHOT_FORMAT = 1
+
+
+def save_snapshot(app: "TadowAPI", path: str) -> None:
+    """
+    Method used to compile routes of application and save it into file.
+    :param app: TadowAPI instance, not started
+    :param path: Snapshot file path
+    :raises AttributeError: if application can't be pickled
+    """
+    app.compile_routes()
+    try:
+        data = pickle.dumps(app, protocol=pickle.HIGHEST_PROTOCOL)
+    except (pickle.PicklingError, TypeError, AttributeError) as exception:
+        raise AttributeError(
+            f"Application can't be saved in snapshot, endpoints and handlers "
+            f"have to be module level functions: {exception}"
+        ) from exception
+    with open(path, "wb") as file:
+        pickle.dump(SNAPSHOT_FORMAT, file)
+        file.write(data)
+
+
+def load_snapshot(path: str) -> "TadowAPI":
+    """
+    Method used to load application saved by save_snapshot.
+    :param path: Snapshot file path
+    :return: TadowAPI instance with compiled routes
+    :raises AttributeError: if snapshot was saved in different format
+    """
+    with open(path, "rb") as file:
+        # Format is checked before application is unpickled
+        snapshot_format = pickle.load(file)
+        if snapshot_format != SNAPSHOT_FORMAT:
+            raise AttributeError(
+                f"Snapshot format {snapshot_format} not supported, save it again"
+            )
+        return pickle.load(file)
@@ -0,0 +1,51 @@
+from typing import Any, Iterator
+
+
+class AppState:
+    """
+    Resources shared by all requests of application, like database or HTTP
+    client pools. Resources are usually created by startup handlers and passed
+    to endpoints by parameter name, e.g. endpoint with db_pool parameter gets
+    app.state.db_pool.
+    """
+
+    __slots__ = ("_resources",)
+
+    def __init__(self, resources: dict[str, Any] | None = None):
+        object.__setattr__(self, "_resources", dict(resources or {}))
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._resources[name]
+        except KeyError:
+            raise AttributeError(f"State has no resource {name}") from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._resources[name] = value
+
+    def __delattr__(self, name: str) -> None:
+        try:
+            del self._resources[name]
+        except KeyError:
+            raise AttributeError(f"State has no resource {name}") from None
+
+    def __getitem__(self, name: str) -> Any:
+        return self._resources[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._resources
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._resources)
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return self._resources
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        object.__setattr__(self, "_resources", state)
+
+    def __repr__(self) -> str:
+        return f"<AppState {list(self._resources)} >"
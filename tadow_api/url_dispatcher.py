@@ -1,4 +1,5 @@
 import re
+import sys
 from abc import ABC, abstractmethod
 from typing import Any
 
@@ -6,8 +7,134 @@ from tadow_api.exceptions import HttpException
 from tadow_api.requests import HTTPRequest
 from tadow_api.routing import APIRoute
 
+_REGEX_METACHARACTERS = frozenset("\\.^$*+?{}[]|()")
+
+# Inline flags at start of pattern, e.g. (?i)
+_GLOBAL_FLAGS = re.compile(r"\(\?([aiLmsux]+)\)")
+
+
+def is_static_pattern(pattern: str) -> bool:
+    """
+    Method used to check if route pattern (or its segment) is a plain string.
+    :param pattern: Route pattern
+    :return: True if pattern contains no regex metacharacters
+    """
+    return _REGEX_METACHARACTERS.isdisjoint(pattern)
+
+
+def split_route_pattern(pattern: str) -> list[str] | None:
+    """
+    Method used to split route pattern into path segments. Slashes nested in
+    groups, character sets or escaped are not treated as separators.
+    :param pattern: Route pattern
+    :return: List of segments, None if pattern can't be split (top level alternation)
+    """
+    segments: list[str] = []
+    current: list[str] = []
+    depth, in_set, escaped = 0, False, False
+
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == "\\":
+            escaped = True
+        elif in_set:
+            in_set = char != "]"
+        elif char == "[":
+            in_set = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif depth == 0 and char == "|":
+            return None
+        elif depth == 0 and char == "/":
+            segments.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+
+    segments.append("".join(current))
+    return segments
+
+
+def _can_match_slash(segment: str) -> bool:
+    """
+    Method used to check if pattern of path segment can match "/", so it may
+    consume following segments. Every character class, escape and dot is
+    checked on its own, uncertain cases count as matching.
+    :param segment: Pattern of path segment
+    :return: True if segment can't be matched separately from the next ones
+    """
+    if "(?P=" in segment:
+        return True  # backreference to group, which may contain "/"
+
+    index = 0
+    while index < len(segment):
+        char = segment[index]
+        if char == ".":
+            return True
+        if char == "\\":
+            atom = segment[index : index + 2]
+            index += 2
+        elif char == "[":
+            end = index + 1
+            if segment.startswith("^", end):
+                end += 1
+            if segment.startswith("]", end):
+                end += 1
+            while end < len(segment) and segment[end] != "]":
+                end += 2 if segment[end] == "\\" else 1
+            atom = segment[index : end + 1]
+            index = end + 1
+        else:
+            index += 1
+            continue
+
+        try:
+            if re.fullmatch(atom, "/"):
+                return True
+        except re.error:
+            return True
+    return False
+
+
+def compile_segment(segment: str) -> re.Pattern | None:
+    """
+    Method used to compile pattern of path segment, matched up to next "/".
+    :param segment: Pattern of path segment
+    :return: Compiled pattern, None if segment can't be matched on its own
+        (it's invalid alone, starts with quantifier or can match "/")
+    """
+    if segment[:1] in ("*", "+", "?", "{") or _can_match_slash(segment):
+        return None
+    try:
+        return re.compile(rf"(?:{segment})(?=/|\Z)")
+    except re.error:
+        return None
+
+
+def scope_global_flags(pattern: str) -> str:
+    """
+    Method used to turn inline flags at start of pattern into flags of group,
+    e.g. "(?i)/items" into "(?i:/items)", so pattern can be part of another one.
+    :param pattern: Route pattern
+    :return: Pattern with scoped flags
+    """
+    match = _GLOBAL_FLAGS.match(pattern)
+    if match is None:
+        return pattern
+    return f"(?{match.group(1)}:{pattern[match.end() :]})"
+
 
 class BaseURLDispatcher(ABC):
+    def compile(self, registered_routes: dict[str, APIRoute]) -> None:
+        """
+        Method used to precompile routes before the first request. Dispatchers
+        which don't keep any state derived from routes can skip it.
+        :param registered_routes: Routes which will be passed to dispatcher
+        """
+
     @abstractmethod
     def __call__(
         self, registered_routes: dict[str, APIRoute], request: HTTPRequest
@@ -15,29 +142,252 @@ class BaseURLDispatcher(ABC):
         raise NotImplementedError
 
 
-class RegexURLDispatcher:
+class RegexURLDispatcher(BaseURLDispatcher):
+    """
+    Dispatcher which merges all registered routes into a single alternation regex.
+    Route groups are renamed per route, so routes can reuse the same group names.
+    Alternatives are ordered by number of groups, so the route with the fewest
+    groups wins when several of them match.
+    """
+
+    def __init__(self):
+        self._source_routes: dict[str, APIRoute] | None = None
+        self._source_size = 0
+        self._combined_pattern: re.Pattern | None = None
+        self._route_groups: dict[str, tuple[str, list[tuple[str, str]]]] = {}
+
+    def compile(self, registered_routes: dict[str, APIRoute]) -> None:
+        alternatives: list[tuple[int, str]] = []
+        route_groups = {}
+
+        for index, path in enumerate(registered_routes.keys()):
+            pattern = re.compile(path)
+            route_name = f"_r{index}"
+            renamed = re.sub(
+                r"\(\?P([<=])(\w+)",
+                lambda match: f"(?P{match.group(1)}{route_name}_{match.group(2)}",
+                scope_global_flags(path),
+            )
+            alternatives.append((pattern.groups, f"(?P<{route_name}>{renamed})"))
+            route_groups[route_name] = (
+                path,
+                [(name, f"{route_name}_{name}") for name in pattern.groupindex],
+            )
+
+        alternatives.sort(key=lambda items: items[0])
+        self._combined_pattern = (
+            re.compile("|".join(alternative for _, alternative in alternatives))
+            if alternatives
+            else None
+        )
+        self._route_groups = route_groups
+        self._source_routes = registered_routes
+        self._source_size = len(registered_routes)
+
     def __call__(
         self, registered_routes: dict[str, APIRoute], request: HTTPRequest
     ) -> tuple[APIRoute, dict[Any]] | None:
-        matching_paths: list[tuple[str, re.Match]] = []
+        if (
+            registered_routes is not self._source_routes
+            or len(registered_routes) != self._source_size
+        ):
+            self.compile(registered_routes)
 
-        for path in registered_routes.keys():
-            match: re.Match = re.match(path, request.url)
-            if match and len(match.group()) >= len(request.url):
-                matching_paths.append((path, match))
-
-        if not matching_paths:
+        match = (
+            self._combined_pattern.fullmatch(request.url)
+            if self._combined_pattern
+            else None
+        )
+        if not match:
             raise HttpException(message="Not found", status_code=404)
 
-        # Find best path
-        best_path, match = sorted(
-            matching_paths,
-            key=lambda items: len(items[1].groups()),
-        )[0]
-
+        best_path, groups = self._route_groups[match.lastgroup]
         route: APIRoute = registered_routes.get(best_path)
 
         if request.http_method not in route.methods:
             raise HttpException(message="Method not allowed", status_code=403)
 
-        return route, match.groupdict()
+        return route, {name: match.group(renamed) for name, renamed in groups}
+
+
+# Result of radix search which didn't match any route yet, ranks of routes are
+# lower than its rank
+_NO_MATCH: tuple[int, str | None, dict[str, Any] | None] = (sys.maxsize, None, None)
+
+
+class _RadixNode:
+    __slots__ = (
+        "static_children",
+        "dynamic_children",
+        "route_path",
+        "route_rank",
+        "best_rank",
+    )
+
+    def __init__(self):
+        self.static_children: dict[str, _RadixNode] = {}
+        self.dynamic_children: dict[str, tuple[re.Pattern, _RadixNode]] = {}
+        self.route_path: str | None = None
+        # Specificity of route, lower rank wins when several routes match
+        self.route_rank = sys.maxsize
+        # The lowest rank in subtree, for skipping subtrees which can't win
+        self.best_rank = sys.maxsize
+
+    def finalize(self) -> int:
+        """
+        Method used to compute best ranks of subtree, and order dynamic children
+        so the most specific ones are searched first.
+        :return: Best rank of subtree
+        """
+        best_rank = self.route_rank
+        for child in self.static_children.values():
+            best_rank = min(best_rank, child.finalize())
+        for _, child in self.dynamic_children.values():
+            best_rank = min(best_rank, child.finalize())
+
+        self.dynamic_children = dict(
+            sorted(self.dynamic_children.items(), key=lambda item: item[1][1].best_rank)
+        )
+        self.best_rank = best_rank
+        return best_rank
+
+
+class RadixTreeURLDispatcher(BaseURLDispatcher):
+    """
+    Dispatcher which compiles registered routes into a prefix tree of path segments.
+    Static segments are resolved with dict lookups, only parameter segments are
+    matched with regex. Routes which can't be split into segments, or have
+    segments which can't be matched on their own (e.g. "(?P<path>.+)" spanning
+    several segments), are matched with their full pattern. When several routes match, the one
+    with the fewest groups wins, like in RegexURLDispatcher.
+    """
+
+    def __init__(self):
+        self._source_routes: dict[str, APIRoute] | None = None
+        self._source_size = 0
+        self._root = _RadixNode()
+        self._fallback_patterns: list[tuple[int, str, re.Pattern]] = []
+
+    def compile(self, registered_routes: dict[str, APIRoute]) -> None:
+        root = _RadixNode()
+        fallback_patterns = []
+
+        # Routes are ranked in order of RegexURLDispatcher alternatives
+        patterns = {path: re.compile(path) for path in registered_routes.keys()}
+        ranks = {
+            path: rank
+            for rank, path in enumerate(
+                sorted(patterns, key=lambda path: patterns[path].groups)
+            )
+        }
+
+        for path, pattern in patterns.items():
+            segments = split_route_pattern(path)
+            compiled_segments = {
+                segment: compile_segment(segment)
+                for segment in segments or []
+                if not is_static_pattern(segment)
+            }
+            if segments is None or None in compiled_segments.values():
+                fallback_patterns.append((ranks[path], path, pattern))
+                continue
+
+            node = root
+            for segment in segments:
+                if is_static_pattern(segment):
+                    node = node.static_children.setdefault(segment, _RadixNode())
+                    continue
+
+                if segment not in node.dynamic_children:
+                    node.dynamic_children[segment] = (
+                        compiled_segments[segment],
+                        _RadixNode(),
+                    )
+                node = node.dynamic_children[segment][1]
+            node.route_path, node.route_rank = path, ranks[path]
+
+        root.finalize()
+        fallback_patterns.sort(key=lambda item: item[0])
+        self._root = root
+        self._fallback_patterns = fallback_patterns
+        self._source_routes = registered_routes
+        self._source_size = len(registered_routes)
+
+    def _search(
+        self,
+        node: _RadixNode,
+        url: str,
+        position: int,
+        arguments: dict[str, Any],
+        best: tuple[int, str | None, dict[str, Any] | None],
+    ) -> tuple[int, str | None, dict[str, Any] | None]:
+        """
+        Method used to find the most specific route matching rest of url.
+        :param node: Node matching url up to position
+        :param best: Rank, path and arguments of the best route found so far
+        :return: Rank, path and arguments of the best route, best if none is better
+        """
+        end = url.find("/", position)
+        child = node.static_children.get(
+            url[position:] if end == -1 else url[position:end]
+        )
+        if child is not None and child.best_rank < best[0]:
+            if end != -1:
+                best = self._search(child, url, end + 1, arguments, best)
+            elif child.route_rank < best[0]:
+                best = child.route_rank, child.route_path, arguments
+
+        for pattern, child in node.dynamic_children.values():
+            if child.best_rank >= best[0]:
+                # Children are ordered by best rank, so the rest can't win either
+                break
+            match = pattern.match(url, position)
+            if match is None:
+                continue
+
+            match_end = match.end()
+            if match_end == len(url):
+                if child.route_rank < best[0]:
+                    best = (
+                        child.route_rank,
+                        child.route_path,
+                        {**arguments, **match.groupdict()},
+                    )
+                continue
+
+            best = self._search(
+                child, url, match_end + 1, {**arguments, **match.groupdict()}, best
+            )
+
+        return best
+
+    def __call__(
+        self, registered_routes: dict[str, APIRoute], request: HTTPRequest
+    ) -> tuple[APIRoute, dict[Any]] | None:
+        if (
+            registered_routes is not self._source_routes
+            or len(registered_routes) != self._source_size
+        ):
+            self.compile(registered_routes)
+
+        url = request.url
+        found = self._search(self._root, url, 0, {}, _NO_MATCH)
+
+        for rank, path, pattern in self._fallback_patterns:
+            if rank >= found[0]:
+                break
+            match = pattern.fullmatch(url)
+            if match:
+                found = rank, path, match.groupdict()
+                break
+
+        _, best_path, arguments = found
+        if best_path is None:
+            raise HttpException(message="Not found", status_code=404)
+
+        route: APIRoute = registered_routes[best_path]
+
+        if request.http_method not in route.methods:
+            raise HttpException(message="Method not allowed", status_code=403)
+
+        return route, arguments
@@ -0,0 +1,41 @@
+"""
+Pydantic is imported only by applications using models. Models can't exist
+before pydantic.main is imported, so checks below don't import it.
+"""
+
+import sys
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pydantic import TypeAdapter
+
+
+def is_model_class(obj: Any) -> bool:
+    """
+    Check if obj is pydantic model class.
+    """
+    pydantic_main = sys.modules.get("pydantic.main")
+    return (
+        pydantic_main is not None
+        and isinstance(obj, type)
+        and issubclass(obj, pydantic_main.BaseModel)
+    )
+
+
+def is_model(obj: Any) -> bool:
+    """
+    Check if obj is pydantic model instance.
+    """
+    pydantic_main = sys.modules.get("pydantic.main")
+    return pydantic_main is not None and isinstance(obj, pydantic_main.BaseModel)
+
+
+def build_validator(model: Any) -> "TypeAdapter":
+    """
+    Method used to build validator of model, importing pydantic on first use.
+    :param model: Pydantic model or any type supported by pydantic
+    :return: TypeAdapter instance
+    """
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(model)
@@ -0,0 +1,321 @@
+"""
+Incremental XML reader and writer. Reader builds the same structure as
+xmltodict.parse, writer produces the same format as dicttoxml.dicttoxml,
+so XML parser keeps its data format. Module registers XML parser and is
+imported by ContentParser on first use of XML content type.
+"""
+
+import functools
+import numbers
+import re
+from collections.abc import Iterable
+from typing import Any, AsyncIterable, AsyncIterator
+from xml.parsers import expat
+
+from tadow_api.codecs import JsonCodec
+from tadow_api.content_parsers import (
+    BaseParser,
+    ContentParser,
+    _dump_row,
+    iterate_async,
+)
+
+XML_DECLARATION = '<?xml version="1.0" encoding="utf-8" ?>'
+XML_ROOT_START = f"{XML_DECLARATION}<root>".encode("utf-8")
+XML_ROOT_END = b"</root>"
+
+_ATTRIBUTE_PREFIX = "@"
+_TEXT_KEY = "#text"
+_MISSING = object()
+
+_ESCAPE_TABLE = str.maketrans(
+    {"&": "&amp;", '"': "&quot;", "'": "&apos;", "<": "&lt;", ">": "&gt;"}
+)
+_XML_NAME = re.compile(r"[^\W\d][\w.\-:]*\Z")
+
+
+class XMLReader:
+    """
+    Push parser built on expat. Document is fed in chunks, as they are
+    received, so whole body is never buffered. With item_depth, elements at
+    that depth (root element has depth 1) are returned by feed as soon as they
+    are closed and aren't kept in document, so memory use doesn't grow with
+    number of items.
+    """
+
+    def __init__(self, item_depth: int = 0):
+        self.item_depth = item_depth
+        self._depth = 0
+        self._stack: list[tuple[dict | None, list[str]]] = []
+        self._item: dict | None = None
+        self._data: list[str] = []
+        self._items: list[tuple[str, Any]] = []
+
+        self._parser = expat.ParserCreate()
+        self._parser.ordered_attributes = True
+        self._parser.buffer_text = True
+        self._parser.StartElementHandler = self._start_element
+        self._parser.EndElementHandler = self._end_element
+        self._parser.CharacterDataHandler = self._data.append
+        # Entities can expand to huge documents, they aren't needed for data
+        self._parser.EntityDeclHandler = self._reject_entity
+        self._parser.ExternalEntityRefHandler = self._reject_entity
+
+    @staticmethod
+    def _reject_entity(*args) -> None:
+        raise expat.ExpatError("Entity declarations are not allowed")
+
+    def _start_element(self, name: str, attributes: list[str]) -> None:
+        self._depth += 1
+        self._stack.append((self._item, self._data))
+        self._item = (
+            {
+                _ATTRIBUTE_PREFIX + attributes[index]: attributes[index + 1]
+                for index in range(0, len(attributes), 2)
+            }
+            if attributes
+            else None
+        )
+        self._data = []
+        self._parser.CharacterDataHandler = self._data.append
+
+    def _end_element(self, name: str) -> None:
+        data = self._data
+        text = "".join(data).strip() if data else ""
+        value = self._item
+        if value is None:
+            value = text or None
+        elif text:
+            value[_TEXT_KEY] = text
+
+        parent, self._data = self._stack.pop()
+        self._parser.CharacterDataHandler = self._data.append
+        depth = self._depth
+        self._depth = depth - 1
+        if depth == self.item_depth:
+            self._items.append((name, value))
+        elif parent is None:
+            parent = {name: value}
+        else:
+            # Repeated elements are collected into list
+            existing = parent.get(name, _MISSING)
+            if existing is _MISSING:
+                parent[name] = value
+            elif type(existing) is list:
+                existing.append(value)
+            else:
+                parent[name] = [existing, value]
+        self._item = parent
+
+    def feed(self, chunk: bytes) -> list[tuple[str, Any]]:
+        """
+        Method used to parse next chunk of document.
+        :param chunk: Part of document
+        :return: (name, value) pairs of items closed in chunk, with item_depth
+        :raises ExpatError: if document is invalid
+        """
+        self._parser.Parse(chunk, False)
+        items, self._items = self._items, []
+        return items
+
+    def close(self) -> dict | None:
+        """
+        Method used to finish parsing.
+        :return: Document as dict, without items returned by feed
+        :raises ExpatError: if document is invalid or incomplete
+        """
+        self._parser.Parse(b"", True)
+        return self._item
+
+
+def parse_xml(raw_data: bytes) -> dict | None:
+    """
+    Method used to parse whole XML document.
+    :param raw_data: XML document
+    :return: Document in xmltodict format
+    """
+    reader = XMLReader()
+    reader.feed(raw_data)
+    return reader.close()
+
+
+async def parse_xml_stream(chunks: AsyncIterable[bytes]) -> dict | None:
+    """
+    Method used to parse XML document while it's received.
+    :param chunks: Async iterable of document parts, e.g. request.stream()
+    :return: Document in xmltodict format
+    """
+    reader = XMLReader()
+    async for chunk in chunks:
+        reader.feed(chunk)
+    return reader.close()
+
+
+async def iterate_xml_items(
+    chunks: AsyncIterable[bytes], depth: int = 2
+) -> AsyncIterator[Any]:
+    """
+    Method used to iterate over elements of XML document at given depth, e.g.
+    <item> elements of <items><item>...</item>...</items> with depth 2. Items
+    are yielded while document is received, each one can be validated with
+    pydantic model separately. Used with stream_request_body endpoints.
+    :param chunks: Async iterable of document parts, e.g. request.stream()
+    :param depth: Depth of items, root element has depth 1
+    :return: Values of items, in xmltodict format
+    """
+    reader = XMLReader(item_depth=depth)
+    async for chunk in chunks:
+        for _, value in reader.feed(chunk):
+            yield value
+    reader.close()
+
+
+@functools.lru_cache(maxsize=1024)
+def _element_name(key: str) -> tuple[str, str]:
+    """
+    Method used to get element name and name attribute for dict key, in the
+    same way as dicttoxml.
+    """
+    key = key.translate(_ESCAPE_TABLE)
+    if _XML_NAME.match(key):
+        return key, ""
+    if key.isdigit():
+        return f"n{key}", ""
+    try:
+        return f"n{float(key)}", ""
+    except ValueError:
+        pass
+    if _XML_NAME.match(key.replace(" ", "_")):
+        return key.replace(" ", "_"), ""
+    return "key", f' name="{key}"'
+
+
+def _xml_type(value: Any) -> str:
+    value_type = type(value)
+    if value_type is int:
+        return "int"
+    if value_type is float:
+        return "float"
+    if value_type is bool:
+        return "bool"
+    if isinstance(value, str):
+        return "str"
+    return "number"
+
+
+def _write_value(out: list[str], name: str, attributes: str, value: Any) -> None:
+    if value is None:
+        out.append(f'<{name}{attributes} type="null"></{name}>')
+    elif isinstance(value, str):
+        out.append(
+            f'<{name}{attributes} type="str">{value.translate(_ESCAPE_TABLE)}</{name}>'
+        )
+    elif isinstance(value, numbers.Number):
+        out.append(f'<{name}{attributes} type="{_xml_type(value)}">{value}</{name}>')
+    elif hasattr(value, "isoformat"):
+        out.append(f'<{name}{attributes} type="str">{value.isoformat()}</{name}>')
+    elif isinstance(value, dict):
+        out.append(f'<{name}{attributes} type="dict">')
+        _write_dict(out, value)
+        out.append(f"</{name}>")
+    elif isinstance(value, Iterable):
+        out.append(f'<{name}{attributes} type="list">')
+        _write_list(out, value)
+        out.append(f"</{name}>")
+    else:
+        raise TypeError(f"Unsupported data type: {value} ({type(value).__name__})")
+
+
+def _write_dict(out: list[str], data: dict) -> None:
+    for key, value in data.items():
+        name, attributes = _element_name(str(key))
+        if value is True or value is False:
+            out.append(f'<{name}{attributes} type="bool">{str(value).lower()}</{name}>')
+        else:
+            _write_value(out, name, attributes, value)
+
+
+def _write_list(out: list[str], items: Iterable) -> None:
+    for item in items:
+        # Booleans in lists are written as numbers by dicttoxml, e.g. True
+        _write_value(out, "item", "", item)
+
+
+def _write_root(out: list[str], data: Any) -> None:
+    if isinstance(data, dict):
+        _write_dict(out, data)
+    elif isinstance(data, Iterable) and not isinstance(data, str):
+        _write_list(out, data)
+    elif data is True or data is False:
+        out.append(f'<item type="bool">{str(data).lower()}</item>')
+    else:
+        _write_value(out, "item", "", data)
+
+
+def dump_xml(data: Any) -> bytes:
+    """
+    Method used to serialize data into XML document, in dicttoxml format.
+    :param data: Dict, list or scalar value
+    :return: XML document
+    """
+    out = []
+    _write_root(out, data)
+    return XML_ROOT_START + "".join(out).encode("utf-8") + XML_ROOT_END
+
+
+def dump_xml_item(item: Any) -> bytes:
+    """
+    Method used to serialize single <item> element of root list, used to write
+    list of rows into document one row at a time, between XML_ROOT_START and
+    XML_ROOT_END, in the same format as dump_xml(list(rows)).
+    :param item: Row
+    :return: XML element
+    """
+    out = []
+    _write_value(out, "item", "", item)
+    return "".join(out).encode("utf-8")
+
+
+@ContentParser.register_parser(content_type="application/xml")
+class ApplicationXMLParser(BaseParser):
+    @classmethod
+    def parse_request_data(
+        cls, raw_data: bytes, codec: JsonCodec | None = None
+    ) -> dict:
+        try:
+            return parse_xml(raw_data)
+        except expat.ExpatError:
+            from tadow_api.exceptions import HttpException
+
+            raise HttpException(status_code=400, message="Invalid request data")
+
+    @classmethod
+    async def parse_request_stream(
+        cls, chunks: AsyncIterable[bytes], codec: JsonCodec | None = None
+    ) -> dict:
+        reader = XMLReader()
+        received = False
+        try:
+            async for chunk in chunks:
+                reader.feed(chunk)
+                received = True
+            return reader.close() if received else None
+        except expat.ExpatError:
+            from tadow_api.exceptions import HttpException
+
+            raise HttpException(status_code=400, message="Invalid request data")
+
+    @classmethod
+    def parse_response_data(
+        cls, raw_data: dict, codec: JsonCodec | None = None
+    ) -> bytes:
+        return dump_xml(raw_data)
+
+    @classmethod
+    async def stream_response_data(
+        cls, rows: Iterable | AsyncIterable, codec: JsonCodec | None = None
+    ) -> AsyncIterator[bytes]:
+        yield XML_ROOT_START
+        async for row in iterate_async(rows):
+            yield dump_xml_item(_dump_row(row))
+        yield XML_ROOT_END
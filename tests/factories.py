@@ -15,3 +15,44 @@ def create_mock_request(
         raw_data=raw_data or {},
         cookies=cookies or {},
     )
+
+
+async def call_asgi_app(
+    app,
+    url: str = "/",
+    http_method: str = "GET",
+    body: bytes | list[bytes] = b"{}",
+    headers: list[tuple[bytes, bytes]] | None = None,
+) -> tuple[int, dict[bytes, bytes], bytes]:
+    """
+    Method used to call application without server and collect sent response.
+    :return: Status code, response headers and response body
+    """
+    chunks = [body] if isinstance(body, bytes) else list(body)
+    if headers is None:
+        headers = [(b"content-type", b"application/json")]
+        if len(chunks) > 1:
+            headers.append((b"transfer-encoding", b"chunked"))
+        elif chunks[0]:
+            headers.append((b"content-length", str(len(chunks[0])).encode()))
+
+    scope = {
+        "type": "http",
+        "method": http_method,
+        "path": url,
+        "headers": headers,
+    }
+    messages = []
+
+    async def receive():
+        chunk = chunks.pop(0) if chunks else b""
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    async def send(message):
+        messages.append(message)
+
+    await app(scope, receive, send)
+
+    start = messages[0]
+    response_body = b"".join(message.get("body", b"") for message in messages[1:])
+    return start["status"], dict(start["headers"]), response_body
@@ -0,0 +1,89 @@
+import asyncio
+import threading
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.background import BackgroundTask, BackgroundTaskQueue, BackgroundTasks
+from tests.factories import call_asgi_app
+
+
+@pytest.mark.asyncio
+async def test_tasks_run_after_response_is_sent():
+    events = []
+    app = TadowAPI()
+
+    async def write_audit_log(item_id: int):
+        events.append(f"audit {item_id}")
+
+    def fire_webhook(item_id: int, url: str):
+        events.append(f"webhook {item_id} {url} {threading.current_thread().name}")
+
+    @app.endpoint("/items/(?P<item_id>[0-9]+)", methods=["POST"])
+    async def update_item(item_id: int, tasks: BackgroundTasks):
+        tasks.add_task(write_audit_log, item_id)
+        tasks.add_task(fire_webhook, item_id, url="http://example.com")
+        events.append("endpoint")
+        return "updated"
+
+    await app.startup()
+    status_code, _, _ = await call_asgi_app(app, url="/items/1", http_method="POST")
+    events.append("sent")
+    await app.shutdown()
+
+    assert status_code == 200
+    assert events[:3] == ["endpoint", "sent", "audit 1"]
+    assert events[3].startswith("webhook 1 http://example.com tadow_api")
+    assert app.background_queue.stats() == (0, 0, 2, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_failed_tasks_are_counted():
+    queue = BackgroundTaskQueue(workers=1)
+
+    def fail():
+        raise ValueError("Webhook unavailable")
+
+    await queue.submit(BackgroundTask(fail, (), {}))
+    await queue.submit(BackgroundTask(lambda: None, (), {}))
+    await queue.shutdown()
+
+    assert queue.stats().failed == 1
+    assert queue.stats().completed == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overflow, expected_calls, expected_dropped",
+    [("drop", 0, 2), ("inline", 1, 1)],
+)
+async def test_overflow_policies(overflow, expected_calls, expected_dropped):
+    calls = []
+    # No workers, so queue stays full
+    queue = BackgroundTaskQueue(workers=0, max_size=1, overflow=overflow)
+
+    await queue.submit(BackgroundTask(calls.append, ("queued",), {}))
+    await queue.submit(BackgroundTask(calls.append, ("overflow",), {}))
+    assert queue.stats().queued == 1
+
+    await queue.shutdown(timeout=0.01)
+    assert len(calls) == expected_calls
+    assert queue.stats().dropped == expected_dropped
+
+
+@pytest.mark.asyncio
+async def test_block_overflow_waits_for_free_place():
+    release = asyncio.Event()
+    queue = BackgroundTaskQueue(workers=1, max_size=1)
+
+    await queue.submit(BackgroundTask(release.wait, (), {}))
+    await asyncio.sleep(0)
+    await queue.submit(BackgroundTask(release.wait, (), {}))
+    blocked = asyncio.ensure_future(queue.submit(BackgroundTask(release.wait, (), {})))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+
+    release.set()
+    await blocked
+    await queue.shutdown()
+    assert queue.stats().completed == 3
@@ -0,0 +1,172 @@
+import asyncio
+import json
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.background import BackgroundTasks
+from tadow_api.exceptions import HttpException
+from tadow_api.middleware import BaseMiddleware
+from tadow_api.requests import HTTPRequest
+from tadow_api.responses import HTTPResponse
+from tests.factories import call_asgi_app
+
+
+class Unexpected(Exception):
+    pass
+
+
+class AdminGuard(BaseMiddleware):
+    def handle_request(self, request: HTTPRequest):
+        if request.url.startswith("/api/admin"):
+            raise HttpException(message="Forbidden", status_code=403)
+
+
+def create_app(max_concurrency: int = 10) -> tuple[TadowAPI, dict]:
+    app = TadowAPI(prefix="/api")
+    calls = {"running": 0, "max_running": 0, "background": []}
+
+    @app.endpoint("/items/(?P<item_id>[0-9]+)")
+    async def get_item(item_id: int, request: HTTPRequest):
+        calls["running"] += 1
+        calls["max_running"] = max(calls["max_running"], calls["running"])
+        await asyncio.sleep(0.01)
+        calls["running"] -= 1
+        return {"id": item_id, "token": request.headers.get("authorization")}
+
+    @app.endpoint("/items", methods=["POST"])
+    async def create_item(data: dict, background_tasks: BackgroundTasks):
+        background_tasks.add_task(calls["background"].append, data["name"])
+        return data, 201
+
+    @app.endpoint("/text")
+    async def text():
+        return "plain"
+
+    @app.endpoint("/cookies")
+    async def cookies():
+        return HTTPResponse(
+            status_code=200,
+            content_type="application/json",
+            raw_data=None,
+            headers=[("set-cookie", "first=1"), ("set-cookie", "second=2")],
+            body=b"null",
+        )
+
+    @app.endpoint("/admin/users")
+    async def admin_users():
+        return ["admin"]
+
+    @app.endpoint("/broken")
+    async def broken():
+        raise Unexpected()
+
+    app.add_batch_endpoint(max_concurrency=max_concurrency)
+    app.add_middleware(AdminGuard())
+    return app, calls
+
+
+async def call_batch(app: TadowAPI, items) -> tuple[int, object]:
+    body = json.dumps(items).encode()
+    status_code, _, body = await call_asgi_app(
+        app,
+        url="/api/batch",
+        http_method="POST",
+        body=body,
+        headers=[
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"authorization", b"Bearer token"),
+        ],
+    )
+    return status_code, json.loads(body)
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_sub_requests():
+    app, calls = create_app()
+
+    status_code, results = await call_batch(
+        app,
+        [
+            {"method": "GET", "path": "/api/items/1"},
+            {"method": "POST", "path": "/api/items", "body": {"name": "new"}},
+            {"path": "/api/text"},
+        ],
+    )
+    await app.background_queue.shutdown()
+
+    assert status_code == 200
+    assert results == [
+        {"status": 200, "headers": [], "body": {"id": 1, "token": "Bearer token"}},
+        {"status": 201, "headers": [], "body": {"name": "new"}},
+        {"status": 200, "headers": [], "body": "plain"},
+    ]
+    assert calls["background"] == ["new"]
+
+
+@pytest.mark.asyncio
+async def test_batch_keeps_repeated_headers():
+    app, _ = create_app()
+
+    _, results = await call_batch(app, [{"path": "/api/cookies"}])
+
+    assert results[0]["headers"] == [
+        ["set-cookie", "first=1"],
+        ["set-cookie", "second=2"],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_runs_middlewares_for_sub_requests():
+    app, _ = create_app()
+
+    status_code, results = await call_batch(
+        app, [{"path": "/api/admin/users"}, {"path": "/api/items/1"}]
+    )
+
+    assert status_code == 200
+    assert results[0] == {"status": 403, "headers": [], "body": "Forbidden"}
+    assert results[1]["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_batch_isolates_errors():
+    app, _ = create_app()
+
+    status_code, results = await call_batch(
+        app,
+        [
+            {"path": "/api/missing"},
+            {"path": "/api/broken"},
+            {"path": "/api/batch", "method": "POST", "body": []},
+            "invalid",
+            {"path": "/api/items/2"},
+        ],
+    )
+
+    assert status_code == 200
+    assert [result["status"] for result in results] == [404, 500, 400, 400, 200]
+    assert results[1]["body"] == "Internal server error"
+
+
+@pytest.mark.asyncio
+async def test_batch_concurrency_cap():
+    app, calls = create_app(max_concurrency=2)
+
+    _, results = await call_batch(
+        app, [{"path": f"/api/items/{index}"} for index in range(6)]
+    )
+
+    assert [result["body"]["id"] for result in results] == list(range(6))
+    assert calls["max_running"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_limits():
+    app, _ = create_app()
+
+    status_code, _ = await call_batch(app, {"path": "/api/items/1"})
+    assert status_code == 400
+    status_code, _ = await call_batch(app, [{"path": "/api/items/1"}] * 51)
+    assert status_code == 400
@@ -0,0 +1,55 @@
+import pytest
+
+from benchmarks.asgi import percentile, summarize
+from benchmarks.import_time import ImportTiming, parse_importtime
+from benchmarks.pipeline import compare_results, run_scenarios
+
+
+def test_percentile():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 0.5) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([1.0], 0.99) == 1.0
+
+
+def test_summarize():
+    summary = summarize([0.001] * 10)
+    assert summary == {
+        "requests_per_second": 1000.0,
+        "p50_us": 1000.0,
+        "p99_us": 1000.0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_run_scenarios():
+    results = await run_scenarios(
+        requests=10, rounds=1, names=["dispatch_10_routes", "xml_body"]
+    )
+    assert list(results) == ["dispatch_10_routes", "xml_body"]
+    assert all(result["requests_per_second"] > 0 for result in results.values())
+
+
+def test_compare_results():
+    baseline = {
+        "json_body": {"requests_per_second": 1000.0},
+        "xml_body": {"requests_per_second": 1000.0},
+    }
+    results = {
+        "json_body": {"requests_per_second": 950.0},
+        "xml_body": {"requests_per_second": 850.0},
+        "new_scenario": {"requests_per_second": 1.0},
+    }
+    assert compare_results(results, baseline, tolerance=0.1) == ["xml_body"]
+
+
+def test_parse_importtime():
+    output = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   json.decoder\n"
+        "import time:        80 |        200 | json\n"
+    )
+    assert parse_importtime(output) == [
+        ImportTiming("json.decoder", 120, 120),
+        ImportTiming("json", 80, 200),
+    ]
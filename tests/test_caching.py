@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.caching import CachedResponse, InMemoryCacheBackend, ResponseCache
+from tests.factories import call_asgi_app
+
+app = TadowAPI()
+calls = {"items": 0, "short": 0}
+
+
+@app.endpoint(
+    "/items/(?P<item_id>\\d+)",
+    cache=ResponseCache(ttl=60, vary_headers=["accept-language"]),
+)
+def get_item(item_id: int):
+    calls["items"] += 1
+    return {"id": item_id}
+
+
+@app.endpoint("/short", cache=ResponseCache(ttl=0.05))
+def short():
+    calls["short"] += 1
+    return calls["short"]
+
+
+@pytest.mark.asyncio
+async def test_response_is_cached():
+    calls["items"] = 0
+
+    status_code, headers, first_body = await call_asgi_app(app, url="/items/1")
+    assert status_code == 200
+    etag = headers[b"etag"]
+
+    status_code, headers, body = await call_asgi_app(app, url="/items/1")
+    assert status_code == 200
+    assert body == first_body
+    assert headers[b"etag"] == etag
+    assert calls["items"] == 1
+
+    await call_asgi_app(app, url="/items/2")
+    await call_asgi_app(
+        app,
+        url="/items/1",
+        headers=[(b"content-type", b"application/json"), (b"accept-language", b"pl")],
+    )
+    assert calls["items"] == 3
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_content_type():
+    _, json_headers, json_body = await call_asgi_app(app, url="/items/3")
+    _, xml_headers, xml_body = await call_asgi_app(
+        app, url="/items/3", headers=[(b"content-type", b"application/xml")]
+    )
+    assert json_headers[b"content-type"] == b"application/json"
+    assert xml_headers[b"content-type"] == b"application/xml"
+    assert xml_body.startswith(b"<?xml")
+    assert xml_body != json_body
+
+
+@pytest.mark.asyncio
+async def test_not_modified():
+    status_code, headers, _ = await call_asgi_app(app, url="/items/5")
+    assert status_code == 200
+
+    status_code, not_modified_headers, body = await call_asgi_app(
+        app,
+        url="/items/5",
+        headers=[
+            (b"content-type", b"application/json"),
+            (b"if-none-match", b'"other", ' + headers[b"etag"]),
+        ],
+    )
+    assert status_code == 304
+    assert body == b""
+    assert not_modified_headers[b"etag"] == headers[b"etag"]
+
+
+@pytest.mark.asyncio
+async def test_cache_ttl():
+    calls["short"] = 0
+
+    await call_asgi_app(app, url="/short")
+    await call_asgi_app(app, url="/short")
+    assert calls["short"] == 1
+
+    await asyncio.sleep(0.1)
+    await call_asgi_app(app, url="/short")
+    assert calls["short"] == 2
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_eviction():
+    entry = CachedResponse(200, "application/json", [], b"x" * 1000)
+    backend = InMemoryCacheBackend(max_size=entry.size * 2)
+
+    await backend.set("first", entry, ttl=60)
+    await backend.set("second", entry, ttl=60)
+    await backend.get("first")
+    await backend.set("third", entry, ttl=60)
+
+    assert len(backend) == 2
+    assert await backend.get("second") is None
+    assert await backend.get("first") is entry
+    assert backend.size == entry.size * 2
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_accounts_encoded_bodies():
+    first = CachedResponse(200, "application/json", [], b"x" * 1000)
+    second = CachedResponse(200, "application/json", [], b"y" * 1000)
+    backend = InMemoryCacheBackend(max_size=first.size * 2 + 100)
+
+    await backend.set("first", first, ttl=60)
+    await backend.set("second", second, ttl=60)
+    second.add_encoded_body("gzip", b"z" * 500)
+
+    assert await backend.get("first") is None
+    assert backend.size == second.size <= backend.max_size
+
+
+def test_requests_with_body_are_not_cached():
+    with pytest.raises(AttributeError):
+        ResponseCache(methods=["GET", "POST"])
+
+
+def test_cached_response_serialization():
+    entry = CachedResponse(200, "application/json", [("x-test", "1")], b'{"id": 1}')
+    restored = CachedResponse.from_bytes(entry.to_bytes())
+
+    assert restored.status_code == entry.status_code
+    assert restored.headers == entry.headers
+    assert restored.body == entry.body
+    assert restored.etag == entry.etag
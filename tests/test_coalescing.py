@@ -0,0 +1,167 @@
+import asyncio
+
+import pytest
+
+from tadow_api.responses import StreamingResponse
+from tadow_api.routing import APIRoute
+from tests.factories import create_mock_request
+
+
+class SlowEndpoint:
+    def __init__(self, error: Exception | None = None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.error = error
+
+    async def __call__(self, item_id: str):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return {"id": item_id}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_call():
+    endpoint = SlowEndpoint()
+    route = APIRoute(path="/(?P<item_id>\\d+)", endpoint_func=endpoint, coalesce=True)
+
+    waiters = [
+        asyncio.create_task(route(create_mock_request(url="/1"), item_id="1"))
+        for _ in range(10)
+    ]
+    other = asyncio.create_task(route(create_mock_request(url="/2"), item_id="2"))
+    await asyncio.sleep(0)
+    endpoint.release.set()
+
+    responses = await asyncio.gather(*waiters)
+    assert endpoint.calls == 2
+    assert all(response.body == responses[0].body for response in responses)
+    assert len({id(response) for response in responses}) == 10
+    assert responses[0].raw_data == {"id": "1"}
+    assert (await other).raw_data == {"id": "2"}
+    assert route._in_flight == {}
+
+
+@pytest.mark.asyncio
+async def test_error_propagates_to_every_waiter():
+    endpoint = SlowEndpoint(error=ValueError("failed"))
+    route = APIRoute(path="/(?P<item_id>\\d+)", endpoint_func=endpoint, coalesce=True)
+
+    waiters = [
+        asyncio.create_task(route(create_mock_request(url="/1"), item_id="1"))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    endpoint.release.set()
+
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert endpoint.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_cancel_shared_call():
+    endpoint = SlowEndpoint()
+    route = APIRoute(path="/(?P<item_id>\\d+)", endpoint_func=endpoint, coalesce=True)
+
+    first = asyncio.create_task(route(create_mock_request(url="/1"), item_id="1"))
+    second = asyncio.create_task(route(create_mock_request(url="/1"), item_id="1"))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    endpoint.release.set()
+
+    assert (await second).raw_data == {"id": "1"}
+    assert first.cancelled()
+    assert endpoint.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_requests_with_body_are_not_coalesced():
+    release = asyncio.Event()
+
+    async def endpoint(request):
+        await release.wait()
+        return request.data
+
+    route = APIRoute(path="/", endpoint_func=endpoint, methods=["POST"], coalesce=True)
+
+    first = asyncio.create_task(
+        route(create_mock_request(http_method="POST", raw_data={"user": 1}))
+    )
+    second = asyncio.create_task(
+        route(create_mock_request(http_method="POST", raw_data={"user": 2}))
+    )
+    await asyncio.sleep(0)
+    release.set()
+
+    assert (await first).raw_data == {"user": 1}
+    assert (await second).raw_data == {"user": 2}
+
+
+@pytest.mark.asyncio
+async def test_requests_with_different_content_types_are_not_coalesced():
+    endpoint = SlowEndpoint()
+    route = APIRoute(path="/(?P<item_id>\\d+)", endpoint_func=endpoint, coalesce=True)
+
+    json_response = asyncio.create_task(
+        route(create_mock_request(url="/1"), item_id="1")
+    )
+    xml_response = asyncio.create_task(
+        route(
+            create_mock_request(url="/1", content_type="application/xml"), item_id="1"
+        )
+    )
+    await asyncio.sleep(0)
+    endpoint.release.set()
+
+    json_response, xml_response = await asyncio.gather(json_response, xml_response)
+    assert endpoint.calls == 2
+    assert json_response.content_type == "application/json"
+    assert xml_response.content_type == "application/xml"
+
+
+@pytest.mark.asyncio
+async def test_waiters_modify_own_response_headers():
+    endpoint = SlowEndpoint()
+    route = APIRoute(path="/(?P<item_id>\\d+)", endpoint_func=endpoint, coalesce=True)
+
+    waiters = [
+        asyncio.create_task(route(create_mock_request(url="/1"), item_id="1"))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    endpoint.release.set()
+
+    for response in await asyncio.gather(*waiters):
+        response.headers.append(("x-request", "1"))
+        assert response.headers == [("x-request", "1")]
+
+
+@pytest.mark.asyncio
+async def test_streamed_responses_are_not_shared():
+    release = asyncio.Event()
+    calls = []
+
+    async def endpoint():
+        calls.append(True)
+        await release.wait()
+
+        async def rows():
+            yield b"row"
+
+        return StreamingResponse(content=rows())
+
+    route = APIRoute(path="/", endpoint_func=endpoint, coalesce=True)
+    waiters = [
+        asyncio.create_task(route(create_mock_request(url="/"))) for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    responses = await asyncio.gather(*waiters)
+    assert len(calls) == 2
+    for response in responses:
+        assert [chunk async for chunk in response.content] == [b"row"]
@@ -0,0 +1,53 @@
+import pytest
+
+from tadow_api.codecs import JsonCodec, StdlibJsonCodec, get_json_codec
+from tadow_api.content_parsers import ContentParser
+from tadow_api.exceptions import HttpException
+
+payload = {"id": 1, "name": "zażółć", "tags": ["a", "b"], "nested": {"value": 0.5}}
+
+
+def available_codecs() -> list[str]:
+    codecs = ["json"]
+    for name in ["orjson", "msgspec"]:
+        try:
+            get_json_codec(name)
+        except ImportError:
+            continue
+        codecs.append(name)
+    return codecs
+
+
+@pytest.mark.parametrize("codec_name", available_codecs())
+def test_codec_round_trip(codec_name):
+    codec = get_json_codec(codec_name)
+
+    encoded = ContentParser.parse_response(
+        raw_data=payload, content_type="application/json", codec=codec
+    )
+    assert isinstance(encoded, bytes)
+    assert (
+        ContentParser.parse_request(
+            raw_data=encoded, content_type="application/json", codec=codec
+        )
+        == payload
+    )
+
+
+@pytest.mark.parametrize("codec_name", available_codecs())
+def test_codec_invalid_data(codec_name):
+    with pytest.raises(HttpException):
+        ContentParser.parse_request(
+            raw_data=b"{invalid",
+            content_type="application/json",
+            codec=get_json_codec(codec_name),
+        )
+
+
+def test_get_json_codec():
+    assert isinstance(get_json_codec("json"), StdlibJsonCodec)
+    assert isinstance(get_json_codec("auto"), JsonCodec)
+    assert get_json_codec("json") is get_json_codec(StdlibJsonCodec.name)
+
+    with pytest.raises(AttributeError):
+        get_json_codec("unknown")
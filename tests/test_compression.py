@@ -0,0 +1,150 @@
+import gzip
+import json
+import zlib
+
+import pytest
+
+from tadow_api import TadowAPI, compression
+from tadow_api.caching import ResponseCache
+from tadow_api.compression import CompressionMiddleware, negotiate_encoding
+from tadow_api.requests import Headers
+from tadow_api.responses import StreamingResponse
+from tests.factories import call_asgi_app, create_mock_request
+
+app = TadowAPI(middlewares=[CompressionMiddleware(minimum_size=100)])
+cache = ResponseCache(ttl=60)
+rows = [{"id": index, "name": "item"} for index in range(100)]
+
+
+@app.endpoint("/rows")
+def get_rows():
+    return rows
+
+
+@app.endpoint("/small")
+def small():
+    return "small"
+
+
+@app.endpoint("/cached", cache=cache)
+def cached():
+    return rows
+
+
+@app.endpoint("/stream")
+def stream():
+    return StreamingResponse.from_rows(rows)
+
+
+def headers_with(accept_encoding: bytes) -> list[tuple[bytes, bytes]]:
+    return [
+        (b"content-type", b"application/json"),
+        (b"accept-encoding", accept_encoding),
+    ]
+
+
+def test_negotiate_encoding():
+    encodings = ("gzip", "deflate")
+
+    assert negotiate_encoding("gzip, deflate, br", encodings) == "gzip"
+    assert negotiate_encoding("deflate", encodings) == "deflate"
+    assert negotiate_encoding("gzip;q=0.5, deflate", encodings) == "deflate"
+    assert negotiate_encoding("gzip;q=0, *", encodings) == "deflate"
+    assert negotiate_encoding("br", encodings) is None
+    assert negotiate_encoding(None, encodings) is None
+
+
+@pytest.mark.asyncio
+async def test_gzip_response():
+    _, headers, body = await call_asgi_app(
+        app, url="/rows", headers=headers_with(b"gzip")
+    )
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert headers[b"vary"] == b"accept-encoding"
+    assert json.loads(gzip.decompress(body)) == rows
+
+
+@pytest.mark.asyncio
+async def test_deflate_response():
+    _, headers, body = await call_asgi_app(
+        app, url="/rows", headers=headers_with(b"deflate")
+    )
+
+    assert headers[b"content-encoding"] == b"deflate"
+    assert json.loads(zlib.decompress(body)) == rows
+
+
+@pytest.mark.asyncio
+async def test_not_compressed():
+    _, headers, body = await call_asgi_app(
+        app, url="/small", headers=headers_with(b"gzip")
+    )
+    assert b"content-encoding" not in headers
+    assert body == b'"small"'
+
+    _, headers, body = await call_asgi_app(
+        app, url="/rows", headers=headers_with(b"br")
+    )
+    assert b"content-encoding" not in headers
+    assert headers[b"vary"] == b"accept-encoding"
+    assert json.loads(body) == rows
+
+
+@pytest.mark.asyncio
+async def test_cached_response_is_compressed_once(monkeypatch):
+    original_compress = compression.compress
+    compress_calls = []
+
+    def counting_compress(*args):
+        compress_calls.append(args)
+        return original_compress(*args)
+
+    monkeypatch.setattr(compression, "compress", counting_compress)
+
+    _, headers, body = await call_asgi_app(
+        app, url="/cached", headers=headers_with(b"gzip")
+    )
+    assert headers[b"etag"].startswith(b'W/"')
+
+    entry = await cache.backend.get(cache.build_key(create_mock_request(url="/cached")))
+    assert entry.encoded_bodies["gzip"] == body
+
+    _, _, second_body = await call_asgi_app(
+        app, url="/cached", headers=headers_with(b"gzip")
+    )
+    assert second_body == body
+    assert len(compress_calls) == 1
+
+    status_code, _, _ = await call_asgi_app(
+        app,
+        url="/cached",
+        headers=[*headers_with(b"gzip"), (b"if-none-match", headers[b"etag"])],
+    )
+    assert status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_streamed_response_is_compressed():
+    _, headers, body = await call_asgi_app(
+        app, url="/stream", headers=headers_with(b"gzip")
+    )
+
+    assert headers[b"content-encoding"] == b"gzip"
+    assert json.loads(gzip.decompress(body)) == rows
+
+
+@pytest.mark.asyncio
+async def test_shared_streamed_response_is_not_modified():
+    shared = StreamingResponse(content=[b"chunk"], headers=[("x-test", "1")])
+
+    async def call_next(request):
+        return shared
+
+    request = create_mock_request()
+    request.headers = Headers([(b"accept-encoding", b"br")])
+    response = await CompressionMiddleware()(request, call_next)
+
+    assert response is not shared
+    assert response.headers == [("x-test", "1"), ("vary", "accept-encoding")]
+    assert shared.headers == [("x-test", "1")]
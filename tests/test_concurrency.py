@@ -0,0 +1,148 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.concurrency import BoundedThreadPool, ConcurrencyLimiter
+from tests.factories import call_asgi_app
+
+app = TadowAPI(max_workers=2, process_workers=1)
+
+
+@app.endpoint("/threaded")
+def threaded():
+    return threading.current_thread().name
+
+
+@app.endpoint("/inline", executor="inline")
+def inline():
+    return threading.current_thread().name
+
+
+@app.endpoint("/process/(?P<number>\\d+)", methods=["POST"], executor="process")
+def process(number: int, data: dict):
+    return {"pid": os.getpid(), "result": number * data["multiplier"]}
+
+
+@app.endpoint("/slow", executor="process", timeout=0.1)
+def slow():
+    time.sleep(1)
+
+
+@pytest.mark.asyncio
+async def test_sync_endpoint_executors():
+    _, _, body = await call_asgi_app(app, url="/threaded")
+    assert json.loads(body).startswith("tadow_api")
+
+    _, _, body = await call_asgi_app(app, url="/inline")
+    assert json.loads(body) == threading.current_thread().name
+
+
+@pytest.mark.asyncio
+async def test_thread_pool_counters():
+    pool = BoundedThreadPool(max_workers=1)
+    release = threading.Event()
+
+    first = asyncio.create_task(pool.run(release.wait, {"timeout": 5}))
+    second = asyncio.create_task(pool.run(release.wait, {"timeout": 5}))
+    await asyncio.sleep(0.05)
+
+    assert pool.max_workers == 1
+    assert pool.active_workers == 1
+    assert pool.queue_depth == 1
+
+    release.set()
+    assert await asyncio.gather(first, second) == [True, True]
+    assert pool.active_workers == 0
+    assert pool.queue_depth == 0
+    pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_executor():
+    await app.startup()
+    try:
+        status_code, _, body = await call_asgi_app(
+            app, url="/process/6", http_method="POST", body=b'{"multiplier": 7}'
+        )
+        assert status_code == 200
+        assert json.loads(body)["result"] == 42
+        assert json.loads(body)["pid"] != os.getpid()
+
+        status_code, _, _ = await call_asgi_app(app, url="/slow")
+        assert status_code == 504
+    finally:
+        app.process_pool.shutdown()
+
+
+def test_process_executor_rejects_request_parameter():
+    def endpoint(request):
+        return request
+
+    with pytest.raises(AttributeError):
+        app.endpoint("/invalid", executor="process")(endpoint)
+
+
+@pytest.mark.asyncio
+async def test_limiter_queues_and_rejects():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1)
+
+    assert await limiter.acquire()
+    queued = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    assert not await limiter.acquire()
+    assert limiter.stats() == (1, 1, 1, 1, 0)
+
+    limiter.release()
+    assert await queued
+    limiter.release()
+    assert limiter.stats() == (0, 0, 2, 1, 0)
+    assert limiter.wait_time.count == 2
+
+
+@pytest.mark.asyncio
+async def test_limiter_max_wait_and_cancellation():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=5, max_wait=0.01)
+    assert await limiter.acquire()
+
+    assert not await limiter.acquire()
+    cancelled = asyncio.ensure_future(limiter.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+
+    limiter.release()
+    assert limiter.stats() == (0, 0, 1, 0, 1)
+    assert await limiter.acquire()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scope", ["route", "global"])
+async def test_overload_is_shed_with_503(scope):
+    limiter = ConcurrencyLimiter(max_concurrency=1, retry_after=3)
+    limited_app = TadowAPI(concurrency_limiter=limiter if scope == "global" else None)
+    release = asyncio.Event()
+
+    @limited_app.endpoint(
+        "/slow", concurrency_limiter=limiter if scope == "route" else None
+    )
+    async def slow():
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(call_asgi_app(limited_app, url="/slow"))
+    await asyncio.sleep(0.01)
+    status_code, headers, body = await call_asgi_app(limited_app, url="/slow")
+    assert status_code == 503
+    assert headers[b"retry-after"] == b"3"
+    assert body == b'"Service unavailable"'
+
+    release.set()
+    assert (await first)[0] == 200
+    assert limiter.stats().rejected == 1
+    assert limiter.stats().active == 0
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from tadow_api import TadowAPI
+from tests.factories import call_asgi_app
+
+
+class ConnectionPool:
+    def __init__(self):
+        self.is_open = True
+        self.acquired = 0
+
+    async def close(self):
+        self.is_open = False
+
+
+class LifespanClient:
+    """
+    Client driving application lifespan in background task, like ASGI server.
+    """
+
+    def __init__(self, app):
+        self.received = asyncio.Queue()
+        self.sent = asyncio.Queue()
+        self.task = asyncio.ensure_future(
+            app({"type": "lifespan"}, self.received.get, self.sent.put)
+        )
+
+    async def send(self, message_type: str) -> dict:
+        self.received.put_nowait({"type": message_type})
+        sent = asyncio.ensure_future(self.sent.get())
+        await asyncio.wait([sent, self.task], return_when=asyncio.FIRST_COMPLETED)
+        if not sent.done():
+            sent.cancel()
+            self.task.result()
+        return sent.result()
+
+
+@pytest.mark.asyncio
+async def test_lifespan_hooks_and_state():
+    calls = []
+    app = TadowAPI(on_shutdown=[lambda: calls.append("sync shutdown")])
+
+    @app.on_startup
+    async def open_pool():
+        calls.append("startup")
+        app.state.db_pool = ConnectionPool()
+
+    @app.on_shutdown
+    async def close_pool():
+        calls.append("async shutdown")
+        await app.state.db_pool.close()
+
+    @app.endpoint("/items/(?P<item_id>[0-9]+)")
+    async def get_item(item_id: int, db_pool: ConnectionPool):
+        db_pool.acquired += 1
+        return {"id": item_id, "pool_open": db_pool.is_open}
+
+    lifespan = LifespanClient(app)
+    assert await lifespan.send("lifespan.startup") == {
+        "type": "lifespan.startup.complete"
+    }
+
+    pool = app.state.db_pool
+    for _ in range(2):
+        status_code, _, body = await call_asgi_app(app, url="/items/1")
+        assert status_code == 200
+        assert body == b'{"id":1,"pool_open":true}'
+    assert app.state.db_pool is pool
+    assert pool.acquired == 2
+
+    assert await lifespan.send("lifespan.shutdown") == {
+        "type": "lifespan.shutdown.complete"
+    }
+    await lifespan.task
+    assert calls == ["startup", "sync shutdown", "async shutdown"]
+    assert not pool.is_open
+
+
+@pytest.mark.asyncio
+async def test_startup_fails_on_unbindable_parameter():
+    app = TadowAPI()
+
+    @app.endpoint("/items")
+    def get_items(db_pool):
+        return []
+
+    lifespan = LifespanClient(app)
+    message = await lifespan.send("lifespan.startup")
+    assert message["type"] == "lifespan.startup.failed"
+    assert "db_pool" in message["message"]
+    with pytest.raises(AttributeError):
+        await lifespan.task
+
+
+@pytest.mark.asyncio
+async def test_startup_failed_message():
+    app = TadowAPI()
+
+    @app.on_startup
+    def fail():
+        raise RuntimeError("Database unavailable")
+
+    lifespan = LifespanClient(app)
+    message = await lifespan.send("lifespan.startup")
+    assert message["type"] == "lifespan.startup.failed"
+    assert "Database unavailable" in message["message"]
+    with pytest.raises(RuntimeError):
+        await lifespan.task
+
+
+@pytest.mark.asyncio
+async def test_startup_fails_on_conflicting_routes():
+    app = TadowAPI()
+
+    @app.endpoint("/items/(?P<item_id>[0-9]+)")
+    def get_item(item_id: int):
+        return item_id
+
+    @app.endpoint("/items/(?P<id>[0-9]+)", methods=["POST"])
+    def update_item(id: int):
+        return id
+
+    with pytest.raises(AttributeError, match="Conflicting routes"):
+        await app.startup()
@@ -0,0 +1,126 @@
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.concurrency import ConcurrencyLimiter
+from tadow_api.metrics import PHASES, Histogram, Metrics
+from tests.factories import call_asgi_app
+
+
+def test_histogram_buckets():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.cumulative_counts() == [2, 3, 4]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+
+
+@pytest.mark.asyncio
+async def test_metrics_disabled():
+    app = TadowAPI()
+
+    @app.endpoint("/")
+    def index():
+        return "index"
+
+    await call_asgi_app(app)
+
+    assert app.metrics is None
+    assert app.compile_routes().routes["/"].metrics is None
+    with pytest.raises(AttributeError):
+        app.add_metrics_endpoint()
+
+
+@pytest.mark.asyncio
+async def test_route_phases_and_status_codes():
+    app = TadowAPI(metrics=True)
+
+    @app.endpoint("/items/(?P<item_id>[0-9]+)", methods=["GET", "POST"])
+    def get_item(item_id: int, data: dict):
+        return {"id": item_id, **data}
+
+    await call_asgi_app(app, url="/items/1", http_method="POST", body=b'{"a": 1}')
+    await call_asgi_app(app, url="/items/1", http_method="POST", body=b"{")
+    await call_asgi_app(app, url="/missing")
+
+    route_metrics = app.metrics.routes["/items/(?P<item_id>[0-9]+)"]
+    histograms = route_metrics.histograms
+    assert set(histograms) == set(PHASES)
+    assert histograms["read"].count == 2
+    assert histograms["handler"].count == 1
+    assert histograms["serialize"].count == 1
+    assert histograms["send"].count == 2
+    assert histograms["total"].count == 2
+
+    assert app.metrics.responses == {
+        ("/items/(?P<item_id>[0-9]+)", "POST", 200): 1,
+        ("/items/(?P<item_id>[0-9]+)", "POST", 400): 1,
+        ("<unmatched>", "GET", 404): 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    metrics = Metrics(buckets=(0.5, 1.0))
+    app = TadowAPI(metrics=metrics)
+
+    @app.endpoint('/say_"hi"')
+    def say_hi():
+        return "hi"
+
+    app.add_metrics_endpoint()
+    await call_asgi_app(app, url='/say_"hi"')
+    status_code, headers, body = await call_asgi_app(app, url="/metrics")
+
+    assert status_code == 200
+    assert headers[b"content-type"].startswith(b"text/plain")
+    lines = body.decode("utf-8").splitlines()
+    assert "# TYPE tadow_request_duration_seconds histogram" in lines
+    assert (
+        'tadow_request_duration_seconds_bucket{route="/say_\\"hi\\"",'
+        'phase="total",le="+Inf"} 1'
+    ) in lines
+    assert (
+        'tadow_request_duration_seconds_count{route="/say_\\"hi\\"",phase="handler"} 1'
+        in lines
+    )
+    assert (
+        'tadow_responses_total{route="/say_\\"hi\\"",method="GET",status="200"} 1'
+    ) in lines
+
+
+@pytest.mark.asyncio
+async def test_unknown_methods_share_label():
+    app = TadowAPI(metrics=True)
+    app.add_metrics_endpoint()
+
+    for http_method in ['GET"}\n', "BREW", "PROPFIND"]:
+        await call_asgi_app(app, url="/missing", http_method=http_method)
+    _, _, body = await call_asgi_app(app, url="/metrics")
+
+    assert app.metrics.responses[("<unmatched>", "OTHER", 404)] == 3
+    assert (
+        'tadow_responses_total{route="<unmatched>",method="OTHER",status="404"} 3'
+    ) in body.decode("utf-8").splitlines()
+
+
+@pytest.mark.asyncio
+async def test_limiter_metrics():
+    limiter = ConcurrencyLimiter(max_concurrency=1)
+    app = TadowAPI(metrics=True, concurrency_limiter=limiter)
+
+    @app.endpoint("/limited", concurrency_limiter=ConcurrencyLimiter(max_concurrency=1))
+    async def limited():
+        return "limited"
+
+    await call_asgi_app(app, url="/limited")
+    lines = app.metrics.render_prometheus().splitlines()
+
+    assert 'tadow_limiter_wait_seconds_count{limiter="<global>"} 1' in lines
+    assert 'tadow_limiter_wait_seconds_count{limiter="/limited"} 1' in lines
+    assert (
+        'tadow_limiter_rejections_total{limiter="<global>",reason="queue_full"} 0'
+    ) in lines
+    assert 'tadow_limiter_queued{limiter="/limited"} 0' in lines
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.middleware import BaseMiddleware
+from tadow_api.responses import HTTPResponse
+from tests.factories import call_asgi_app
+
+
+class RecordingMiddleware(BaseMiddleware):
+    def __init__(self, name: str, calls: list[str]):
+        self.name = name
+        self.calls = calls
+
+    async def __call__(self, request, call_next):
+        self.calls.append(f"{self.name}:request")
+        await asyncio.sleep(0)
+        response = await call_next(request)
+        self.calls.append(f"{self.name}:response")
+        return response
+
+
+class ShortCircuitMiddleware(BaseMiddleware):
+    async def __call__(self, request, call_next):
+        if request.url == "/cached":
+            return HTTPResponse(
+                status_code=200,
+                content_type="application/json",
+                raw_data="cached",
+                headers=[],
+            )
+        return await call_next(request)
+
+
+class HookMiddleware(BaseMiddleware):
+    def __init__(self):
+        self.responses = []
+
+    def handle_response(self, response):
+        self.responses.append(response.status_code)
+
+
+@pytest.mark.asyncio
+async def test_middleware_order():
+    calls = []
+    app = TadowAPI(
+        middlewares=[
+            RecordingMiddleware("outer", calls),
+            RecordingMiddleware("inner", calls),
+        ]
+    )
+
+    @app.endpoint("/")
+    def index():
+        calls.append("endpoint")
+        return "index"
+
+    status_code, _, _ = await call_asgi_app(app)
+
+    assert status_code == 200
+    assert calls == [
+        "outer:request",
+        "inner:request",
+        "endpoint",
+        "inner:response",
+        "outer:response",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_middleware_short_circuit():
+    app = TadowAPI(middlewares=[ShortCircuitMiddleware()])
+
+    status_code, _, body = await call_asgi_app(app, url="/cached")
+
+    assert status_code == 200
+    assert body == b'"cached"'
+    assert app.route_cache_info().misses == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_hooks_see_error_responses():
+    hooks = HookMiddleware()
+    app = TadowAPI()
+    app.add_middleware(hooks)
+
+    @app.endpoint("/")
+    def index():
+        return "index"
+
+    await call_asgi_app(app)
+    await call_asgi_app(app, url="/missing")
+
+    assert hooks.responses == [200, 404]
@@ -0,0 +1,228 @@
+import json
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.middleware import BaseMiddleware
+from tadow_api.requests import Headers, HTTPRequest
+from tests.factories import call_asgi_app
+
+app = TadowAPI(max_body_size=32)
+
+
+@app.endpoint("/echo", methods=["POST"])
+def echo(request: HTTPRequest):
+    return request.data
+
+
+@app.endpoint("/large", methods=["POST"], max_body_size=1024)
+def large(request: HTTPRequest):
+    return len(request.data["value"])
+
+
+@app.endpoint("/ignore", methods=["GET", "POST"])
+def ignore():
+    return "ok"
+
+
+@app.endpoint("/user")
+def user(request: HTTPRequest):
+    return request.state.user
+
+
+class AuthenticationMiddleware(BaseMiddleware):
+    def handle_request(self, request: HTTPRequest):
+        request.state.user = request.headers.get("authorization")
+
+
+app.add_middleware(AuthenticationMiddleware())
+
+
+@app.endpoint("/stream", methods=["POST"], stream_request_body=True)
+async def stream(request: HTTPRequest):
+    return [len(chunk) async for chunk in request.stream()]
+
+
+@pytest.mark.asyncio
+async def test_chunked_body_is_joined():
+    status_code, _, body = await call_asgi_app(
+        app, url="/echo", http_method="POST", body=[b'{"val', b'ue": ', b"1}"]
+    )
+    assert status_code == 200
+    assert json.loads(body) == {"value": 1}
+
+
+@pytest.mark.asyncio
+async def test_body_size_limit():
+    status_code, _, _ = await call_asgi_app(
+        app, url="/echo", http_method="POST", body=[b'{"value": "', b"a" * 64, b'"}']
+    )
+    assert status_code == 413
+
+    status_code, _, _ = await call_asgi_app(
+        app,
+        url="/echo",
+        http_method="POST",
+        headers=[(b"content-type", b"application/json"), (b"content-length", b"64")],
+    )
+    assert status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_route_body_size_limit():
+    status_code, _, body = await call_asgi_app(
+        app, url="/large", http_method="POST", body=b'{"value": "' + b"a" * 64 + b'"}'
+    )
+    assert status_code == 200
+    assert body == b"64"
+
+
+@pytest.mark.asyncio
+async def test_stream_body():
+    status_code, _, body = await call_asgi_app(
+        app, url="/stream", http_method="POST", body=[b"a" * 10, b"b" * 20]
+    )
+    assert status_code == 200
+    assert json.loads(body) == [10, 20]
+
+
+@pytest.mark.asyncio
+async def test_body_is_memoized():
+    chunks = [b"abc", b"def"]
+
+    async def receive():
+        chunk = chunks.pop(0)
+        return {"type": "http.request", "body": chunk, "more_body": bool(chunks)}
+
+    request = HTTPRequest(
+        http_method="POST",
+        url="/",
+        cookies={},
+        content_type="application/json",
+        raw_data=None,
+        receive=receive,
+    )
+
+    assert await request.body() == b"abcdef"
+    assert await request.body() == b"abcdef"
+    assert [chunk async for chunk in request.stream()] == [b"abcdef"]
+
+
+def test_headers():
+    headers = Headers(
+        [
+            (b"content-type", b"application/json"),
+            (b"X-Forwarded-For", b"10.0.0.1"),
+            (b"x-forwarded-for", b"10.0.0.2"),
+        ]
+    )
+
+    assert headers.get("Content-Type") == "application/json"
+    assert headers.get_raw(b"content-type") == b"application/json"
+    assert headers.getlist("x-forwarded-for") == ["10.0.0.1", "10.0.0.2"]
+    assert headers["X-FORWARDED-FOR"] == "10.0.0.1"
+    assert "accept" not in headers
+    assert headers.get("accept", "*/*") == "*/*"
+    assert len(headers) == 2
+
+
+def test_cookies_from_cookie_header():
+    request = HTTPRequest(
+        http_method="GET",
+        url="/",
+        cookies=None,
+        content_type="application/json",
+        raw_data=None,
+        headers=Headers(
+            [(b"cookie", b"session=abc==; theme=dark"), (b"cookie", b"a=1")]
+        ),
+    )
+
+    assert {name: cookie.value for name, cookie in request.cookies.items()} == {
+        "session": "abc==",
+        "theme": "dark",
+        "a": "1",
+    }
+
+
+@pytest.mark.asyncio
+async def test_bodyless_request_is_not_read():
+    async def receive():
+        raise AssertionError("Body of GET request shouldn't be read")
+
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await app(
+        {"type": "http", "method": "GET", "path": "/ignore", "headers": []},
+        receive,
+        send,
+    )
+    assert messages[0]["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_data_is_parsed_on_access():
+    status_code, _, _ = await call_asgi_app(
+        app, url="/ignore", http_method="POST", body=b"{invalid"
+    )
+    assert status_code == 200
+
+    status_code, _, _ = await call_asgi_app(
+        app, url="/echo", http_method="POST", body=b"{invalid"
+    )
+    assert status_code == 400
+
+    status_code, _, _ = await call_asgi_app(
+        app,
+        url="/echo",
+        http_method="POST",
+        headers=[(b"content-length", b"2")],
+    )
+    assert status_code == 415
+
+
+@pytest.mark.asyncio
+async def test_middleware_sets_request_state():
+    _, _, body = await call_asgi_app(
+        app, url="/user", headers=[(b"authorization", b"user")]
+    )
+    assert body == b'"user"'
+
+
+class DataMiddleware(BaseMiddleware):
+    def __init__(self, receive: bool):
+        self.receive = receive
+        self.seen = []
+
+    async def __call__(self, request: HTTPRequest, call_next):
+        if self.receive:
+            await request.receive_data()
+        self.seen.append(request.data)
+        return await call_next(request)
+
+
+@pytest.mark.asyncio
+async def test_middleware_reads_data():
+    middleware = DataMiddleware(receive=True)
+    data_app = TadowAPI(middlewares=[middleware])
+    data_app.endpoint("/echo", methods=["POST"])(echo)
+
+    status_code, _, body = await call_asgi_app(
+        data_app, url="/echo", http_method="POST", body=b'{"user": 1}'
+    )
+    assert (status_code, json.loads(body)) == (200, {"user": 1})
+    assert middleware.seen == [{"user": 1}]
+
+
+@pytest.mark.asyncio
+async def test_middleware_reading_data_before_receiving_fails():
+    data_app = TadowAPI(middlewares=[DataMiddleware(receive=False)])
+    data_app.endpoint("/echo", methods=["POST"])(echo)
+
+    with pytest.raises(RuntimeError):
+        await call_asgi_app(
+            data_app, url="/echo", http_method="POST", body=b'{"user": 1}'
+        )
@@ -0,0 +1,193 @@
+import asyncio
+import json
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.content_parsers import ContentParser
+from tadow_api.responses import HTTPResponse, StreamingResponse
+from tests.factories import call_asgi_app, create_mock_request
+
+app = TadowAPI()
+
+
+@app.endpoint("/export")
+def export():
+    return StreamingResponse.from_rows({"id": index} for index in range(1000))
+
+
+@app.endpoint("/export.ndjson")
+async def export_ndjson():
+    async def rows():
+        for index in range(3):
+            yield {"id": index}
+
+    return StreamingResponse.from_rows(rows(), content_type="application/x-ndjson")
+
+
+@app.endpoint("/broken-export")
+def broken_export():
+    def rows():
+        yield {"id": 0}
+        raise ValueError("Row failed")
+
+    return StreamingResponse.from_rows(rows(), content_type="application/x-ndjson")
+
+
+async def collect_messages(response: StreamingResponse) -> list[dict]:
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await response.send_response(send)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_stream_json_array():
+    status_code, _, body = await call_asgi_app(app, url="/export")
+    assert status_code == 200
+    assert json.loads(body) == [{"id": index} for index in range(1000)]
+
+
+@pytest.mark.asyncio
+async def test_stream_ndjson():
+    status_code, _, body = await call_asgi_app(app, url="/export.ndjson")
+    assert status_code == 200
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"id": 0},
+        {"id": 1},
+        {"id": 2},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_stream_empty_json_array():
+    messages = await collect_messages(StreamingResponse.from_rows([]))
+    assert b"".join(message.get("body", b"") for message in messages) == b"[]"
+
+
+@pytest.mark.asyncio
+async def test_stream_chunks():
+    messages = await collect_messages(
+        StreamingResponse(content=iter([b"first", "second", b""]))
+    )
+
+    assert messages[0]["type"] == "http.response.start"
+    assert [message["body"] for message in messages[1:]] == [b"first", b"second", b""]
+    assert [message["more_body"] for message in messages[1:]] == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_is_not_followed_by_error_response():
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/broken-export", "headers": []}
+    with pytest.raises(ValueError):
+        await app(scope, receive, send)
+
+    assert [message["type"] for message in messages] == [
+        "http.response.start",
+        "http.response.body",
+    ]
+    assert messages[0]["status"] == 200
+
+
+@pytest.mark.asyncio
+async def test_stream_encoder_batches_rows():
+    chunks = [
+        chunk
+        async for chunk in ContentParser.stream_response(
+            ({"id": index} for index in range(100)),
+            content_type="application/json",
+            chunk_size=256,
+        )
+    ]
+
+    assert len(chunks) > 1
+    assert all(len(chunk) >= 256 for chunk in chunks[:-1])
+    assert json.loads(b"".join(chunks)) == [{"id": index} for index in range(100)]
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_row_before_producer_finishes():
+    produced = []
+    release = asyncio.Event()
+
+    async def rows():
+        produced.append(0)
+        yield {"id": 0}
+        await release.wait()
+        produced.append(1)
+        yield {"id": 1}
+
+    chunks = StreamingResponse.from_rows(
+        rows(), content_type="application/x-ndjson"
+    ).content
+    assert json.loads(await asyncio.wait_for(anext(chunks), timeout=1)) == {"id": 0}
+    assert produced == [0]
+
+    release.set()
+    assert [json.loads(chunk) async for chunk in chunks] == [{"id": 1}]
+
+
+@pytest.mark.asyncio
+async def test_buffered_stream_is_flushed_when_producer_is_slow():
+    release = asyncio.Event()
+
+    async def rows():
+        yield {"id": 0}
+        await release.wait()
+        yield {"id": 1}
+
+    chunks = ContentParser.stream_response(
+        rows(),
+        content_type="application/x-ndjson",
+        chunk_size=1024,
+        flush_interval=0.01,
+    )
+    assert json.loads(await asyncio.wait_for(anext(chunks), timeout=1)) == {"id": 0}
+
+    release.set()
+    assert [json.loads(chunk) async for chunk in chunks] == [{"id": 1}]
+
+
+@pytest.mark.parametrize(
+    "content, expected_status_code, expected_data",
+    [
+        ("text", 200, "text"),
+        (("created", 201), 201, "created"),
+        (("created", 201, None), 201, "created"),
+        ((), 200, None),
+        (None, 200, None),
+    ],
+)
+def test_create_response_unpacks_result(content, expected_status_code, expected_data):
+    response = HTTPResponse.create_response(create_mock_request(), None, content)
+    assert response.status_code == expected_status_code
+    assert response.raw_data == expected_data
+
+
+def test_content_type_header_is_shared():
+    first, second = [
+        HTTPResponse(
+            status_code=200, content_type="text/csv", raw_data=None, headers=[]
+        )
+        for _ in range(2)
+    ]
+    assert first.build_headers() is second.build_headers()
+    assert first.build_headers() == ((b"content-type", b"text/csv"),)
+
+    first.headers.append(("x-custom", "value"))
+    assert first.build_headers() == [
+        (b"content-type", b"text/csv"),
+        (b"x-custom", b"value"),
+    ]
+    assert not hasattr(first, "__dict__")
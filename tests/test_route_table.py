@@ -0,0 +1,83 @@
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.exceptions import HttpException
+from tadow_api.route_table import RouteTable
+from tadow_api.url_dispatcher import APIRoute, RegexURLDispatcher
+from tests.factories import call_asgi_app, create_mock_request
+
+
+def example_function():
+    return "Root"
+
+
+root_route = APIRoute(endpoint_func=example_function, path="/")
+item_route = APIRoute(endpoint_func=example_function, path="/items/(?P<id>\\d+)")
+order_route = APIRoute(endpoint_func=example_function, path="/orders/(?P<id>\\d+)")
+
+registered_routes = {
+    "/": root_route,
+    "/items/(?P<id>\\d+)": item_route,
+    "/orders/(?P<id>\\d+)": order_route,
+}
+
+
+def test_static_and_dynamic_routes():
+    route_table = RouteTable(registered_routes, RegexURLDispatcher())
+
+    route, arguments = route_table.resolve(create_mock_request(url="/"))
+    assert route == root_route
+    assert arguments == {}
+
+    route, arguments = route_table.resolve(create_mock_request(url="/orders/7"))
+    assert route == order_route
+    assert arguments == {"id": "7"}
+
+    with pytest.raises(HttpException):
+        route_table.resolve(create_mock_request(url="/orders/abc"))
+
+    with pytest.raises(HttpException):
+        route_table.resolve(create_mock_request(url="/", http_method="POST"))
+
+
+def test_resolved_path_cache():
+    route_table = RouteTable(registered_routes, RegexURLDispatcher(), cache_size=2)
+
+    route_table.resolve(create_mock_request(url="/items/1"))
+    route_table.resolve(create_mock_request(url="/items/1"))
+    route_table.resolve(create_mock_request(url="/items/2"))
+    route_table.resolve(create_mock_request(url="/items/3"))
+
+    cache_info = route_table.cache_info()
+    assert cache_info.hits == 1
+    assert cache_info.misses == 3
+    assert cache_info.currsize == 2
+
+
+def test_registered_routes_are_frozen():
+    route_table = RouteTable(registered_routes, RegexURLDispatcher())
+
+    with pytest.raises(TypeError):
+        route_table.routes["/new"] = root_route
+
+
+@pytest.mark.asyncio
+async def test_app_rebuilds_table_after_registration():
+    app = TadowAPI()
+
+    @app.endpoint("/first")
+    def first():
+        return "first"
+
+    status_code, _, body = await call_asgi_app(app, url="/first")
+    assert status_code == 200
+    assert body == b'"first"'
+
+    @app.endpoint("/second")
+    def second():
+        return "second"
+
+    status_code, _, body = await call_asgi_app(app, url="/second")
+    assert status_code == 200
+    assert body == b'"second"'
+    assert app.route_cache_info().misses == 1
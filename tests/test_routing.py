@@ -0,0 +1,133 @@
+from uuid import UUID
+
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from tadow_api import TadowAPI
+from tadow_api.requests import HTTPRequest
+from tadow_api.routing import APIRoute
+from tests.factories import call_asgi_app, create_mock_request
+
+
+class Item(BaseModel):
+    name: str
+
+
+def test_path_arguments_are_converted():
+    def endpoint(item_id: int, ratio: float, uid: UUID, slug: str, raw):
+        return item_id, ratio, uid, slug, raw
+
+    route = APIRoute(
+        endpoint_func=endpoint,
+        path="/(?P<item_id>[^/]+)/(?P<ratio>[^/]+)/(?P<uid>[^/]+)/(?P<slug>[^/]+)/(?P<raw>[^/]+)",
+    )
+    arguments = route._check_endpoint_arguments(
+        create_mock_request(),
+        item_id="1",
+        ratio="0.5",
+        uid="12345678123456781234567812345678",
+        slug="slug",
+        raw="raw",
+    )
+
+    assert arguments == {
+        "item_id": 1,
+        "ratio": 0.5,
+        "uid": UUID("12345678123456781234567812345678"),
+        "slug": "slug",
+        "raw": "raw",
+    }
+
+
+def test_request_and_defaults():
+    def endpoint(request: HTTPRequest, page: int | None = None):
+        return request, page
+
+    route = APIRoute(endpoint_func=endpoint, path="/(?P<page>\\d+)?")
+    request = create_mock_request()
+
+    assert route._check_endpoint_arguments(request, page=None) == {"request": request}
+    assert route._check_endpoint_arguments(request, page="2") == {
+        "request": request,
+        "page": 2,
+    }
+
+
+def test_model_parameter_takes_request_data():
+    def endpoint(item: Item):
+        return item
+
+    route = APIRoute(endpoint_func=endpoint, path="/")
+    request = create_mock_request(raw_data={"name": "test"})
+    request.validate_request_data(validation_model=None)
+
+    assert route._check_endpoint_arguments(request) == {"item": Item(name="test")}
+
+
+@pytest.mark.asyncio
+async def test_sync_and_async_endpoints():
+    def sync_endpoint():
+        return "sync"
+
+    async def async_endpoint():
+        return "async"
+
+    sync_route = APIRoute(endpoint_func=sync_endpoint, path="/")
+    async_route = APIRoute(endpoint_func=async_endpoint, path="/")
+
+    assert not sync_route._is_coroutine
+    assert async_route._is_coroutine
+    assert (await sync_route(create_mock_request())).raw_data == "sync"
+    assert (await async_route(create_mock_request())).raw_data == "async"
+
+
+class ItemResponse(BaseModel):
+    name: str
+    length: int
+
+
+app = TadowAPI()
+
+
+@app.endpoint(
+    "/items",
+    methods=["POST"],
+    request_model=Item,
+    response_model=ItemResponse,
+)
+def create_item(request: HTTPRequest):
+    return {"name": request.data.name, "length": len(request.data.name)}
+
+
+@pytest.mark.asyncio
+async def test_request_and_response_models():
+    status_code, _, body = await call_asgi_app(
+        app, url="/items", http_method="POST", body=b'{"name": "item"}'
+    )
+    assert status_code == 200
+    assert json.loads(body) == {"name": "item", "length": 4}
+
+    status_code, _, _ = await call_asgi_app(
+        app, url="/items", http_method="POST", body=b'{"name": 1}'
+    )
+    assert status_code == 400
+
+    status_code, _, _ = await call_asgi_app(
+        app, url="/items", http_method="POST", body=b'{"name": '
+    )
+    assert status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_xml_request_model():
+    status_code, _, body = await call_asgi_app(
+        app,
+        url="/items",
+        http_method="POST",
+        body=b"<name>item</name>",
+        headers=[(b"content-type", b"application/xml"), (b"content-length", b"17")],
+    )
+    assert status_code == 200
+    assert b"<length" in body
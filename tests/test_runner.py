@@ -0,0 +1,176 @@
+import os
+import select
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from tadow_api import TadowAPI
+from tadow_api.runner import bind_socket, load_app, read_rss
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="Runner requires os.fork"
+)
+
+RUNNER_SCRIPT = """
+from tadow_api.runner import Runner, load_app, serve_uvicorn
+from tests.test_runner import serve_pid
+
+runner = Runner(
+    lambda: load_app("tests.test_runner:app"), port=0, workers=2,
+    max_requests={max_requests}, reuse_port={reuse_port}, graceful_timeout=2,
+    serve={serve},
+)
+runner.bind()
+print(runner.port, flush=True)
+runner.run()
+"""
+
+app = TadowAPI()
+
+
+@app.endpoint("/pid")
+def get_pid():
+    return os.getpid()
+
+
+def serve_pid(context) -> None:
+    """
+    Worker answering every connection with its pid, instead of application.
+    """
+    stopped = []
+    signal.signal(signal.SIGTERM, lambda *args: stopped.append(True))
+    context.socket.setblocking(False)
+    context.ready()
+
+    served = 0
+    while not stopped:
+        if context.max_requests is not None and served >= context.max_requests:
+            return
+        readable, _, _ = select.select([context.socket], [], [], 0.05)
+        if not readable:
+            continue
+        try:
+            connection, _ = context.socket.accept()
+        except BlockingIOError:
+            continue  # accepted by another worker
+        with connection:
+            connection.sendall(str(os.getpid()).encode())
+        served += 1
+
+
+def request_pid(port: int) -> int:
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as connection:
+        return int(connection.recv(32))
+
+
+def wait_for(condition, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if condition():
+                return
+        except ConnectionRefusedError:
+            pass  # workers with SO_REUSEPORT didn't bind yet
+        assert time.monotonic() < deadline, "Condition not met in time"
+        time.sleep(0.05)
+
+
+def start_runner(
+    max_requests: int | None = None, reuse_port: bool = False, serve: str = "serve_pid"
+):
+    script = RUNNER_SCRIPT.format(
+        max_requests=max_requests, reuse_port=reuse_port, serve=serve
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    return process, int(process.stdout.readline())
+
+
+def stop_runner(process: subprocess.Popen) -> None:
+    process.send_signal(signal.SIGTERM)
+    assert process.wait(timeout=10) == 0
+
+
+def worker_pids(port: int, requests: int = 20) -> set[int]:
+    return {request_pid(port) for _ in range(requests)}
+
+
+def test_load_app():
+    assert load_app("tests.test_runner:serve_pid") is serve_pid
+    assert load_app("tests.test_runner:read_rss", factory=True) > 0
+    with pytest.raises(AttributeError):
+        load_app("tests.test_runner")
+
+
+def test_read_rss():
+    assert read_rss() > 1024 * 1024
+
+
+def test_bind_socket_with_reuse_port():
+    first = bind_socket("127.0.0.1", 0, reuse_port=True)
+    second = bind_socket("127.0.0.1", first.getsockname()[1], reuse_port=True)
+    first.close()
+    second.close()
+
+
+@pytest.mark.parametrize("reuse_port", [False, True])
+def test_workers_share_port(reuse_port):
+    process, port = start_runner(reuse_port=reuse_port)
+    try:
+        wait_for(lambda: len(worker_pids(port)) == 2)
+    finally:
+        stop_runner(process)
+
+
+def test_workers_are_recycled_after_max_requests():
+    process, port = start_runner(max_requests=3)
+    try:
+        wait_for(lambda: request_pid(port))
+        pids = [request_pid(port) for _ in range(20)]
+        assert len(set(pids)) > 2
+        assert all(pids.count(pid) <= 3 for pid in pids)
+    finally:
+        stop_runner(process)
+
+
+def test_rolling_restart_on_sighup():
+    process, port = start_runner()
+    try:
+        wait_for(lambda: len(worker_pids(port)) == 2)
+        old_pids = worker_pids(port)
+
+        process.send_signal(signal.SIGHUP)
+        # Every connection is answered while workers are replaced
+        seen_pids = set()
+        deadline = time.monotonic() + 10
+        while len(seen_pids) != 2 or seen_pids & old_pids:
+            assert time.monotonic() < deadline, "Workers weren't replaced"
+            seen_pids = worker_pids(port, requests=10)
+    finally:
+        stop_runner(process)
+
+
+def test_uvicorn_workers():
+    pytest.importorskip("uvicorn")
+    import http.client
+
+    def get_pid(port: int) -> int:
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        try:
+            connection.request("GET", "/pid")
+            return int(connection.getresponse().read())
+        finally:
+            connection.close()
+
+    process, port = start_runner(max_requests=5, serve="serve_uvicorn")
+    try:
+        wait_for(lambda: len({get_pid(port) for _ in range(20)}) >= 2)
+    finally:
+        stop_runner(process)
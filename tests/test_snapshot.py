@@ -0,0 +1,101 @@
+import json
+import pickle
+import subprocess
+import sys
+
+import pytest
+from pydantic import BaseModel
+
+from tadow_api import TadowAPI
+from tadow_api.snapshot import load_snapshot
+from tests.factories import call_asgi_app
+
+
+class Item(BaseModel):
+    name: str
+
+
+def get_item(item_id: int, db: dict):
+    return db[item_id]
+
+
+def create_item(item: Item):
+    return {"name": item.name.upper()}
+
+
+def create_app() -> TadowAPI:
+    app = TadowAPI(metrics=True)
+    app.endpoint("/items/(?P<item_id>[0-9]+)")(get_item)
+    app.endpoint("/items", methods=["POST"])(create_item)
+    app.add_metrics_endpoint()
+    app.add_batch_endpoint()
+    app.state.db = {1: "first"}
+    return app
+
+
+def test_import_doesnt_load_optional_modules():
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import json, sys, tadow_api; print(json.dumps(list(sys.modules)))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = set(json.loads(result.stdout))
+    for module in ["pydantic", "multiprocessing", "tadow_api.xml_stream"]:
+        assert module not in imported
+
+
+@pytest.mark.asyncio
+async def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "app.snapshot")
+    create_app().save_snapshot(path)
+
+    app = TadowAPI.load_snapshot(path)
+    assert app._route_table is not None
+    await app.startup()
+    try:
+        assert await call_asgi_app(app, url="/items/1") == (
+            200,
+            {b"content-type": b"application/json"},
+            b'"first"',
+        )
+        status_code, _, body = await call_asgi_app(
+            app, url="/items", http_method="POST", body=b'{"name": "item"}'
+        )
+        assert (status_code, json.loads(body)) == (200, {"name": "ITEM"})
+        status_code, _, _ = await call_asgi_app(
+            app, url="/items", http_method="POST", body=b'{"size": 1}'
+        )
+        assert status_code == 400
+
+        status_code, _, body = await call_asgi_app(
+            app, url="/batch", http_method="POST", body=b'[{"path": "/items/1"}]'
+        )
+        assert json.loads(body)[0]["body"] == "first"
+        _, _, body = await call_asgi_app(app, url="/metrics")
+        assert b'route="/items/(?P<item_id>[0-9]+)"' in body
+    finally:
+        await app.shutdown()
+
+
+def test_snapshot_requires_module_level_endpoints(tmp_path):
+    app = TadowAPI()
+
+    @app.endpoint("/")
+    def index():
+        return "index"
+
+    with pytest.raises(AttributeError):
+        app.save_snapshot(str(tmp_path / "app.snapshot"))
+
+
+def test_snapshot_format_is_checked(tmp_path):
+    path = tmp_path / "app.snapshot"
+    path.write_bytes(pickle.dumps(0))
+
+    with pytest.raises(AttributeError):
+        load_snapshot(str(path))
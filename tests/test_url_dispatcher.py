@@ -2,7 +2,11 @@ import pytest
 
 from tadow_api.exceptions import HttpException
 from tadow_api.responses import HTTPResponse
-from tadow_api.url_dispatcher import APIRoute, RegexURLDispatcher
+from tadow_api.url_dispatcher import (
+    APIRoute,
+    RadixTreeURLDispatcher,
+    RegexURLDispatcher,
+)
 from tests.factories import create_mock_request
 
 
@@ -25,6 +29,12 @@ registered_routes = {
 }
 regex_dispatcher = RegexURLDispatcher()
 
+dispatchers = pytest.mark.parametrize(
+    "dispatcher",
+    [regex_dispatcher, RadixTreeURLDispatcher()],
+    ids=["regex", "radix"],
+)
+
 
 # TODO Create single request mock factory
 class RequestMock:
@@ -36,34 +46,134 @@ class RequestMock:
         pass
 
 
-def test_route_found():
-    route, _ = regex_dispatcher(
+@dispatchers
+def test_route_found(dispatcher):
+    route, _ = dispatcher(
         registered_routes=registered_routes, request=create_mock_request(url="/")
     )
     assert route == root_route
 
-    route, _ = regex_dispatcher(
+    route, _ = dispatcher(
         registered_routes=registered_routes, request=create_mock_request(url="/index")
     )
     assert route == variable_route
 
-    route, _ = regex_dispatcher(
+    route, _ = dispatcher(
         registered_routes=registered_routes, request=create_mock_request(url="/items")
     )
     assert route == items_route
 
 
-def test_not_found():
+@dispatchers
+def test_not_found(dispatcher):
     with pytest.raises(HttpException):
-        route, _ = regex_dispatcher(
+        route, _ = dispatcher(
             registered_routes=registered_routes,
             request=create_mock_request(url="/api/tests"),
         )
 
 
-def test_method_not_allowed():
+@dispatchers
+def test_method_not_allowed(dispatcher):
     with pytest.raises(HttpException):
-        route, _ = regex_dispatcher(
+        route, _ = dispatcher(
             registered_routes=registered_routes,
             request=create_mock_request(url="/test", http_method="POST"),
         )
+
+
+@dispatchers
+def test_route_with_fewest_groups_wins(dispatcher):
+    paths = [
+        "/(?P<a>[^/]+)/(?P<b>[^/]+)",
+        "/(?P<c>\\d+)/x",
+        "/items/(?P<d>[^/]+)/(?P<e>[^/]+)",
+        "/(?P<f>[^/]+)/y/z",
+    ]
+    routes = {
+        path: APIRoute(endpoint_func=example_function, path=path) for path in paths
+    }
+
+    route, arguments = dispatcher(routes, create_mock_request(url="/5/x"))
+    assert route == routes["/(?P<c>\\d+)/x"]
+    assert arguments == {"c": "5"}
+
+    route, arguments = dispatcher(routes, create_mock_request(url="/items/y/z"))
+    assert route == routes["/(?P<f>[^/]+)/y/z"]
+    assert arguments == {"f": "items"}
+
+    route, _ = dispatcher(routes, create_mock_request(url="/a/x"))
+    assert route == routes["/(?P<a>[^/]+)/(?P<b>[^/]+)"]
+
+
+@dispatchers
+def test_segments_matched_with_full_pattern(dispatcher):
+    paths = ["/", "/docs/?", "/files/(?P<path>.+)/raw", "/files/(?P<name>[^/]+)"]
+    routes = {
+        path: APIRoute(endpoint_func=example_function, path=path) for path in paths
+    }
+
+    route, _ = dispatcher(routes, create_mock_request(url="/"))
+    assert route == routes["/"]
+    for url in ["/docs", "/docs/"]:
+        route, _ = dispatcher(routes, create_mock_request(url=url))
+        assert route == routes["/docs/?"]
+
+    route, arguments = dispatcher(routes, create_mock_request(url="/files/a/b/raw"))
+    assert route == routes["/files/(?P<path>.+)/raw"]
+    assert arguments == {"path": "a/b"}
+
+    route, arguments = dispatcher(routes, create_mock_request(url="/files/a"))
+    assert route == routes["/files/(?P<name>[^/]+)"]
+    assert arguments == {"name": "a"}
+
+
+@dispatchers
+def test_route_with_inline_flags(dispatcher):
+    paths = ["/", "(?i)/items", "/(?P<name>[a-z]+)"]
+    routes = {
+        path: APIRoute(endpoint_func=example_function, path=path) for path in paths
+    }
+
+    route, _ = dispatcher(routes, create_mock_request(url="/ITEMS"))
+    assert route == routes["(?i)/items"]
+    route, arguments = dispatcher(routes, create_mock_request(url="/other"))
+    assert arguments == {"name": "other"}
+    route, _ = dispatcher(routes, create_mock_request(url="/"))
+    assert route == routes["/"]
+
+
+def test_radix_nested_parameters():
+    user_route = APIRoute(
+        endpoint_func=example_function, path="/users/(?P<user_id>\\d+)"
+    )
+    post_route = APIRoute(
+        endpoint_func=example_function,
+        path="/users/(?P<user_id>\\d+)/posts/(?P<post_id>[^/]+)",
+    )
+    me_route = APIRoute(endpoint_func=example_function, path="/users/me")
+    routes = {route.path: route for route in [user_route, post_route, me_route]}
+    dispatcher = RadixTreeURLDispatcher()
+
+    route, arguments = dispatcher(routes, create_mock_request(url="/users/12"))
+    assert route == user_route
+    assert arguments == {"user_id": "12"}
+
+    route, arguments = dispatcher(routes, create_mock_request(url="/users/12/posts/a"))
+    assert route == post_route
+    assert arguments == {"user_id": "12", "post_id": "a"}
+
+    route, arguments = dispatcher(routes, create_mock_request(url="/users/me"))
+    assert route == me_route
+    assert arguments == {}
+
+    with pytest.raises(HttpException):
+        dispatcher(routes, create_mock_request(url="/users/12/posts"))
+
+
+def test_radix_fallback_pattern():
+    alternation_route = APIRoute(endpoint_func=example_function, path="/a|/b")
+    dispatcher = RadixTreeURLDispatcher()
+
+    route, _ = dispatcher({"/a|/b": alternation_route}, create_mock_request(url="/b"))
+    assert route == alternation_route
@@ -0,0 +1,158 @@
+import datetime
+
+import pytest
+from pydantic import BaseModel
+
+from tadow_api import TadowAPI
+from tadow_api.content_parsers import ContentParser
+from tadow_api.responses import StreamingResponse
+from tadow_api.xml_stream import (
+    XMLReader,
+    dump_xml,
+    iterate_xml_items,
+    parse_xml,
+)
+from tests.factories import call_asgi_app
+
+XML_HEADERS = [(b"content-type", b"application/xml")]
+
+DATA = {
+    "id": 1,
+    "name": "A & <B>",
+    "price": 1.5,
+    "available": True,
+    "note": None,
+    "tags": ["a", 2, False, None, {"x": 1}, [1]],
+    "nested": {"key": "value"},
+    "1": "digit",
+    "a b": "space",
+    "&x": "invalid",
+    "created": datetime.date(2025, 1, 1),
+}
+
+DOCUMENTS = [
+    b'<root a="1"><x>1</x><x>2</x><y/><z b="2">text</z><m>a<n/>b</m> </root>',
+    b"<root>  </root>",
+    b"<a><b><c>1</c></b><b/></a>",
+]
+
+
+class Item(BaseModel):
+    name: str
+    size: int
+
+
+class ItemDocument(BaseModel):
+    item: Item
+
+
+app = TadowAPI()
+
+
+@app.endpoint("/items", methods=["POST"])
+def create_item(document: ItemDocument):
+    return {"name": document.item.name, "size": document.item.size}
+
+
+@app.endpoint("/export")
+def export():
+    return StreamingResponse.from_rows(
+        ({"id": index} for index in range(1000)), content_type="application/xml"
+    )
+
+
+async def iterate_chunks(document: bytes, size: int):
+    for start in range(0, len(document), size):
+        yield document[start : start + size]
+
+
+def test_dump_xml():
+    assert dump_xml({"a": 1, "b": [True, "x"], "c": None}) == (
+        b'<?xml version="1.0" encoding="utf-8" ?><root><a type="int">1</a>'
+        b'<b type="list"><item type="bool">True</item><item type="str">x</item>'
+        b'</b><c type="null"></c></root>'
+    )
+
+
+@pytest.mark.parametrize("data", [DATA, [1, {"a": "b"}], "scalar", 5, True, {}])
+def test_dump_xml_matches_dicttoxml(data):
+    dicttoxml = pytest.importorskip("dicttoxml")
+    expected = dicttoxml.dicttoxml(data, encoding="utf-8", return_bytes=True)
+    assert dump_xml(data) == expected
+
+
+@pytest.mark.parametrize("document", [*DOCUMENTS, dump_xml(DATA)])
+def test_parse_xml_matches_xmltodict(document):
+    xmltodict = pytest.importorskip("xmltodict")
+    assert parse_xml(document) == xmltodict.parse(document)
+
+
+def test_reader_parses_byte_chunks():
+    document = DOCUMENTS[0]
+    reader = XMLReader()
+    for index in range(len(document)):
+        reader.feed(document[index : index + 1])
+    assert reader.close() == parse_xml(document)
+
+
+def test_reader_rejects_entities():
+    with pytest.raises(Exception, match="Entity declarations"):
+        parse_xml(b'<!DOCTYPE a [<!ENTITY x "y">]><a>&x;</a>')
+
+
+@pytest.mark.asyncio
+async def test_iterate_xml_items():
+    document = dump_xml([{"id": index} for index in range(100)])
+    items = [
+        item async for item in iterate_xml_items(iterate_chunks(document, 7), depth=2)
+    ]
+    assert items == [
+        {"@type": "dict", "id": {"@type": "int", "#text": str(index)}}
+        for index in range(100)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_xml_stream_encoder():
+    rows = [{"id": index} for index in range(100)]
+    chunks = [
+        chunk
+        async for chunk in ContentParser.stream_response(
+            iter(rows), content_type="application/xml", chunk_size=256
+        )
+    ]
+    assert len(chunks) > 1
+    assert b"".join(chunks) == dump_xml(rows)
+
+
+@pytest.mark.asyncio
+async def test_xml_request_is_parsed_while_received():
+    document = b"<item><name>item</name><size>3</size></item>"
+    status_code, _, body = await call_asgi_app(
+        app,
+        url="/items",
+        http_method="POST",
+        body=[document[:10], document[10:30], document[30:]],
+        headers=[*XML_HEADERS, (b"transfer-encoding", b"chunked")],
+    )
+    assert status_code == 200
+    assert parse_xml(body)["root"]["size"] == {"@type": "int", "#text": "3"}
+
+
+@pytest.mark.asyncio
+async def test_invalid_xml_request():
+    status_code, _, _ = await call_asgi_app(
+        app,
+        url="/items",
+        http_method="POST",
+        body=[b"<item><name>", b"item</item>"],
+        headers=[*XML_HEADERS, (b"transfer-encoding", b"chunked")],
+    )
+    assert status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_xml_streaming_response():
+    status_code, _, body = await call_asgi_app(app, url="/export")
+    assert status_code == 200
+    assert body == dump_xml([{"id": index} for index in range(1000)])